@@ -0,0 +1,26 @@
+"""
+The AutoGen agent stack (autogen, openai and everything they import) takes seconds to
+import, so the API does not import it at module load: it is loaded on first use, or in
+the background after startup when the agent pool is prewarmed.
+"""
+import asyncio
+import importlib
+import sys
+from types import ModuleType
+
+AGENT_STACK_MODULE = "app.agents.orchestrator"
+
+def load_agent_stack() -> ModuleType:
+    """Imports the orchestrator (and with it autogen), waiting for an import already in progress."""
+    return importlib.import_module(AGENT_STACK_MODULE)
+
+def loaded_agent_stack() -> ModuleType | None:
+    """The orchestrator module if it is fully imported, without importing it."""
+    module = sys.modules.get(AGENT_STACK_MODULE)
+    if module is None or getattr(module.__spec__, "_initializing", False):
+        return None
+    return module
+
+async def import_agent_stack() -> ModuleType:
+    """Loads the agent stack in a worker thread so the first import does not block the event loop."""
+    return loaded_agent_stack() or await asyncio.to_thread(load_agent_stack)
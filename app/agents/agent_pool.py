@@ -0,0 +1,119 @@
+from __future__ import annotations
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict
+import autogen
+
+# A tool receives the lease's bindings (e.g. the request's DB session) plus the LLM's arguments.
+Tool = Callable[..., Awaitable[str]]
+
+@dataclass
+class AgentKind:
+    agent_factory: Callable[[], autogen.ConversableAgent]
+    proxy_name: str | None = None
+    proxy_options: Dict[str, Any] = field(default_factory=dict)
+    tools: Dict[str, Tool] = field(default_factory=dict)
+
+class PooledChat:
+    """An agent (plus its tool-executing proxy, if any) built once and leased to one request at a time."""
+
+    def __init__(self, kind: AgentKind):
+        self.agent = kind.agent_factory()
+        self.proxy: autogen.UserProxyAgent | None = None
+        self.bindings: Dict[str, Any] = {}
+        if kind.proxy_name:
+            self.proxy = autogen.UserProxyAgent(
+                name=kind.proxy_name,
+                human_input_mode="NEVER",
+                code_execution_config=False,
+                **kind.proxy_options,
+            )
+            self.proxy.register_function(
+                function_map={name: self._bind(tool) for name, tool in kind.tools.items()}
+            )
+
+    def _bind(self, tool: Tool) -> Callable[..., Awaitable[str]]:
+        # Registered once; resolves the current lease's bindings on every call.
+        async def call(**arguments):
+            return await tool(self.bindings, **arguments)
+        return call
+
+    def reset(self) -> None:
+        """Forgets the previous conversation, bindings and response cache."""
+        for agent in (self.agent, self.proxy):
+            if agent is not None:
+                agent.reset()
+                agent.client_cache = None
+        self.bindings = {}
+
+class AgentPool:
+    """
+    Per-worker pool of prebuilt AutoGen agents. Building a ConversableAgent creates its model
+    client and registering a proxy's tools inspects every function, so doing it per request
+    costs more than the request's own bookkeeping. Agents are built on first use per kind,
+    leased exclusively (concurrent requests never share an agent) and reset on release.
+    A chat released by an exception (a cancelled or timed-out run) is dropped instead: a
+    completion may still be running for it in an executor thread.
+    """
+
+    def __init__(self, max_idle: int = 8):
+        self.max_idle = max_idle
+        self._kinds: Dict[str, AgentKind] = {}
+        self._idle: Dict[str, Deque[PooledChat]] = {}
+        self.built = 0
+        self.reused = 0
+        self.leased = 0
+        self.discarded = 0
+
+    def register(self, name: str, kind: AgentKind) -> None:
+        self._kinds[name] = kind
+        self._idle[name] = deque()
+
+    @asynccontextmanager
+    async def lease(self, name: str, **bindings) -> AsyncIterator[PooledChat]:
+        """Yields an idle (or newly built) chat for `name` with `bindings` visible to its tools."""
+        idle = self._idle[name]
+        if idle:
+            chat = idle.pop()
+            self.reused += 1
+        else:
+            chat = PooledChat(self._kinds[name])
+            self.built += 1
+        chat.bindings = bindings
+        self.leased += 1
+        try:
+            yield chat
+        except BaseException:
+            self.discarded += 1
+            raise
+        else:
+            chat.reset()
+            if len(idle) < self.max_idle:
+                idle.append(chat)
+        finally:
+            self.leased -= 1
+
+    async def prewarm(self, names: list[str] | None = None, count: int = 1) -> float:
+        """Builds `count` idle chats per kind ahead of traffic; returns the seconds it took."""
+        started = time.perf_counter()
+        for name in names or list(self._kinds):
+            idle = self._idle[name]
+            while len(idle) < min(count, self.max_idle):
+                idle.append(PooledChat(self._kinds[name]))
+                self.built += 1
+        return time.perf_counter() - started
+
+    def clear(self) -> None:
+        for idle in self._idle.values():
+            idle.clear()
+
+    def stats(self) -> dict:
+        return {
+            "built": self.built,
+            "reused": self.reused,
+            "leased": self.leased,
+            "discarded": self.discarded,
+            "idle": {name: len(idle) for name, idle in self._idle.items()},
+        }
@@ -0,0 +1,146 @@
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from app.core.config import settings
+
+class LLMResponseCache:
+    """
+    Response cache for AutoGen chats, implementing autogen's `AbstractCache` protocol.
+    AutoGen derives the key from the create params (model, messages, tools, ...);
+    entries live in a size-bounded in-memory LRU with a TTL and can optionally be
+    persisted to a SQLite file so they survive restarts.
+    AutoGen calls the cache from executor threads, so every operation takes a lock.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600.0, sqlite_path: str | None = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, default: Optional[Any] = None) -> Optional[Any]:
+        digest = self._digest(key)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(digest)
+                    self.hits += 1
+                    return value
+                del self._entries[digest]
+                self.expirations += 1
+            stored = self._load_from_disk(digest, now)
+            if stored is not None:
+                value, expires_at = stored
+                # Keep the persisted deadline; a disk hit must not extend the entry's lifetime.
+                self._remember(digest, value, expires_at)
+                self.hits += 1
+                return value
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value: Any) -> None:
+        digest = self._digest(key)
+        now = time.time()
+        with self._lock:
+            self._remember(digest, value, now + self.ttl_seconds)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (digest, pickle.dumps(value), now + self.ttl_seconds, now),
+                )
+                self._db.execute(
+                    "DELETE FROM llm_cache WHERE expires_at <= ? OR key NOT IN "
+                    "(SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT ?)",
+                    (now, self.max_entries),
+                )
+                self._db.commit()
+
+    def _remember(self, digest: str, value: Any, expires_at: float) -> None:
+        self._entries[digest] = (expires_at, value)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load_from_disk(self, digest: str, now: float) -> Optional[Tuple[Any, float]]:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT value, expires_at FROM llm_cache WHERE key = ?", (digest,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            self._db.execute("DELETE FROM llm_cache WHERE key = ?", (digest,))
+            self._db.commit()
+            self.expirations += 1
+            return None
+        self._db.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, digest))
+        self._db.commit()
+        return pickle.loads(row[0]), row[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "persistent": self._db is not None,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def close(self) -> None:
+        # AutoGen enters/exits the cache around every completion; the shared cache stays open.
+        pass
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __enter__(self) -> "LLMResponseCache":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+llm_cache = LLMResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    sqlite_path=settings.LLM_CACHE_SQLITE_PATH or None,
+)
@@ -0,0 +1,451 @@
+"""
+Process-wide gateway between the AutoGen agents and the LiteLLM / Ollama endpoint.
+
+Every agent built by `specialized_agents` talks to the model through `GatewayModelClient`,
+a custom AutoGen model client backed by one shared OpenAI client. That client owns a single
+keep-alive `httpx` connection pool, and every completion passes a per-model concurrency
+semaphore and token bucket and is retried with jittered exponential backoff. A circuit
+breaker stops sending completions to an endpoint that keeps failing.
+Completions (the agents' included) run on the gateway's own bounded thread pool, so requests
+waiting for a slot, a token or a retry never occupy the event loop's default executor, and
+a request whose caller gave up stops waiting instead of calling the endpoint late.
+All limits here are thread-safe.
+"""
+from __future__ import annotations
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple, TypeVar
+import httpx
+import openai
+from autogen import ConversableAgent
+from autogen.io.base import IOStream
+from autogen.oai.client import OpenAIClient
+from app.core.config import settings
+from app.core.metrics import llm_seconds, llm_tokens, metrics
+
+T = TypeVar("T")
+
+# Transient failures worth another attempt; anything else (bad request, auth) is raised at once.
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+class CompletionAbandoned(Exception):
+    """Raised in a gateway thread when the request's caller was cancelled while it waited."""
+
+# The abandonment flag of the request running on the current gateway thread, if any.
+_request_state = threading.local()
+
+def _wait(seconds: float) -> None:
+    """Sleeps `seconds` on a gateway thread, giving up as soon as the request is abandoned."""
+    abandoned: threading.Event | None = getattr(_request_state, "abandoned", None)
+    if abandoned is None:
+        time.sleep(seconds)
+    elif abandoned.wait(seconds):
+        raise CompletionAbandoned()
+
+def _check_abandoned() -> None:
+    abandoned: threading.Event | None = getattr(_request_state, "abandoned", None)
+    if abandoned is not None and abandoned.is_set():
+        raise CompletionAbandoned()
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Blocks until a token is available; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            _wait(delay)
+            waited += delay
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM endpoint while the circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed completions and rejects calls for
+    `reset_seconds`. Then one probe is let through (half-open): a success closes the breaker,
+    a failure opens it again. A probe that never reports back (abandoned by a cancelled
+    request) is replaced by another one after `reset_seconds`. A threshold of 0 disables it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self._retry_at = 0.0
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in the half-open state only the probe gets True."""
+        if self.failure_threshold <= 0:
+            return True
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = self._clock()
+            if now < self._retry_at:
+                self.rejected += 1
+                return False
+            self.state = "half_open"
+            self._retry_at = now + self.reset_seconds
+            return True
+
+    def is_open(self) -> bool:
+        """Whether calls are currently rejected, without claiming the half-open probe."""
+        with self._lock:
+            return self.state != "closed" and self._clock() < self._retry_at
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self.trips += 1
+                self._retry_at = self._clock() + self.reset_seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "open": int(self.state == "open"),
+                "half_open": int(self.state == "half_open"),
+                "consecutive_failures": self.failures,
+                "trips": self.trips,
+                "rejected": self.rejected,
+            }
+
+class _ModelLimits:
+    def __init__(self, concurrency: int, rate: float, burst: float):
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+
+class LLMGateway:
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        default_model: str,
+        timeout_seconds: float = 120.0,
+        max_connections: int = 32,
+        max_keepalive_connections: int = 16,
+        max_concurrency: int = 4,
+        model_concurrency: Dict[str, int] | None = None,
+        rate_limit_per_second: float = 0.0,
+        rate_limit_burst: float = 1.0,
+        max_retries: int = 3,
+        retry_base_seconds: float = 0.5,
+        retry_max_seconds: float = 8.0,
+        breaker_failure_threshold: int = 0,
+        breaker_reset_seconds: float = 30.0,
+        executor_threads: int = 32,
+        transport: httpx.BaseTransport | None = None,
+    ):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.default_model = default_model
+        self.timeout_seconds = timeout_seconds
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.max_concurrency = max_concurrency
+        self.model_concurrency = model_concurrency or {}
+        self.rate_limit_per_second = rate_limit_per_second
+        self.rate_limit_burst = rate_limit_burst
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.breaker = CircuitBreaker(breaker_failure_threshold, breaker_reset_seconds)
+        self.executor_threads = executor_threads
+        self._executor: ThreadPoolExecutor | None = None
+        self._transport = transport
+        self._client: openai.OpenAI | None = None
+        self._limits: Dict[str, _ModelLimits] = {}
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.throttled_seconds = 0.0
+        self.abandoned = 0
+
+    @classmethod
+    def from_settings(cls) -> "LLMGateway":
+        return cls(
+            base_url=settings.LLM_BASE_URL,
+            api_key=settings.LLM_API_KEY,
+            default_model=settings.LLM_MODEL,
+            timeout_seconds=settings.LLM_TIMEOUT_SECONDS,
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY_PER_MODEL,
+            model_concurrency=settings.LLM_MODEL_CONCURRENCY,
+            rate_limit_per_second=settings.LLM_RATE_LIMIT_PER_SECOND,
+            rate_limit_burst=settings.LLM_RATE_LIMIT_BURST,
+            max_retries=settings.LLM_MAX_RETRIES,
+            retry_base_seconds=settings.LLM_RETRY_BASE_SECONDS,
+            retry_max_seconds=settings.LLM_RETRY_MAX_SECONDS,
+            breaker_failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            breaker_reset_seconds=settings.LLM_BREAKER_RESET_SECONDS,
+            executor_threads=settings.LLM_EXECUTOR_THREADS,
+        )
+
+    @property
+    def client(self) -> openai.OpenAI:
+        """The shared OpenAI client; its httpx pool keeps connections to the proxy alive."""
+        with self._lock:
+            if self._client is None:
+                http_client = httpx.Client(
+                    transport=self._transport,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_keepalive_connections,
+                    ),
+                    timeout=self.timeout_seconds,
+                )
+                # Retries are done here, with jitter and under the model's limits, not by the SDK.
+                self._client = openai.OpenAI(
+                    base_url=self.base_url, api_key=self.api_key, http_client=http_client, max_retries=0
+                )
+            return self._client
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.executor_threads, thread_name_prefix="llm-gateway")
+            return self._executor
+
+    async def run(self, request: Callable[[], T]) -> T:
+        """
+        Runs a blocking completion `request` on the gateway's threads. If the awaiting task is
+        cancelled (e.g. its run hit the deadline), the request is abandoned: while it still
+        waits for a slot, a token or a retry it gives up instead of calling the endpoint.
+        The request runs in a copy of the caller's context, so its spans join the caller's trace.
+        """
+        abandoned = threading.Event()
+
+        def attempt() -> T:
+            _request_state.abandoned = abandoned
+            try:
+                _check_abandoned()
+                return request()
+            except CompletionAbandoned:
+                with self._lock:
+                    self.abandoned += 1
+                raise
+            finally:
+                _request_state.abandoned = None
+
+        context = contextvars.copy_context()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, context.run, attempt)
+        except asyncio.CancelledError:
+            abandoned.set()
+            raise
+
+    def llm_config(self, model: str | None = None) -> Dict[str, Any]:
+        """AutoGen `llm_config` routing an agent's completions through this gateway."""
+        return {
+            "config_list": [{
+                "model": model or self.default_model,
+                "api_key": self.api_key,
+                "base_url": self.base_url,
+                "model_client_cls": GatewayModelClient.__name__,
+            }],
+            # Responses are cached by the orchestrator's `llm_cache` instead of autogen's legacy disk cache.
+            "cache_seed": None,
+        }
+
+    def _limits_for(self, model: str) -> _ModelLimits:
+        with self._lock:
+            limits = self._limits.get(model)
+            if limits is None:
+                concurrency = self.model_concurrency.get(model, self.max_concurrency)
+                limits = self._limits[model] = _ModelLimits(concurrency, self.rate_limit_per_second, self.rate_limit_burst)
+            return limits
+
+    def call(self, model: str, request: Callable[[], T]) -> T:
+        """
+        Runs one completion request under the model's concurrency and rate limits, with retries.
+        Raises CircuitOpenError without calling the endpoint while the breaker is open.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"LLM endpoint {self.base_url} is failing; calls are suspended.")
+        limits = self._limits_for(model)
+        attempt = 0
+        while True:
+            with self._lock:
+                self.waiting += 1
+            try:
+                # Polled so an abandoned request stops waiting for a slot.
+                while not limits.slots.acquire(timeout=0.1):
+                    _check_abandoned()
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+            with self._lock:
+                self.in_flight += 1
+            try:
+                if limits.bucket is not None:
+                    waited = limits.bucket.acquire()
+                    with self._lock:
+                        self.throttled_seconds += waited
+                result = request()
+            except RETRYABLE_ERRORS as exc:
+                error = exc
+            except CompletionAbandoned:
+                raise
+            except Exception as exc:
+                if isinstance(exc, openai.APIStatusError):
+                    # The endpoint answered (e.g. a bad request): it is up as far as the breaker is concerned.
+                    self.breaker.record_success()
+                with self._lock:
+                    self.failed += 1
+                raise
+            else:
+                self.breaker.record_success()
+                with self._lock:
+                    self.completed += 1
+                return result
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+                limits.slots.release()
+
+            if attempt >= self.max_retries:
+                self.breaker.record_failure()
+                with self._lock:
+                    self.failed += 1
+                raise error
+            # Backoff happens outside the semaphore so other requests can use the slot meanwhile.
+            _wait(self._backoff(attempt, error))
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+
+    def chat(self, messages: List[Dict[str, Any]], model: str | None = None, **params) -> str:
+        """
+        One chat completion outside AutoGen, for single-turn prompts that need no agent or
+        tool loop (and may pass per-request params such as `response_format`). Same limits,
+        retries and metrics as the agents' completions. Blocking: await it through `run`.
+        """
+        model = model or self.default_model
+        response = observed_completion(
+            model, lambda: self.call(model, lambda: self.client.chat.completions.create(model=model, messages=messages, **params))
+        )
+        return response.choices[0].message.content or ""
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+        delay = random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2 ** attempt))
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.retry_max_seconds))
+            except ValueError:
+                pass
+        return delay
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "models": {model: self.model_concurrency.get(model, self.max_concurrency) for model in self._limits},
+                "waiting": self.waiting,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "retries": self.retries,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "abandoned": self.abandoned,
+                "breaker": self.breaker.stats(),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+def observed_completion(model: str, request: Callable[[], T]) -> T:
+    """Runs a completion request, recording its latency and the token usage it reports."""
+    started = time.perf_counter()
+    try:
+        with metrics.span("llm.completion"):
+            response = request()
+    finally:
+        llm_seconds.observe(time.perf_counter() - started, model)
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        llm_tokens.inc(usage.prompt_tokens or 0, model, "prompt")
+        llm_tokens.inc(usage.completion_tokens or 0, model, "completion")
+    return response
+
+_CONFIG_ONLY_KEYS = {"model_client_cls", "api_key", "base_url", "api_type", "api_version"}
+
+class GatewayModelClient(OpenAIClient):
+    """AutoGen model client that sends every completion through the shared `LLMGateway`."""
+
+    def __init__(self, config: Dict[str, Any], gateway: LLMGateway | None = None, **kwargs):
+        self.gateway = gateway or llm_gateway
+        super().__init__(self.gateway.client)
+
+    def create(self, params: Dict[str, Any]):
+        # AutoGen hands custom clients the raw config entry; connection settings live on the shared client.
+        params = {key: value for key, value in params.items() if key not in _CONFIG_ONLY_KEYS}
+        model = params.get("model", self.gateway.default_model)
+        return observed_completion(model, lambda: self.gateway.call(model, lambda: super(GatewayModelClient, self).create(params)))
+
+async def a_generate_gateway_reply(
+    agent: ConversableAgent, messages: List[Dict] | None = None, sender: Any = None, config: Any = None
+) -> Tuple[bool, str | Dict | None]:
+    """
+    Replaces ConversableAgent.a_generate_oai_reply, which runs the blocking completion on the
+    event loop's default executor, with a run on the gateway's own threads.
+    """
+    iostream = IOStream.get_default()
+
+    def generate():
+        with IOStream.set_default(iostream):
+            return agent.generate_oai_reply(messages=messages, sender=sender, config=config)
+
+    return await llm_gateway.run(generate)
+
+llm_gateway = LLMGateway.from_settings()
@@ -1,111 +1,461 @@
+import asyncio
 import json
-import re
+from dataclasses import asdict
+from typing import Awaitable, Callable, List
 from sqlalchemy.ext.asyncio import AsyncSession
-import autogen
-from app.agents.specialized_agents import create_trust_agent, create_matchmaking_agent, create_summary_agent
-from app.agents.registered_tools import verify_user_trust, find_potential_mentors, save_session_summary
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.database import AsyncSessionLocal
+from app.agents.agent_pool import AgentKind, AgentPool
+from app.agents.llm_cache import llm_cache
+from app.agents.llm_gateway import CircuitOpenError, llm_gateway
+from app.agents.specialized_agents import (
+    create_trust_agent, create_matchmaking_agent, create_batch_matchmaking_agent, create_rerank_agent,
+    create_chunk_summary_agent, create_summary_agent, SINGLE_TURN_MATCHMAKING_SYSTEM_MESSAGE
+)
+from app.agents.summarization import HierarchicalSummarizer, estimate_tokens
+from app.agents.registered_tools import evaluate_user_trust, verify_user_trust, find_potential_mentors, save_session_summary
+from app.services.event_bus import event_bus
+from app.services.matchmaking_batcher import MatchRequest, matchmaking_batcher
+from app.services.mentor_scoring import ScoredMentor, mentor_scorer
+from app.services.transcript_store import TranscriptStore
+
+_json_decoder = json.JSONDecoder()
+fallbacks = metrics.counter("orchestrator_fallbacks_total", "LLM steps answered by the deterministic fallback.", ("step", "reason"))
+
+def run_deadline() -> float | None:
+    """Event-loop time by which an orchestrator run started now must finish (None without a budget)."""
+    if settings.ORCHESTRATOR_DEADLINE_SECONDS <= 0:
+        return None
+    return asyncio.get_running_loop().time() + settings.ORCHESTRATOR_DEADLINE_SECONDS
+
+def extract_json_object(text: str) -> dict | None:
+    """
+    Returns the first JSON object embedded in an agent reply. Each '{' is tried in turn, so
+    prose, code fences or a second object around it do not spoil the parse (a greedy
+    '{.*}' match spans from the first '{' to the last '}' and fails on any of them).
+    """
+    text = text or ""
+    position = text.find("{")
+    while position != -1:
+        try:
+            value = _json_decoder.raw_decode(text, position)[0]
+        except json.JSONDecodeError:
+            value = None
+        if isinstance(value, dict):
+            return value
+        position = text.find("{", position + 1)
+    return None
+
+def mentor_choice_format(mentor_ids: List[int]) -> dict | None:
+    """The `response_format` constraining a reply to {"best_mentor_id": <one of mentor_ids>}."""
+    if settings.MATCHMAKING_RESPONSE_FORMAT == "json_object":
+        return {"type": "json_object"}
+    if settings.MATCHMAKING_RESPONSE_FORMAT != "json_schema":
+        return None
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "mentor_choice",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {"best_mentor_id": {"type": "integer", "enum": mentor_ids}},
+                "required": ["best_mentor_id"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+def chosen_mentor(reply: str, mentor_ids: List[int]) -> int | None:
+    """The `best_mentor_id` of a reply if it is one of `mentor_ids`."""
+    choice = (extract_json_object(reply) or {}).get("best_mentor_id")
+    return next((mentor_id for mentor_id in mentor_ids if str(mentor_id) == str(choice).strip()), None)
+
+def is_final_answer(message: dict) -> bool:
+    """Ends a tool chat at the agent's first plain reply; otherwise the proxy's empty auto-replies keep it going."""
+    return bool(message.get("content")) and not message.get("tool_calls") and not message.get("function_call")
+
+# Agents are built once per worker and leased per request; tools read the lease's `db` binding.
+agent_pool = AgentPool(max_idle=settings.AGENT_POOL_MAX_IDLE)
+agent_pool.register("verification", AgentKind(
+    agent_factory=lambda: create_trust_agent(llm_config=llm_gateway.llm_config()),
+    proxy_name="VerificationProxy",
+    proxy_options={"is_termination_msg": is_final_answer},
+    tools={"verify_user_trust": lambda bindings, user_id: verify_user_trust(user_id, bindings["db"])},
+))
+agent_pool.register("matchmaking", AgentKind(
+    agent_factory=lambda: create_matchmaking_agent(llm_config=llm_gateway.llm_config()),
+    proxy_name="MatchmakingProxy",
+    proxy_options={"is_termination_msg": is_final_answer},
+    tools={"find_potential_mentors": lambda bindings, skill_name: find_potential_mentors(
+        skill_name, bindings["db"], bindings.get("request_details")
+    )},
+))
+agent_pool.register("batch_matchmaking", AgentKind(
+    agent_factory=lambda: create_batch_matchmaking_agent(llm_config=llm_gateway.llm_config()),
+))
+agent_pool.register("rerank", AgentKind(
+    agent_factory=lambda: create_rerank_agent(llm_config=llm_gateway.llm_config()),
+))
+agent_pool.register("chunk_summary", AgentKind(
+    agent_factory=lambda: create_chunk_summary_agent(llm_config=llm_gateway.llm_config()),
+))
+agent_pool.register("summary", AgentKind(
+    agent_factory=lambda: create_summary_agent(llm_config=llm_gateway.llm_config()),
+    proxy_name="SummaryProxy",
+    proxy_options={"is_termination_msg": lambda x: "TERMINATE" in (x.get("content") or "")},
+    tools={
+        "save_session_summary": lambda bindings, session_id, summary_text: save_session_summary(
+            session_id, summary_text, bindings["db"]
+        ),
+    },
+))
 
 class MatchmakingOrchestrator:
-    def __init__(self, db_session: AsyncSession):
+    def __init__(self, db_session: AsyncSession, session_id: int | None = None, session_factory: sessionmaker = AsyncSessionLocal):
         self.db = db_session
-        self.llm_config = {
-            "model": "llama3.2:1b",
-            "api_key": "not-needed", 
-            "base_url": "http://127.0.0.1:4000" 
-        }
-
-    # Tool wrapper methods remain unchanged
-    async def _verify_user_trust_tool(self, user_id: int) -> str:
-        return await verify_user_trust(user_id, self.db)
+        # Batches are resolved on their own DB session, not on the session of the request that opened them.
+        self.session_factory = session_factory
+        # When set, progress through the pipeline is published as session lifecycle events.
+        self.session_id = session_id
+        self.llm_cache = llm_cache if settings.LLM_CACHE_ENABLED else None
 
-    async def _find_potential_mentors_tool(self, skill_name: str) -> str:
-        return await find_potential_mentors(skill_name, self.db)
+    def _publish_stage(self, stage: str) -> None:
+        if self.session_id is not None:
+            event_bus.publish(self.session_id, stage)
 
-    async def _save_session_summary_tool(self, session_id: int, summary_text: str) -> str:
-        return await save_session_summary(session_id, summary_text, self.db)
+    async def _llm_step(
+        self, step: str, deadline: float | None, run: Callable[[], Awaitable[dict]], fallback: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        """
+        Runs an LLM-backed step within what is left of the run's deadline. While the LLM circuit
+        breaker is open, or when the step overruns the deadline, the deterministic `fallback`
+        answers instead. Only failures the gateway sees at the endpoint feed the breaker; a
+        step cut short by this run's budget says nothing about the endpoint's health.
+        """
+        if llm_gateway.breaker.is_open():
+            reason = "circuit_open"
+        else:
+            budget = asyncio.timeout_at(deadline)
+            try:
+                async with budget:
+                    return await run()
+            except TimeoutError:
+                if not budget.expired():
+                    raise
+                reason = "deadline"
+            except CircuitOpenError:
+                reason = "circuit_open"
+        print(f"--- {step.capitalize()} falls back to the deterministic path ({reason}) ---")
+        fallbacks.inc(1, step, reason)
+        return await fallback()
 
-    async def initiate_matchmaking_flow(self, user_id: int, skill_name: str, request_details: str) -> dict:
-        # === STEP 1: VERIFICATION CONVERSATION ===
-        print("--- Kicking off Step 1: Verification ---")
-        trust_agent = create_trust_agent(llm_config=self.llm_config)
-        verification_proxy = autogen.UserProxyAgent(
-            name="VerificationProxy",
-            human_input_mode="NEVER",
-            code_execution_config=False,
-        )
-        verification_proxy.register_function(
-            function_map={"verify_user_trust": self._verify_user_trust_tool}
-        )
+    async def verify_user(self, user_id: int, deadline: float | None = None) -> dict:
+        """
+        Runs the trust gate and returns a structured verdict with a `status` of
+        VERIFIED, UNTRUSTWORTHY, NOT_FOUND or UNKNOWN plus human-readable `details`.
+        """
+        if settings.TRUST_VERIFICATION_MODE == "agent":
+            return await self._llm_step(
+                "verification", deadline,
+                lambda: self._verify_user_with_agent(user_id),
+                lambda: evaluate_user_trust(user_id, self.db),
+            )
+        return await evaluate_user_trust(user_id, self.db)
 
+    async def _verify_user_with_agent(self, user_id: int) -> dict:
+        """Opt-in fallback: asks the TrustAndVerificationAgent to relay the trust tool's verdict."""
         verification_prompt = f"Verify the trustworthiness of user with ID {user_id}. Use the tool."
-        await verification_proxy.a_initiate_chat(trust_agent, message=verification_prompt)
-        
-        verification_result = verification_proxy.last_message(trust_agent)["content"]
-        
+        async with agent_pool.lease("verification", db=self.db) as chat, metrics.span("agent.verification"):
+            await chat.proxy.a_initiate_chat(
+                chat.agent, message=verification_prompt, cache=self.llm_cache, max_turns=settings.AGENT_MAX_TURNS
+            )
+            verification_result = chat.proxy.last_message(chat.agent)["content"]
+
         if "UNTRUSTWORTHY" in verification_result:
-            print(f"--- Verification FAILED. Reason: {verification_result} ---")
-            return {"status": "FAILED", "reason": f"User is untrustworthy: {verification_result}"}
-        
+            return {"user_id": user_id, "status": "UNTRUSTWORTHY", "details": verification_result}
         if "VERIFIED" not in verification_result:
-             print(f"--- Verification FAILED. Unexpected response: {verification_result} ---")
-             return {"status": "FAILED", "reason": f"Verification failed with an unexpected agent response."}
+            return {"user_id": user_id, "status": "UNKNOWN", "details": verification_result}
+        return {"user_id": user_id, "status": "VERIFIED", "details": verification_result}
+
+    async def initiate_matchmaking_flow(self, user_id: int, skill_name: str, request_details: str) -> dict:
+        # Both steps share one ORCHESTRATOR_DEADLINE_SECONDS budget.
+        deadline = run_deadline()
+
+        # === STEP 1: VERIFICATION ===
+        print(f"--- Kicking off Step 1: Verification ({settings.TRUST_VERIFICATION_MODE}) ---")
+        self._publish_stage("verifying")
+        with metrics.span("orchestrator.verify"):
+            verdict = await self.verify_user(user_id, deadline)
+
+        if verdict["status"] == "UNTRUSTWORTHY":
+            print(f"--- Verification FAILED. Reason: {verdict['details']} ---")
+            return {"status": "FAILED", "reason": f"User is untrustworthy: {verdict['details']}", "verdict": verdict}
+
+        if verdict["status"] != "VERIFIED":
+            print(f"--- Verification FAILED. Verdict: {verdict} ---")
+            if verdict["status"] == "NOT_FOUND":
+                return {"status": "FAILED", "reason": "Verification failed: user does not exist.", "verdict": verdict}
+            return {"status": "FAILED", "reason": "Verification failed with an unexpected agent response.", "verdict": verdict}
 
         print("--- Verification SUCCEEDED ---")
 
-        # === STEP 2: MATCHMAKING CONVERSATION ===
-        print("--- Kicking off Step 2: Matchmaking ---")
-        matchmaking_agent = create_matchmaking_agent(llm_config=self.llm_config)
-        matchmaking_proxy = autogen.UserProxyAgent(
-            name="MatchmakingProxy",
-            human_input_mode="NEVER",
-            code_execution_config=False,
-        )
-        matchmaking_proxy.register_function(
-            function_map={"find_potential_mentors": self._find_potential_mentors_tool}
+        # === STEP 2: MATCHMAKING ===
+        self._publish_stage("matching")
+        with metrics.span("orchestrator.match"):
+            if settings.MATCHMAKING_MODE == "scoring" and settings.MATCHMAKING_LLM_RERANK_TOP_K <= 1:
+                return await self.match_scored(user_id, skill_name, request_details)
+            return await self._llm_step(
+                "matching", deadline,
+                lambda: self._match_with_llm(user_id, skill_name, request_details),
+                lambda: self.match_scored(user_id, skill_name, request_details, rerank=False),
+            )
+
+    async def _match_with_llm(self, user_id: int, skill_name: str, request_details: str) -> dict:
+        if settings.MATCHMAKING_MODE == "scoring":
+            return await self.match_scored(user_id, skill_name, request_details)
+        if settings.MATCHMAKING_MODE == "single_turn":
+            return await self.match_single_turn(skill_name, request_details)
+        if settings.MATCHMAKING_BATCH_WINDOW_MS > 0:
+            return await matchmaking_batcher.submit(skill_name, user_id, request_details, runner=self.match_batch)
+        return await self.match_single(skill_name, request_details)
+
+    async def match_scored(self, user_id: int, skill_name: str, request_details: str, rerank: bool = True) -> dict:
+        """
+        Ranks every eligible mentor with the vectorized scoring engine. The LLM is only
+        consulted to rerank the top MATCHMAKING_LLM_RERANK_TOP_K, and only when that is above 1
+        and `rerank` is set; without it this is the pipeline's deterministic fallback.
+        """
+        print("--- Kicking off Step 2: Scored matchmaking ---")
+        with metrics.span("scoring.load_features"):
+            features = await mentor_scorer.load_features(
+                self.db, skill_name, mentee_id=user_id, request_details=request_details
+            )
+        with metrics.span("scoring.rank"):
+            ranked = mentor_scorer.rank(features, limit=max(settings.MATCHMAKING_LLM_RERANK_TOP_K, 1) if rerank else 1)
+        if not ranked:
+            print(f"--- Matchmaking FAILED. No eligible mentors among {len(features)} candidates. ---")
+            return {"status": "FAILED", "reason": f"No mentors available for skill '{skill_name}'."}
+
+        best = ranked[0] if len(ranked) == 1 else await self._rerank(skill_name, request_details, ranked)
+        print(f"--- Matchmaking SUCCEEDED. Mentor ID: {best.id} (score {best.score}, {len(features)} candidates) ---")
+        return {"status": "SUCCESS", "mentor_id": best.id, "score": best.score}
+
+    async def _rerank(self, skill_name: str, request_details: str, ranked: List[ScoredMentor]) -> ScoredMentor:
+        """Lets the RerankAgent pick among the scored shortlist; any unusable reply keeps the engine's choice."""
+        prompt = (
+            f"Mentors for the skill '{skill_name}', best first:\n{json.dumps([asdict(mentor) for mentor in ranked])}\n"
+            f"The mentee's request details are: '{request_details}'.\n"
+            "Choose the best mentor and respond with the JSON."
         )
-        
+        try:
+            reply = await self._ask("rerank", prompt)
+        except Exception as exc:
+            print(f"--- Rerank failed ({exc!r}); keeping the scoring engine's choice ---")
+            return ranked[0]
+        choice = (extract_json_object(reply) or {}).get("best_mentor_id")
+        return next((mentor for mentor in ranked if str(mentor.id) == str(choice)), ranked[0])
+
+    async def match_single_turn(self, skill_name: str, request_details: str) -> dict:
+        """
+        Matchmaking in at most one LLM turn: the candidates are fetched in code and injected
+        into the prompt instead of being requested through a tool call, and the reply is
+        constrained to one of their IDs. A single candidate needs no LLM at all.
+        """
+        print("--- Kicking off Step 2: Single-turn matchmaking ---")
+        candidates = json.loads(await find_potential_mentors(skill_name, self.db, request_details))["mentors"]
+        if not candidates:
+            print("--- Matchmaking FAILED. No candidates. ---")
+            return {"status": "FAILED", "reason": f"No mentors available for skill '{skill_name}'."}
+        mentor_ids = [mentor["id"] for mentor in candidates]
+        mentor_id = mentor_ids[0] if len(mentor_ids) == 1 else await self._choose_mentor(skill_name, request_details, candidates)
+        print(f"--- Matchmaking SUCCEEDED. Mentor ID: {mentor_id} ({len(candidates)} candidates) ---")
+        return {"status": "SUCCESS", "mentor_id": mentor_id}
+
+    async def _choose_mentor(self, skill_name: str, request_details: str, candidates: List[dict]) -> int:
+        """
+        Asks for the best candidate; a reply that is not valid JSON with a listed ID gets up to
+        MATCHMAKING_JSON_REPAIR_ATTEMPTS corrective turns, after which the top candidate is kept
+        rather than failing the session.
+        """
+        mentor_ids = [mentor["id"] for mentor in candidates]
+        response_format = mentor_choice_format(mentor_ids)
+        params = {"response_format": response_format} if response_format else {}
+        messages = [
+            {"role": "system", "content": SINGLE_TURN_MATCHMAKING_SYSTEM_MESSAGE},
+            {"role": "user", "content": (
+                f"Candidate mentors for the skill '{skill_name}':\n{json.dumps(candidates)}\n"
+                f"The mentee's request details are: '{request_details}'.\n"
+                "Respond with the JSON for the best mentor."
+            )},
+        ]
+        for _ in range(settings.MATCHMAKING_JSON_REPAIR_ATTEMPTS + 1):
+            try:
+                reply = await self._complete(messages, **params)
+            except Exception as exc:
+                print(f"--- Single-turn matchmaking call failed ({exc!r}) ---")
+                break
+            mentor_id = chosen_mentor(reply, mentor_ids)
+            if mentor_id is not None:
+                return mentor_id
+            print(f"--- Unusable matchmaking reply, asking for a repair: {reply!r} ---")
+            messages += [
+                {"role": "assistant", "content": reply},
+                {"role": "user", "content": (
+                    f'That is not a valid answer. Respond with ONLY {{"best_mentor_id": <id>}}, where <id> is one of {mentor_ids}.'
+                )},
+            ]
+        print(f"--- No valid choice from the LLM; keeping the top candidate {mentor_ids[0]} ---")
+        return mentor_ids[0]
+
+    async def _complete(self, messages: List[dict], **params) -> str:
+        """Single-turn completion through the gateway, sharing the orchestrator's response cache."""
+        key = json.dumps({"model": llm_gateway.default_model, "messages": messages, **params}, sort_keys=True)
+        if self.llm_cache is not None:
+            cached = self.llm_cache.get(key)
+            if cached is not None:
+                return cached
+        reply = await llm_gateway.run(lambda: llm_gateway.chat(messages, **params))
+        if self.llm_cache is not None:
+            self.llm_cache.set(key, reply)
+        return reply
+
+    async def match_single(self, skill_name: str, request_details: str) -> dict:
+        """Runs the tool-using MatchmakingAgent conversation for one mentee."""
+        print("--- Kicking off Step 2: Matchmaking ---")
         matchmaking_prompt = (
             f"The user is verified. Now find a mentor for the skill '{skill_name}'. "
             f"The user's request details are: '{request_details}'. "
             "First, use the tool to find mentors. Then, analyze the list and respond with the JSON for the best mentor."
         )
-        await matchmaking_proxy.a_initiate_chat(matchmaking_agent, message=matchmaking_prompt)
-        
-        # Extract the final result from the matchmaking agent
-        final_message = matchmaking_proxy.last_message(matchmaking_agent)["content"]
+        async with agent_pool.lease("matchmaking", db=self.db, request_details=request_details) as chat, \
+                metrics.span("agent.matchmaking"):
+            await chat.proxy.a_initiate_chat(
+                chat.agent, message=matchmaking_prompt, cache=self.llm_cache, max_turns=settings.AGENT_MAX_TURNS
+            )
+            # Extract the final result from the matchmaking agent
+            final_message = chat.proxy.last_message(chat.agent)["content"]
         
         print(f"--- Matchmaking agent final response: {final_message} ---")
         if "best_mentor_id" in final_message:
             try:
-                json_str_match = re.search(r'{.*}', final_message)
-                if json_str_match:
-                    result_json = json.loads(json_str_match.group())
+                result_json = extract_json_object(final_message)
+                if result_json:
                     print(f"--- Matchmaking SUCCEEDED. Mentor ID: {result_json['best_mentor_id']} ---")
                     return {"status": "SUCCESS", "mentor_id": result_json["best_mentor_id"]}
-            except (json.JSONDecodeError, KeyError):
+            except KeyError:
                 pass # Fall through to failure case if JSON is invalid
 
         print("--- Matchmaking FAILED. Could not extract mentor ID. ---")
         return {"status": "FAILED", "reason": "Matchmaking agent did not return a valid mentor ID.", "last_message": final_message}
 
-    # The summary agent flow is already a simple two-agent chat, so it doesn't need this refactor.
-    async def facilitate_session_summary(self, session_id: int, transcript: str) -> dict:
-        summary_agent = create_summary_agent(llm_config=self.llm_config)
-        summary_proxy = autogen.UserProxyAgent(
-            name="SummaryProxy", human_input_mode="NEVER",
-            is_termination_msg=lambda x: "TERMINATE" in x.get("content", ""),
-            code_execution_config=False,
+    async def match_batch(self, skill_name: str, requests: List[MatchRequest]) -> List[dict]:
+        """
+        Resolves a coalesced batch of mentees asking for the same skill with one
+        candidate query and one ranking completion. Results are aligned with `requests`.
+        The batch outlives the request that opened it, so it runs on a DB session of its own
+        and under a deadline of its own.
+        """
+        async with self.session_factory() as db, asyncio.timeout_at(run_deadline()):
+            batch_orchestrator = MatchmakingOrchestrator(db, session_factory=self.session_factory)
+            return await batch_orchestrator._resolve_batch(skill_name, requests)
+
+    async def _resolve_batch(self, skill_name: str, requests: List[MatchRequest]) -> List[dict]:
+        if len(requests) == 1:
+            return [await self.match_single(skill_name, requests[0].request_details)]
+
+        print(f"--- Kicking off Step 2: Batch matchmaking for {len(requests)} mentees ---")
+        candidates = json.loads(await find_potential_mentors(skill_name, self.db))["mentors"]
+        if not candidates:
+            return [{"status": "FAILED", "reason": f"No mentors available for skill '{skill_name}'."} for _ in requests]
+
+        mentees = [
+            {"request": position, "user_id": request.user_id, "details": request.request_details}
+            for position, request in enumerate(requests)
+        ]
+        prompt = (
+            f"Mentors for the skill '{skill_name}':\n{json.dumps(candidates)}\n"
+            f"Mentee requests:\n{json.dumps(mentees)}\n"
+            "Assign the best mentor to every mentee request and respond with the JSON."
         )
-        summary_proxy.register_function(function_map={"save_session_summary": self._save_session_summary_tool})
+        reply = await self._ask("batch_matchmaking", prompt)
+        print(f"--- Batch matchmaking agent response: {reply} ---")
+
+        candidate_ids = {mentor["id"] for mentor in candidates}
+        assigned = {}
+        for assignment in (extract_json_object(reply) or {}).get("assignments", []):
+            try:
+                position, mentor_id = int(assignment["request"]), int(assignment["best_mentor_id"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if mentor_id in candidate_ids:
+                assigned[position] = mentor_id
+
+        return [
+            {"status": "SUCCESS", "mentor_id": assigned[position]}
+            if position in assigned
+            else {"status": "FAILED", "reason": "Matchmaking agent did not return a valid mentor ID.", "last_message": reply}
+            for position in range(len(requests))
+        ]
+
+    async def _ask(self, kind: str, prompt: str) -> str:
+        """Single completion from a pooled agent without a tool loop, sharing the orchestrator's response cache."""
+        async with agent_pool.lease(kind) as chat, metrics.span(f"agent.{kind}"):
+            chat.agent.client_cache = self.llm_cache
+            reply = await chat.agent.a_generate_reply(messages=[{"role": "user", "content": prompt}])
+        if isinstance(reply, dict):
+            reply = reply.get("content")
+        return reply or ""
+
+    async def facilitate_session_summary(self, session_id: int, transcript: str | None = None) -> dict:
+        """
+        Summarizes a session and saves the summary. Transcripts that fit
+        SUMMARY_SINGLE_SHOT_MAX_TOKENS go to the SummaryAgent as they are; longer ones are
+        first condensed chunk by chunk so the final prompt stays within the model's context.
+        A summary has no deterministic fallback: past the deadline it fails.
+        """
+        budget = asyncio.timeout_at(run_deadline())
+        try:
+            async with budget:
+                return await self._summarize(session_id, transcript)
+        except TimeoutError:
+            if not budget.expired():
+                raise
+            return {"status": "FAILED", "reason": "Summary did not finish within the deadline."}
+        except CircuitOpenError as exc:
+            return {"status": "FAILED", "reason": str(exc)}
+
+    async def _summarize(self, session_id: int, transcript: str | None) -> dict:
+        if transcript is None:
+            transcript = await TranscriptStore.read(self.db, session_id)
+        if estimate_tokens(transcript) <= settings.SUMMARY_SINGLE_SHOT_MAX_TOKENS:
+            material = f"Transcript:\n---\n{transcript}\n---\n"
+        else:
+            print(f"--- Condensing a ~{estimate_tokens(transcript)}-token transcript before summarizing ---")
+            summarizer = HierarchicalSummarizer(
+                ask=lambda prompt: self._ask("chunk_summary", prompt),
+                chunk_tokens=settings.SUMMARY_CHUNK_TOKENS,
+                concurrency=settings.SUMMARY_MAP_CONCURRENCY,
+            )
+            notes = await summarizer.reduce(transcript)
+            material = f"Notes on consecutive parts of the transcript, in order:\n---\n{notes}\n---\n"
+        return await self._run_summary_chat(session_id, material)
+
+    async def _run_summary_chat(self, session_id: int, material: str) -> dict:
         initial_prompt = (
             f"The mentorship session with ID {session_id} has concluded.\n"
-            f"Transcript:\n---\n{transcript}\n---\n"
+            f"{material}"
             "Generate a concise summary and use the `save_session_summary` tool to save it. "
             "After saving, confirm and TERMINATE."
         )
-        await summary_proxy.a_initiate_chat(summary_agent, message=initial_prompt)
-        last_message = summary_proxy.last_message(summary_agent)["content"]
+        async with agent_pool.lease("summary", db=self.db) as chat, metrics.span("agent.summary"):
+            await chat.proxy.a_initiate_chat(
+                chat.agent, message=initial_prompt, cache=self.llm_cache, max_turns=settings.AGENT_MAX_TURNS
+            )
+            last_message = chat.proxy.last_message(chat.agent)["content"]
         if "SUCCESS" in last_message or "saved" in last_message:
             return {"status": "SUCCESS", "message": "Summary saved."}
         else:
-            return {"status": "FAILED", "reason": "Agent failed to save summary.", "last_message": last_message}
\ No newline at end of file
+            return {"status": "FAILED", "reason": "Agent failed to save summary.", "last_message": last_message}
@@ -2,47 +2,76 @@ import json
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+from app.core.config import settings
+from app.core.metrics import metrics
 from app.db import models
+from app.services.mentor_embeddings import mentor_embeddings
+from app.services.mentor_index import mentor_index
+from app.services.skill_index import skill_name_filter
 
-async def verify_user_trust(user_id: int, db: AsyncSession) -> str:
-    """Verifies if a user's trust score meets the required threshold."""
+@metrics.timed("tool.evaluate_user_trust")
+async def evaluate_user_trust(user_id: int, db: AsyncSession) -> dict:
+    """Evaluates the trust policy for a user and returns a structured verdict."""
     query = select(models.User).where(models.User.id == user_id)
     result = await db.execute(query)
     user = result.scalar_one_or_none()
-    
+
     if user is None:
-        return json.dumps({"user_id": user_id, "status": "NOT_FOUND", "details": "User does not exist."})
-    
-    if user.trust_score < 30.0:
-        return json.dumps({"user_id": user_id, "status": "UNTRUSTWORTHY", "score": user.trust_score, "details": "User trust score is below the 30 point threshold."})
-    
-    return json.dumps({"user_id": user_id, "status": "VERIFIED", "score": user.trust_score, "details": "User is verified and in good standing."})
-
-async def find_potential_mentors(skill_name: str, db: AsyncSession) -> str:
-    """Finds suitable mentors for a given skill, prioritizing higher trust scores."""
-    query = (
-        select(models.User)
-        .options(selectinload(models.User.skills))
-        .join(models.User.skills)
-        .where(
-            models.Skill.name.ilike(f"%{skill_name}%"),
-            models.User.role.in_([models.UserRole.MENTOR, models.UserRole.BOTH]),
-            models.User.trust_score > 50
+        return {"user_id": user_id, "status": "NOT_FOUND", "details": "User does not exist."}
+
+    threshold = settings.TRUST_SCORE_THRESHOLD
+    if user.trust_score < threshold:
+        return {"user_id": user_id, "status": "UNTRUSTWORTHY", "score": user.trust_score, "details": f"User trust score is below the {threshold:g} point threshold."}
+
+    return {"user_id": user_id, "status": "VERIFIED", "score": user.trust_score, "details": "User is verified and in good standing."}
+
+async def verify_user_trust(user_id: int, db: AsyncSession) -> str:
+    """Verifies if a user's trust score meets the required threshold."""
+    return json.dumps(await evaluate_user_trust(user_id, db))
+
+@metrics.timed("tool.find_potential_mentors")
+async def find_potential_mentors(skill_name: str, db: AsyncSession, request_details: str | None = None) -> str:
+    """
+    Finds suitable mentors for a given skill, prioritizing higher trust scores. With request
+    details, the SEMANTIC_SHORTLIST_POOL most trusted are reordered by profile similarity first.
+    """
+    semantic = bool(request_details) and settings.SEMANTIC_MATCHING_ENABLED
+    pool_size = max(settings.SEMANTIC_SHORTLIST_POOL, 10) if semantic else 10
+    if settings.MENTOR_INDEX_ENABLED and mentor_index.ready:
+        mentors = mentor_index.top_mentors(skill_name, limit=pool_size, min_trust=50.0)
+    else:
+        query = (
+            select(models.User)
+            .options(selectinload(models.User.skills))
+            .join(models.User.skills)
+            .where(
+                skill_name_filter(skill_name),
+                models.User.role.in_([models.UserRole.MENTOR, models.UserRole.BOTH]),
+                models.User.trust_score > 50
+            )
+            .order_by(models.User.trust_score.desc())
+            .limit(pool_size)
         )
-        .order_by(models.User.trust_score.desc())
-        .limit(10)
-    )
-    
-    result = await db.execute(query)
-    mentors = result.scalars().unique().all()
-    
+
+        result = await db.execute(query)
+        mentors = result.scalars().unique().all()
+
     mentor_data = [
         {"id": mentor.id, "username": mentor.username, "trust_score": mentor.trust_score}
         for mentor in mentors
     ]
+    if semantic and len(mentor_data) > 1:
+        await mentor_embeddings.ensure_built(db)
+        query_vector = mentor_embeddings.embedder.embed(f"{skill_name}\n{request_details}")
+        similarity = mentor_embeddings.similarity(query_vector, (mentor["id"] for mentor in mentor_data))
+        for mentor, score in zip(mentor_data, similarity.tolist()):
+            mentor["similarity"] = round(score, 3)
+        # Stable sort: equally similar mentors keep their trust order.
+        mentor_data.sort(key=lambda mentor: -mentor["similarity"])
     
-    return json.dumps({"skill_name": skill_name, "mentors": mentor_data})
+    return json.dumps({"skill_name": skill_name, "mentors": mentor_data[:10]})
 
+@metrics.timed("tool.save_session_summary")
 async def save_session_summary(session_id: int, summary_text: str, db: AsyncSession) -> str:
     """Saves the generated summary and marks the mentorship session as completed."""
     query = select(models.MentorshipSession).where(models.MentorshipSession.id == session_id)
@@ -53,6 +82,8 @@ async def save_session_summary(session_id: int, summary_text: str, db: AsyncSess
         session.summary = summary_text
         session.status = models.SessionStatus.COMPLETED
         await db.commit()
+        if session.mentor_id is not None:
+            mentor_embeddings.add_note(session.mentor_id, summary_text)
         return json.dumps({"session_id": session_id, "status": "SUCCESS", "details": "Summary saved and session marked as COMPLETED."})
     else:
         return json.dumps({"session_id": session_id, "status": "ERROR", "details": "Session not found."})
\ No newline at end of file
@@ -1,9 +1,32 @@
 from autogen import ConversableAgent
 from typing import Dict, Any
+from app.agents.llm_gateway import GatewayModelClient, a_generate_gateway_reply
+
+def _llm_agent(name: str, system_message: str, llm_config: Dict[str, Any]) -> ConversableAgent:
+    """Builds an LLM-backed agent and attaches the gateway client when its config routes through it."""
+    agent = ConversableAgent(
+        name=name,
+        system_message=system_message,
+        llm_config=llm_config,
+        human_input_mode="NEVER",
+    )
+    if any(entry.get("model_client_cls") == GatewayModelClient.__name__ for entry in llm_config.get("config_list", [])):
+        agent.register_model_client(model_client_cls=GatewayModelClient)
+        agent.replace_reply_func(ConversableAgent.a_generate_oai_reply, a_generate_gateway_reply)
+    return agent
+
+# Single-turn matchmaking needs no agent: the candidates are fetched in code and put into the prompt.
+SINGLE_TURN_MATCHMAKING_SYSTEM_MESSAGE = """
+You are an Intelligent Matchmaking Agent. The mentee is already verified and the candidate mentors
+were already retrieved for you; they are listed in the message, most trusted first.
+Choose the single best mentor for the mentee's request, using only an ID from the list.
+You MUST respond with ONLY a JSON object like this: {"best_mentor_id": 123}.
+Do not add any other text or explanation. Just the JSON.
+"""
 
 def create_trust_agent(llm_config: Dict[str, Any]) -> ConversableAgent:
     """Creates the Trust & Verification Agent."""
-    return ConversableAgent(
+    return _llm_agent(
         name="TrustAndVerificationAgent",
         system_message="""
         You are a Trust and Verification Agent. Your ONLY job is to verify user trustworthiness.
@@ -14,12 +37,11 @@ def create_trust_agent(llm_config: Dict[str, Any]) -> ConversableAgent:
         After you give the status, the MatchmakingAgent will take over.
         """,
         llm_config=llm_config,
-        human_input_mode="NEVER",
     )
 
 def create_matchmaking_agent(llm_config: Dict[str, Any]) -> ConversableAgent:
     """Creates the Intelligent Matchmaking Agent."""
-    return ConversableAgent(
+    return _llm_agent(
         name="MatchmakingAgent",
         system_message="""
         You are an Intelligent Matchmaking Agent. Your purpose is to find the best mentor.
@@ -30,13 +52,54 @@ def create_matchmaking_agent(llm_config: Dict[str, Any]) -> ConversableAgent:
         Do not add any other text or explanation. Just the JSON. This is your final action.
         """,
         llm_config=llm_config,
-        human_input_mode="NEVER",
+    )
+
+def create_batch_matchmaking_agent(llm_config: Dict[str, Any]) -> ConversableAgent:
+    """Creates the Matchmaking Agent variant that assigns mentors to a batch of mentees at once."""
+    return _llm_agent(
+        name="BatchMatchmakingAgent",
+        system_message="""
+        You are an Intelligent Matchmaking Agent. All mentees below are already verified.
+        You receive a list of available mentors for one skill and a list of mentee requests.
+        Choose the single best mentor ID for EVERY mentee request, using only IDs from the mentor list.
+        Spread mentees across mentors when their requests are equally well served.
+        You MUST respond with ONLY a JSON object like this:
+        {"assignments": [{"request": 0, "best_mentor_id": 123}, {"request": 1, "best_mentor_id": 456}]}.
+        Do not add any other text or explanation. Just the JSON.
+        """,
+        llm_config=llm_config,
+    )
+
+def create_rerank_agent(llm_config: Dict[str, Any]) -> ConversableAgent:
+    """Creates the Matchmaking Agent variant that picks one mentor from a short, pre-scored list."""
+    return _llm_agent(
+        name="RerankAgent",
+        system_message="""
+        You are an Intelligent Matchmaking Agent. The mentee is already verified.
+        You receive the best few mentors for one skill, already ranked by a scoring engine, and the mentee's request.
+        Keep the engine's first choice unless another mentor clearly fits the request better.
+        You MUST respond with ONLY a JSON object containing one ID from the list, like this: {"best_mentor_id": 123}.
+        Do not add any other text or explanation. Just the JSON.
+        """,
+        llm_config=llm_config,
+    )
+
+def create_chunk_summary_agent(llm_config: Dict[str, Any]) -> ConversableAgent:
+    """Creates the agent that condenses one part of a long transcript for the SummaryAgent."""
+    return _llm_agent(
+        name="ChunkSummaryAgent",
+        system_message="""
+        You condense one part of a mentorship session transcript.
+        List the topics discussed, the mentor's advice and any next steps agreed on in this part.
+        Be brief and factual. Do not use tools. Do not add an introduction.
+        """,
+        llm_config=llm_config,
     )
 
 def create_summary_agent(llm_config: Dict[str, Any]) -> ConversableAgent:
     """Creates the Learning Summary Generation Agent."""
     # This agent is not part of the failing flow, but its prompt is already well-defined.
-    return ConversableAgent(
+    return _llm_agent(
         name="SummaryAgent",
         system_message="""
         You are the Learning Summary Generation Agent.
@@ -51,5 +114,4 @@ def create_summary_agent(llm_config: Dict[str, Any]) -> ConversableAgent:
         Respond with confirmation that the summary has been saved, then TERMINATE.
         """,
         llm_config=llm_config,
-        human_input_mode="NEVER",
     )
\ No newline at end of file
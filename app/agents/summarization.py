@@ -0,0 +1,72 @@
+from __future__ import annotations
+import asyncio
+from typing import Awaitable, Callable, List
+
+# A one-shot completion: prompt in, reply text out.
+Ask = Callable[[str], Awaitable[str]]
+
+# Rough size of a token for English chat text; close enough to budget a context window.
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def split_transcript(text: str, max_tokens: int) -> List[str]:
+    """Splits text into chunks of at most `max_tokens`, breaking on line boundaries where possible."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in text.splitlines(keepends=True):
+        # A single overlong line is cut into window-sized pieces.
+        pieces = [line[start:start + max_chars] for start in range(0, len(line), max_chars)] or [line]
+        for piece in pieces:
+            if current and size + len(piece) > max_chars:
+                chunks.append("".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+class HierarchicalSummarizer:
+    """
+    Map-reduce summarization for transcripts larger than the model's context.
+    The transcript is split into token-bounded chunks that are summarized concurrently
+    (at most `concurrency` completions in flight); if the concatenated partial summaries
+    are still larger than one chunk, they are summarized again, level by level.
+    """
+
+    def __init__(self, ask: Ask, chunk_tokens: int, concurrency: int, max_levels: int = 3):
+        self.ask = ask
+        self.chunk_tokens = chunk_tokens
+        self.concurrency = concurrency
+        self.max_levels = max_levels
+
+    async def reduce(self, text: str) -> str:
+        """Returns ordered notes covering the whole text, no larger than one chunk where achievable."""
+        for _ in range(self.max_levels):
+            if estimate_tokens(text) <= self.chunk_tokens:
+                break
+            notes = await self._map(split_transcript(text, self.chunk_tokens))
+            if len(notes) >= len(text):
+                # The model is not condensing; another level would not converge.
+                return notes
+            text = notes
+        return text
+
+    async def _map(self, chunks: List[str]) -> str:
+        gate = asyncio.Semaphore(self.concurrency)
+
+        async def summarize(position: int, chunk: str) -> str:
+            prompt = (
+                f"This is part {position + 1} of {len(chunks)} of a mentorship session transcript.\n"
+                f"---\n{chunk}\n---\n"
+                "Summarize this part."
+            )
+            async with gate:
+                return (await self.ask(prompt)).strip()
+
+        partials = await asyncio.gather(*(summarize(position, chunk) for position, chunk in enumerate(chunks)))
+        return "\n\n".join(f"Part {position + 1}: {partial}" for position, partial in enumerate(partials))
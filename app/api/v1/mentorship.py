@@ -1,14 +1,29 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import time
 import traceback
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from datetime import datetime
+from typing import AsyncGenerator, List, Sequence, Tuple
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.agents.orchestrator import MatchmakingOrchestrator
+from app.agents import import_agent_stack
+from app.core.config import settings
+from app.core.metrics import format_trace, metrics
 from app.db.database import AsyncSessionLocal, get_db_session
+from app.db.models import SessionStatus
+from app.db.write_serializer import status_writer
+from app.services.job_queue import QueueFullError, QueueUnavailableError, matchmaking_queue
 from app.services.session_manager import SessionManager
+from app.services.skill_index import skill_index
+from app.services.transcript_store import TranscriptStore
 
 router = APIRouter()
 
@@ -17,6 +32,54 @@ class MentorshipRequest(BaseModel):
     skill_name: str
     request_details: str
 
+class TranscriptAppend(BaseModel):
+    messages: List[str]
+
+class SessionView(BaseModel):
+    id: int
+    mentee_id: int
+    mentor_id: int | None
+    requested_skill_id: int
+    status: SessionStatus
+    failure_reason: str | None
+    created_at: datetime | None
+    scheduled_at: datetime | None
+
+class SessionPage(BaseModel):
+    items: List[SessionView]
+    next_cursor: str | None
+
+def encode_cursor(created_at: datetime, session_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{session_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(session_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+def rows_etag(rows: Sequence[Row]) -> str:
+    """Strong ETag over the raw rows, computed before anything is serialized."""
+    return '"' + hashlib.blake2b(repr([tuple(row) for row in rows]).encode(), digest_size=12).hexdigest() + '"'
+
+def not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+def cached_json(request: Request, rows: Sequence[Row], build) -> Response:
+    """304 if the client holds the rows' ETag; otherwise the body from `build()`, tagged and marked for revalidation."""
+    headers = {"ETag": rows_etag(rows), "Cache-Control": "no-cache"}
+    if not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build(), headers=headers)
+
+def session_view(row: Row) -> dict:
+    return SessionView.model_validate(row._asdict()).model_dump(mode="json")
+
 @asynccontextmanager
 async def get_task_db_session(
     db_session: AsyncSession | None,
@@ -31,6 +94,16 @@ async def get_task_db_session(
         async with AsyncSessionLocal() as new_session:
             yield new_session
 
+async def apply_status_update(db: AsyncSession | None, db_session: AsyncSession, transition, *args):
+    """
+    Applies a SessionManager transition. Tasks that own their DB session hand the write
+    to the shared write serializer so concurrent status updates commit together;
+    a caller-provided session (tests) is written to directly.
+    """
+    if db is None and settings.DB_WRITE_BATCH_WINDOW_MS > 0:
+        return await status_writer.submit(lambda session: transition(session, *args, commit=False))
+    return await transition(db_session, *args)
+
 async def run_matchmaking_background(
     session_id: int,
     user_id: int,
@@ -41,10 +114,12 @@ async def run_matchmaking_background(
     """
     Runs the AI agent matchmaking flow. It can now operate using a provided DB session for testing.
     """
-    async with get_task_db_session(db) as db_session:
+    async with get_task_db_session(db) as db_session, metrics.trace() as spans:
         print(f"\n--- ✅ BACKGROUND TASK STARTED for session_id: {session_id} ---")
+        started = time.perf_counter()
         try:
-            orchestrator = MatchmakingOrchestrator(db_session=db_session)
+            agents = await import_agent_stack()
+            orchestrator = agents.MatchmakingOrchestrator(db_session=db_session, session_id=session_id)
             result = await orchestrator.initiate_matchmaking_flow(
                 user_id=user_id,
                 skill_name=skill_name,
@@ -54,35 +129,61 @@ async def run_matchmaking_background(
 
             if result and result.get("status") == "SUCCESS":
                 mentor_id = result.get("mentor_id")
-                await SessionManager.assign_mentor_to_session(db_session, session_id, mentor_id)
+                await apply_status_update(db, db_session, SessionManager.assign_mentor_to_session, session_id, mentor_id)
             else:
                 reason = result.get("reason", "No reason provided.")
-                await SessionManager.mark_session_failed(db_session, session_id, reason)
+                await apply_status_update(db, db_session, SessionManager.mark_session_failed, session_id, reason)
 
+        except asyncio.CancelledError:
+            print(f"--- Matchmaking for session_id {session_id} was cancelled ---")
+            raise
         except Exception:
             traceback.print_exc()
-            await SessionManager.mark_session_failed(
-                db_session, session_id, "An unexpected internal error occurred."
+            await apply_status_update(
+                db, db_session, SessionManager.mark_session_failed, session_id, "An unexpected internal error occurred."
             )
         finally:
+            if spans is not None:
+                metrics.record("matchmaking.total", time.perf_counter() - started)
+                print(f"--- Stage timings for session_id {session_id}: {format_trace(spans)} ---")
             print(f"--- ⏹️ BACKGROUND TASK FINISHED for session_id: {session_id} ---\n")
 
+async def ensure_queue_capacity(db: AsyncSession) -> None:
+    """Translates queue backpressure into 429/503 responses before any row is written."""
+    try:
+        await matchmaking_queue.check_capacity(db)
+    except QueueFullError as exc:
+        raise HTTPException(
+            status_code=429,
+            detail=str(exc),
+            headers={"Retry-After": str(settings.MATCHMAKING_QUEUE_RETRY_AFTER_SECONDS)},
+        )
+    except QueueUnavailableError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(settings.MATCHMAKING_QUEUE_RETRY_AFTER_SECONDS)},
+        )
+
 @router.post("/mentorship-requests", status_code=202)
 async def request_mentorship(
     request: MentorshipRequest,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db_session),
 ):
+    await ensure_queue_capacity(db)
+
     skill = await SessionManager.get_skill_by_name(db, request.skill_name)
     if not skill:
+        suggestions = [match.name for match in skill_index.fuzzy(request.skill_name, limit=3)] if skill_index.ready else []
+        hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
         raise HTTPException(
-            status_code=404, detail=f"Skill '{request.skill_name}' not found."
+            status_code=404, detail=f"Skill '{request.skill_name}' not found.{hint}"
         )
 
-    session = await SessionManager.create_session_request(db, request.user_id, skill.id)
-    
-    background_tasks.add_task(
-        run_matchmaking_background,
+    # The session row and its job are committed together by enqueue().
+    session = await SessionManager.create_session_request(db, request.user_id, skill.id, commit=False)
+    await matchmaking_queue.enqueue(
+        db,
         session.id,
         request.user_id,
         request.skill_name,
@@ -92,4 +193,77 @@ async def request_mentorship(
     return {
         "message": "Matchmaking request received and is being processed.",
         "session_id": session.id,
-    }
\ No newline at end of file
+    }
+
+@router.get("/mentorship-queue")
+async def get_queue_stats(db: AsyncSession = Depends(get_db_session)):
+    """Reports the matchmaking queue depth and worker utilisation."""
+    return {**matchmaking_queue.stats(), "queued": await matchmaking_queue.pending_jobs(db)}
+
+async def get_existing_session(session_id: int, db: AsyncSession):
+    session = await SessionManager.get_session_by_id(db, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found.")
+    return session
+
+@router.get("/mentorship-sessions", response_model=SessionPage)
+async def list_mentorship_sessions(
+    request: Request,
+    mentee_id: int | None = None,
+    mentor_id: int | None = None,
+    status: SessionStatus | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Lists sessions newest first, filtered by mentee, mentor and/or status. Pages are keyset
+    based: pass the returned `next_cursor` back as `cursor`. A page the client already holds
+    (If-None-Match) is answered with a 304 and no body.
+    """
+    before = decode_cursor(cursor) if cursor else None
+    # One extra row tells whether there is a next page.
+    rows = await SessionManager.list_sessions(
+        db, mentee_id=mentee_id, mentor_id=mentor_id, status=status, before=before, limit=limit + 1
+    )
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    return cached_json(request, rows, lambda: {"items": [session_view(row) for row in page], "next_cursor": next_cursor})
+
+@router.get("/mentorship-sessions/{session_id}", response_model=SessionView)
+async def get_mentorship_session(session_id: int, request: Request, db: AsyncSession = Depends(get_db_session)):
+    """One session without its transcript or summary; polling an unchanged session costs a 304."""
+    row = await SessionManager.get_session_view(db, session_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found.")
+    return cached_json(request, [row], lambda: session_view(row))
+
+@router.post("/mentorship-sessions/{session_id}/cancel")
+async def cancel_mentorship_session(session_id: int, db: AsyncSession = Depends(get_db_session)):
+    """Cancels a pending session: its queued job is withdrawn and an in-flight agent run is aborted."""
+    session = await SessionManager.cancel_session(db, session_id, commit=False)
+    if session is None:
+        existing = await get_existing_session(session_id, db)
+        raise HTTPException(
+            status_code=409,
+            detail=f"Session {session_id} is {existing.status.value}; only pending sessions can be cancelled.",
+        )
+    aborted = await matchmaking_queue.cancel(db, session_id)
+    return {"session_id": session_id, "status": session.status.value, "run_aborted": aborted}
+
+@router.post("/mentorship-sessions/{session_id}/transcript", status_code=201)
+async def append_transcript(
+    session_id: int,
+    payload: TranscriptAppend,
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Appends messages to a session transcript without rewriting what is already stored."""
+    await get_existing_session(session_id, db)
+    chunks = await TranscriptStore.append(db, session_id, payload.messages)
+    return {"session_id": session_id, "messages": len(payload.messages), "chunks": chunks}
+
+@router.get("/mentorship-sessions/{session_id}/transcript")
+async def read_transcript(session_id: int, db: AsyncSession = Depends(get_db_session)):
+    """Streams a session transcript as plain text, one decompressed chunk at a time."""
+    await get_existing_session(session_id, db)
+    return StreamingResponse(TranscriptStore.stream(db, session_id), media_type="text/plain")
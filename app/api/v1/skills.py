@@ -0,0 +1,39 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.database import get_db_session
+from app.db.models import Skill
+from app.services.skill_index import skill_index
+
+router = APIRouter()
+
+class SkillSuggestion(BaseModel):
+    id: int
+    name: str
+    score: float
+
+@router.get("/skills/autocomplete", response_model=List[SkillSuggestion])
+async def autocomplete_skills(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Suggests skills for a partially typed name: alias targets and prefix completions first,
+    then fuzzy (trigram) matches, so "pyth", "py" and "pyhton" all suggest Python.
+    """
+    if settings.SKILL_INDEX_ENABLED and skill_index.ready:
+        return skill_index.autocomplete(q, limit=limit)
+    result = await db.execute(
+        select(Skill.id, Skill.name)
+        .where(Skill.name.ilike(f"{q.strip()}%"))
+        .order_by(func.length(Skill.name), Skill.name)
+        .limit(limit)
+    )
+    return [SkillSuggestion(id=skill_id, name=name, score=1.0) for skill_id, name in result.all()]
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response
 from pydantic import BaseModel, EmailStr
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,7 +11,11 @@ from sqlalchemy.orm import selectinload
 
 from app.db.database import get_db_session
 from app.db.models import User, UserRole, Skill
-from app.core.security import Hasher
+from app.core.security import async_hasher
+from app.services.mentor_index import mentor_index
+from app.services.session_manager import SessionManager
+from app.services.skill_index import index_after_commit
+from app.services.user_importer import UserImporter, iter_lines, parse_rows
 
 router = APIRouter()
 
@@ -42,19 +48,20 @@ async def register_user(
     new_user = User(
         username=user_data.username,
         email=user_data.email,
-        hashed_password=Hasher.get_password_hash(user_data.password),
+        hashed_password=await async_hasher.hash(user_data.password),
         role=user_data.role
     )
 
     if user_data.skills:
         for skill_name in user_data.skills:
-            result = await db.execute(select(Skill).where(Skill.name.ilike(skill_name)))
-            skill = result.scalar_one_or_none()
+            skill = await SessionManager.get_skill_by_name(db, skill_name)
             if not skill:
                 skill = Skill(name=skill_name.strip(), domain="Uncategorized")
                 db.add(skill)
                 await db.flush()
-            new_user.skills.append(skill)
+                index_after_commit(db, skill.id, skill.name)
+            if skill not in new_user.skills:
+                new_user.skills.append(skill)
             
     db.add(new_user)
     try:
@@ -66,6 +73,7 @@ async def register_user(
             select(User).options(selectinload(User.skills)).where(User.id == new_user.id)
         )
         final_user = result.scalar_one()
+        mentor_index.index_user(final_user)
         return final_user
 
     except IntegrityError:
@@ -73,4 +81,24 @@ async def register_user(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username or email already exists."
-        )
\ No newline at end of file
+        )
+
+@router.post("/users/bulk-register")
+async def bulk_register_users(
+    request: Request,
+    batch_size: int = 500,
+    db: AsyncSession = Depends(get_db_session)
+):
+    """
+    Registers many users from a JSONL body (one UserCreate object per line) or a CSV body
+    (Content-Type: text/csv, header row, ';'-separated skills). Returns an NDJSON report
+    with one line per input row.
+    """
+    fmt = "csv" if "csv" in request.headers.get("content-type", "") else "jsonl"
+    # The upload is parsed and imported batch by batch as its chunks arrive; only the report is kept.
+    rows = parse_rows(iter_lines(request.stream()), UserCreate, fmt)
+    report_lines = [
+        json.dumps(report) + "\n"
+        async for report in UserImporter.import_users(db, rows, batch_size=max(1, batch_size))
+    ]
+    return Response("".join(report_lines), media_type="application/x-ndjson")
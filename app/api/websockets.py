@@ -1,24 +1,162 @@
 # app/api/websockets.py
+import asyncio
 from fastapi import WebSocket
-from typing import List, Dict
+from typing import Any, List, Dict, Set
+from app.core.config import settings
+from app.services.broker import Broker, broker as default_broker
+from app.services.event_bus import SessionEvent, SessionEventBus, event_bus as default_event_bus
+
+CHAT_CHANNEL = "chat"
+
+# Pushed into a connection's queue to stop its sender task.
+_CLOSE = object()
+
+class _Connection:
+    """One WebSocket with its own bounded send queue, drained by a dedicated sender task."""
+
+    def __init__(self, websocket: WebSocket, manager: "ConnectionManager"):
+        self.websocket = websocket
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE_SIZE)
+        self.closed = False
+        self.coalesced = 0
+        self.sender = asyncio.create_task(self._send_loop(manager))
+
+    def offer(self, message: Any, manager: "ConnectionManager") -> None:
+        """Queues a message without blocking; a full queue triggers the slow-consumer policy."""
+        if self.closed or self.loop.is_closed():
+            return
+        try:
+            same_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            same_loop = False
+        if not same_loop:
+            self.loop.call_soon_threadsafe(self.offer, message, manager)
+            return
+        if self.queue.full():
+            if settings.WS_SLOW_CONSUMER_POLICY == "drop":
+                manager.drop(self, reason="send queue overflow")
+                return
+            # Coalesce: the oldest undelivered message is superseded by the newest one.
+            self.queue.get_nowait()
+            self.coalesced += 1
+        self.queue.put_nowait(message)
+
+    def close(self) -> None:
+        """Stops the sender after any send in flight; undelivered messages are discarded."""
+        if self.closed:
+            return
+        self.closed = True
+        if self.loop.is_closed():
+            return
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_CLOSE)
+
+    async def _send_loop(self, manager: "ConnectionManager"):
+        while True:
+            message = await self.queue.get()
+            if message is _CLOSE:
+                return
+            try:
+                async with asyncio.timeout(settings.WS_SEND_TIMEOUT_SECONDS):
+                    if isinstance(message, str):
+                        await self.websocket.send_text(message)
+                    else:
+                        await self.websocket.send_json(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                manager.drop(self, reason="send failed or timed out")
+                return
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, List[WebSocket]] = {}
+    """
+    Tracks the sockets of each session on this worker. Broadcasts go through the broker so
+    sockets held by other workers receive them too; local fan-out only enqueues, so one
+    slow or dead client never delays the others.
+    """
+
+    def __init__(self, broker: Broker | None = None, event_bus: SessionEventBus | None = None):
+        self.active_connections: Dict[str, List[_Connection]] = {}
+        self.dropped = 0
+        # Strong references to socket closes in flight; the event loop only keeps weak ones.
+        self._closing: Set[asyncio.Task] = set()
+        self._broker = broker or default_broker
+        self._event_bus = event_bus or default_event_bus
+        self._broker.subscribe(CHAT_CHANNEL, self._on_chat_message)
+        self._event_bus.add_listener(self._on_session_event)
 
     async def connect(self, websocket: WebSocket, session_id: str):
         await websocket.accept()
-        if session_id not in self.active_connections:
-            self.active_connections[session_id] = []
-        self.active_connections[session_id].append(websocket)
+        connection = _Connection(websocket, self)
+        if session_id.isdigit():
+            for event in self._event_bus.history(int(session_id)):
+                connection.offer(event.model_dump(mode="json"), self)
+        self.active_connections.setdefault(session_id, []).append(connection)
 
     def disconnect(self, websocket: WebSocket, session_id: str):
-        if session_id in self.active_connections:
-            self.active_connections[session_id].remove(websocket)
+        for connection in list(self.active_connections.get(session_id, [])):
+            if connection.websocket is websocket:
+                self._remove(session_id, connection)
+
+    def drop(self, connection: _Connection, reason: str):
+        """Evicts a slow or dead consumer and closes its socket in the background."""
+        for session_id, connections in list(self.active_connections.items()):
+            if connection in connections:
+                self._remove(session_id, connection)
+                self.dropped += 1
+                print(f"--- Dropped WebSocket client of session {session_id}: {reason} ---")
+                task = asyncio.ensure_future(self._close_quietly(connection.websocket))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+
+    def _remove(self, session_id: str, connection: _Connection):
+        connections = self.active_connections.get(session_id, [])
+        if connection in connections:
+            connections.remove(connection)
+            if not connections:
+                del self.active_connections[session_id]
+        connection.close()
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    async def close(self):
+        """Unsubscribes from the broker and event bus and stops every sender task."""
+        self._broker.unsubscribe(CHAT_CHANNEL, self._on_chat_message)
+        self._event_bus.remove_listener(self._on_session_event)
+        connections = [connection for group in self.active_connections.values() for connection in group]
+        self.active_connections = {}
+        for connection in connections:
+            connection.close()
+        # A sender stuck in a stalled send would otherwise wait out WS_SEND_TIMEOUT_SECONDS.
+        for connection in connections:
+            connection.sender.cancel()
+        await asyncio.gather(*(connection.sender for connection in connections), *self._closing, return_exceptions=True)
 
     async def broadcast(self, message: str, session_id: str):
-        if session_id in self.active_connections:
-            for connection in self.active_connections[session_id]:
-                await connection.send_text(message)
+        self._broker.publish(CHAT_CHANNEL, {"session_id": session_id, "text": message})
+
+    def fan_out(self, session_id: str, message: Any):
+        for connection in list(self.active_connections.get(session_id, [])):
+            connection.offer(message, self)
+
+    def _on_chat_message(self, message: dict):
+        self.fan_out(message["session_id"], message["text"])
+
+    def _on_session_event(self, event: SessionEvent):
+        self.fan_out(str(event.session_id), event.model_dump(mode="json"))
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self.active_connections),
+            "connections": sum(len(connections) for connections in self.active_connections.values()),
+            "dropped": self.dropped,
+        }
 
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager()
@@ -0,0 +1,60 @@
+"""
+Command-line utilities.
+
+    python -m app.cli import-users cohort.jsonl
+    python -m app.cli import-users cohort.csv --format csv --batch-size 1000
+
+Reports are written to stdout as JSON lines, one per input row; a summary goes to stderr.
+A running API process picks up imported mentors in its mentor index on its next restart.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import AsyncIterator
+from app.api.v1.users import UserCreate
+from app.db.database import AsyncSessionLocal, engine, ensure_schema
+from app.services.user_importer import UserImporter, parse_rows
+
+async def _read_lines(path: str) -> AsyncIterator[str]:
+    handle = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+    try:
+        for line in handle:
+            yield line.rstrip("\r\n")
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+async def import_users(path: str, fmt: str, batch_size: int) -> int:
+    await ensure_schema(engine)
+
+    created = failed = 0
+    async with AsyncSessionLocal() as db:
+        rows = parse_rows(_read_lines(path), UserCreate, fmt)
+        async for report in UserImporter.import_users(db, rows, batch_size=batch_size):
+            if report["status"] == "created":
+                created += 1
+            else:
+                failed += 1
+            print(json.dumps(report), flush=True)
+    await engine.dispose()
+    print(f"Imported {created} user(s); {failed} row(s) rejected.", file=sys.stderr)
+    return 1 if failed else 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import-users", help="Bulk-register users from a JSONL or CSV file ('-' for stdin).")
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=["jsonl", "csv"], default=None, help="Defaults to the file extension.")
+    importer.add_argument("--batch-size", type=int, default=500)
+
+    args = parser.parse_args(argv)
+    if args.command == "import-users":
+        fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "jsonl")
+        return asyncio.run(import_users(args.path, fmt, max(1, args.batch_size)))
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 import os
 from functools import lru_cache
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -9,6 +9,21 @@ load_dotenv()
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Skill-Exchange Mentor Network"
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./skill_exchange.db")
+
+    # Storage profile. "production" enables WAL and the pragmas below; "default" keeps SQLite's defaults.
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    SQLITE_STORAGE_PROFILE: str = "production"
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE_MB: int = 256
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # Status updates from background tasks are committed together within this window (0 disables).
+    DB_WRITE_BATCH_WINDOW_MS: int = 5
+    DB_WRITE_BATCH_MAX_SIZE: int = 100
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
 
     SECRET_KEY: str = "a_very_secret_key_for_jwt_in_the_future"
@@ -16,6 +31,135 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
     PWD_CONTEXT_SCHEMES: List[str] = ["bcrypt"]
+    # bcrypt runs off the event loop on a "thread" or "process" pool of this size.
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # LLM gateway shared by all agents: one keep-alive connection pool to the LiteLLM proxy, per-model
+    # concurrency caps (LLM_MODEL_CONCURRENCY overrides the default per model), an optional token-bucket
+    # rate limit (0 disables) and jittered exponential retries.
+    LLM_MODEL: str = "llama3.2:1b"
+    LLM_BASE_URL: str = "http://127.0.0.1:4000"
+    LLM_API_KEY: str = "not-needed"
+    LLM_TIMEOUT_SECONDS: float = 120.0
+    LLM_MAX_CONNECTIONS: int = 32
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 16
+    LLM_MAX_CONCURRENCY_PER_MODEL: int = 4
+    LLM_MODEL_CONCURRENCY: Dict[str, int] = {}
+    LLM_RATE_LIMIT_PER_SECOND: float = 0.0
+    LLM_RATE_LIMIT_BURST: float = 4.0
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BASE_SECONDS: float = 0.5
+    LLM_RETRY_MAX_SECONDS: float = 8.0
+    # Completions run on a thread pool of their own, never on the event loop's default executor.
+    LLM_EXECUTOR_THREADS: int = 32
+    # Circuit breaker: after LLM_BREAKER_FAILURE_THRESHOLD consecutive failed completions (0 disables) the endpoint
+    # is skipped for LLM_BREAKER_RESET_SECONDS and matchmaking uses its deterministic fallback; then one probe is let through.
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Prebuilt agents kept idle per agent kind for reuse across requests; PREWARM builds that many per kind at startup.
+    AGENT_POOL_MAX_IDLE: int = 8
+    AGENT_POOL_PREWARM: int = 1
+    # Budget for one orchestrator run (matchmaking or summary) in seconds (0 disables); LLM steps that overrun it
+    # fall back to deterministic verification and ranking. Tool chats stop after AGENT_MAX_TURNS turns.
+    ORCHESTRATOR_DEADLINE_SECONDS: float = 180.0
+    AGENT_MAX_TURNS: int = 4
+
+    # "deterministic" evaluates the trust policy in code; "agent" runs the TrustAndVerificationAgent chat.
+    TRUST_VERIFICATION_MODE: str = "deterministic"
+    TRUST_SCORE_THRESHOLD: float = 30.0
+
+    # Serve find_potential_mentors from the in-memory skill -> mentor index built at startup.
+    MENTOR_INDEX_ENABLED: bool = True
+
+    # In-memory skill name index (canonical names, trigrams) for lookups, substring search and autocomplete.
+    # Spelling variants listed in SKILL_ALIASES collapse onto one skill.
+    SKILL_INDEX_ENABLED: bool = True
+    SKILL_FUZZY_MIN_SIMILARITY: float = 0.4
+    SKILL_ALIASES: Dict[str, str] = {
+        "py": "python", "python3": "python", "python 3": "python", "js": "javascript", "ts": "typescript",
+        "golang": "go", "k8s": "kubernetes", "postgres": "postgresql", "ml": "machine learning",
+    }
+
+    # "scoring" ranks mentors with the vectorized MentorScorer; "agent" lets the MatchmakingAgent pick from the tool's list;
+    # "single_turn" fetches the candidates in code and asks the LLM once for {"best_mentor_id": ...}.
+    # With scoring, MATCHMAKING_LLM_RERANK_TOP_K > 1 asks the LLM to choose among the best K (0 never calls the LLM).
+    MATCHMAKING_MODE: str = "scoring"
+    MATCHMAKING_LLM_RERANK_TOP_K: int = 0
+    # Single-turn output constraint: "json_schema" (best_mentor_id limited to the candidate IDs), "json_object",
+    # or "none" for endpoints without response_format. An invalid reply gets this many corrective turns.
+    MATCHMAKING_RESPONSE_FORMAT: str = "json_schema"
+    MATCHMAKING_JSON_REPAIR_ATTEMPTS: int = 1
+    MENTOR_SCORE_WEIGHTS: Dict[str, float] = {"trust": 1.0, "overlap": 0.5, "load": 0.6, "recency": 0.2, "semantic": 0.5}
+    MENTOR_MAX_ACTIVE_SESSIONS: int = 5
+    MENTOR_RECENCY_HALF_LIFE_DAYS: float = 14.0
+
+    # Stage spans and histograms served by /metrics. Below 1.0, METRICS_SAMPLE_RATE times only that
+    # share of matchmaking runs; LLM latency and token counters are always recorded.
+    METRICS_ENABLED: bool = True
+    METRICS_SAMPLE_RATE: float = 1.0
+    # Event-loop lag probe period in seconds (0 disables it).
+    EVENT_LOOP_LAG_PROBE_SECONDS: float = 0.25
+
+    # Offline hashing embeddings of mentor profiles (skills + latest session summaries) matched against
+    # request_details; the agent's mentor tool shortlists its top 10 from SEMANTIC_SHORTLIST_POOL by similarity.
+    SEMANTIC_MATCHING_ENABLED: bool = True
+    SEMANTIC_EMBEDDING_DIM: int = 512
+    SEMANTIC_PROFILE_SUMMARIES: int = 3
+    SEMANTIC_PROFILE_SUMMARY_CHARS: int = 2000
+    SEMANTIC_SHORTLIST_POOL: int = 50
+
+    # Every BATCH_ASSIGN_INTERVAL_SECONDS (0 disables), up to BATCH_ASSIGN_MAX_SESSIONS queued PENDING
+    # sessions are matched together by a capacity-constrained min-cost assignment.
+    BATCH_ASSIGN_INTERVAL_SECONDS: float = 0.0
+    BATCH_ASSIGN_MAX_SESSIONS: int = 500
+    # Only the worker process holding the assigner lease runs it; a lease not renewed for this long is taken over.
+    BATCH_ASSIGN_LEASE_SECONDS: float = 30.0
+
+    # Matchmaking job queue. 0 workers runs this process as a producer only; jobs stay queued in the DB for
+    # the workers of any process, which poll for them every MATCHMAKING_QUEUE_POLL_SECONDS. A RUNNING job
+    # whose worker has not renewed it for MATCHMAKING_JOB_LEASE_SECONDS is considered dead and re-queued.
+    MATCHMAKING_WORKERS: int = 4
+    MATCHMAKING_QUEUE_MAX_PENDING: int = 200
+    MATCHMAKING_QUEUE_RETRY_AFTER_SECONDS: int = 5
+    MATCHMAKING_QUEUE_POLL_SECONDS: float = 1.0
+    MATCHMAKING_JOB_LEASE_SECONDS: float = 60.0
+
+    # LLM response cache shared by all agent chats. An empty path keeps it in memory only.
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 512
+    LLM_CACHE_TTL_SECONDS: float = 3600.0
+    LLM_CACHE_SQLITE_PATH: str = ""
+
+    # Concurrent requests for the same skill within this window share one candidate query and LLM call (0 disables).
+    MATCHMAKING_BATCH_WINDOW_MS: int = 50
+    MATCHMAKING_BATCH_MAX_SIZE: int = 16
+
+    # Session lifecycle events: per-session replay buffer and number of sessions tracked.
+    SESSION_EVENT_HISTORY_SIZE: int = 16
+    SESSION_EVENT_MAX_SESSIONS: int = 1024
+
+    # WebSocket fan-out. Slow consumers are either "coalesce"d (oldest queued message dropped) or "drop"ped.
+    WS_SEND_QUEUE_SIZE: int = 64
+    WS_SEND_TIMEOUT_SECONDS: float = 5.0
+    WS_SLOW_CONSUMER_POLICY: str = "coalesce"
+    # "memory" for a single worker; "sqlite" carries broadcasts across uvicorn workers via the shared DB.
+    BROADCAST_BROKER: str = "memory"
+    BROADCAST_POLL_INTERVAL_MS: int = 50
+    BROADCAST_RETENTION_SECONDS: float = 60.0
+    # Unwritten broadcasts kept for retry while the DB is unavailable; the oldest beyond this are dropped.
+    BROADCAST_OUTBOX_MAX: int = 10000
+
+    # Session transcripts are appended as zlib chunks of at most this many uncompressed bytes.
+    TRANSCRIPT_CHUNK_MAX_BYTES: int = 65536
+    TRANSCRIPT_COMPRESSION_LEVEL: int = 6
+
+    # Transcripts above SUMMARY_SINGLE_SHOT_MAX_TOKENS are summarized map-reduce style in chunks of
+    # SUMMARY_CHUNK_TOKENS, with at most SUMMARY_MAP_CONCURRENCY chunk completions in flight.
+    SUMMARY_SINGLE_SHOT_MAX_TOKENS: int = 3000
+    SUMMARY_CHUNK_TOKENS: int = 1500
+    SUMMARY_MAP_CONCURRENCY: int = 4
 
     class Config:
         env_file = ".env"
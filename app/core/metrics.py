@@ -0,0 +1,272 @@
+"""
+In-process metrics for the matchmaking pipeline, served in the Prometheus text format by /metrics.
+
+Spans time a named stage (an orchestrator step, an agent chat, an LLM completion, a tool,
+a SessionManager write) into one histogram labelled by span name. With a METRICS_SAMPLE_RATE
+below 1 only that share of traces is timed; an unsampled span is a shared no-op object, so
+the hot path pays one random() call per trace. LLM latency and token counts are always
+recorded: a completion costs far more than the bookkeeping.
+Everything is guarded by locks: LLM completions are recorded from executor threads.
+"""
+from __future__ import annotations
+import asyncio
+import bisect
+import functools
+import math
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Sequence, Tuple
+from app.core.config import settings
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, label_values)} {_number(value)}")
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label combination."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: bucket counts (the last one is +Inf), sum, count.
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+            series[0][position] += 1
+            series[1][0] += value
+            series[1][1] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return int(series[1][1]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, (total, count)) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                    cumulative += bucket_count
+                    le = f'le="{_number(bound)}"'
+                    lines.append(f"{self.name}_bucket{_labels(self.labels, label_values, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, label_values)} {_number(round(total, 6))}")
+                lines.append(f"{self.name}_count{_labels(self.labels, label_values)} {int(count)}")
+        return lines
+
+class _Span:
+    __slots__ = ("registry", "name", "started")
+
+    def __init__(self, registry: "MetricsRegistry", name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.registry.record(self.name, time.perf_counter() - self.started, failed=exc_type is not None)
+
+    # Usable in `async with` next to async context managers too.
+    async def __aenter__(self) -> "_Span":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    async def __aenter__(self) -> "_NoopSpan":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
+_NOOP_SPAN = _NoopSpan()
+# The spans of the current trace: a list when it is sampled, False when it is not, None outside any trace.
+_current_trace: ContextVar[List[Tuple[str, float]] | bool | None] = ContextVar("metrics_trace", default=None)
+
+class _Trace:
+    __slots__ = ("spans", "token")
+
+    def __init__(self, spans: List[Tuple[str, float]] | bool):
+        self.spans = spans
+
+    def __enter__(self) -> List[Tuple[str, float]] | None:
+        self.token = _current_trace.set(self.spans)
+        return self.spans if self.spans is not False else None
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_trace.reset(self.token)
+
+    async def __aenter__(self) -> List[Tuple[str, float]] | None:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True, sample_rate: float = 1.0, prefix: str = "skill_exchange"):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.prefix = prefix
+        self._metrics: Dict[str, Counter | Histogram] = {}
+        self.span_seconds = self.histogram("span_seconds", "Wall-clock seconds per pipeline stage.", ("span",))
+        self.span_errors = self.counter("span_errors_total", "Stages that ended with an exception.", ("span",))
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(f"{self.prefix}_{name}", help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(f"{self.prefix}_{name}", help_text, labels, buckets))
+
+    def _register(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def _sampled(self) -> bool:
+        return self.enabled and (self.sample_rate >= 1.0 or random.random() < self.sample_rate)
+
+    def span(self, name: str):
+        """Context manager timing `name`; inside a trace it follows the trace's sampling decision."""
+        trace = _current_trace.get()
+        if trace is False or (trace is None and not self._sampled()):
+            return _NOOP_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, seconds: float, failed: bool = False) -> None:
+        self.span_seconds.observe(seconds, name)
+        if failed:
+            self.span_errors.inc(1.0, name)
+        trace = _current_trace.get()
+        if isinstance(trace, list):
+            trace.append((name, seconds))
+
+    def trace(self) -> "_Trace":
+        """Samples once for a whole request; yields the list its spans are collected into (None if unsampled)."""
+        return _Trace([] if self._sampled() else False)
+
+    def timed(self, name: str):
+        """Decorator timing every call of an async function as the span `name`."""
+        def decorate(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return await function(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def render(self, stats: Dict[str, Any] | None = None) -> str:
+        """Every metric in the Prometheus text format, plus the numeric /stats values as gauges."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for section, values in (stats or {}).items():
+            if not isinstance(values, dict):
+                continue
+            for key, value in values.items():
+                name = f"{self.prefix}_{section}_{key}"
+                if isinstance(value, (int, float)):
+                    lines += [f"# TYPE {name} gauge", f"{name} {_number(value)}"]
+                elif isinstance(value, dict) and value and all(isinstance(item, (int, float)) for item in value.values()):
+                    lines.append(f"# TYPE {name} gauge")
+                    lines += [f"{name}{_labels(('key',), (item_key,))} {_number(item)}" for item_key, item in sorted(value.items())]
+        return "\n".join(lines) + "\n"
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: a task sleeps `interval` seconds and records how much later than
+    that it woke up. Sustained lag means something blocks the loop (CPU work, sync I/O).
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.histogram = registry.histogram(
+            "event_loop_lag_seconds", "How late the event loop woke a sleeping probe.",
+            buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+        )
+        self._task: asyncio.Task | None = None
+        self.samples = 0
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+
+    def start(self, interval: float) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._probe(interval), name="loop-lag-probe")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _probe(self, interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - expected)
+            self.histogram.observe(lag)
+            self.samples += 1
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+
+    def stats(self) -> dict:
+        return {"samples": self.samples, "last_lag_seconds": round(self.last_lag, 6), "max_lag_seconds": round(self.max_lag, 6)}
+
+def format_trace(spans: List[Tuple[str, float]]) -> str:
+    return ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in spans)
+
+metrics = MetricsRegistry(enabled=settings.METRICS_ENABLED, sample_rate=settings.METRICS_SAMPLE_RATE)
+llm_seconds = metrics.histogram("llm_request_seconds", "Latency of LLM completions, retries included.", ("model",))
+llm_tokens = metrics.counter("llm_tokens_total", "Tokens reported by the LLM endpoint.", ("model", "type"))
+loop_lag_monitor = LoopLagMonitor(metrics)
@@ -1,4 +1,6 @@
 # app/core/security.py
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from passlib.context import CryptContext
 from app.core.config import settings
 
@@ -11,4 +13,97 @@ class Hasher:
 
     @staticmethod
     def get_password_hash(password: str) -> str:
-        return pwd_context.hash(password)
\ No newline at end of file
+        return pwd_context.hash(password)
+
+class AsyncHasher:
+    """
+    Runs the blocking bcrypt calls of `Hasher` on a bounded thread or process pool so they
+    never stall the event loop. At most `max_workers` calls are handed to the executor;
+    further callers wait on the loop, where cancelling them is free. A call that was
+    submitted but has not started yet is withdrawn from the executor on cancellation;
+    one already running keeps its slot until the worker finishes it.
+    """
+
+    def __init__(self, executor_kind: str = "thread", max_workers: int = 4):
+        self.executor_kind = executor_kind
+        self.max_workers = max_workers
+        self._executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def _ensure_pool(self) -> None:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+    async def _run(self, func, *args):
+        self._ensure_pool()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        loop = asyncio.get_running_loop()
+        slots = self._slots
+        try:
+            job = self._executor.submit(func, *args)
+        except BaseException:
+            self.in_flight -= 1
+            slots.release()
+            raise
+        # The slot is held until the job itself finishes: cancelling the awaiting caller must not
+        # let another call onto the executor while the worker is still busy hashing.
+        job.add_done_callback(lambda _: loop.is_closed() or loop.call_soon_threadsafe(self._release, slots))
+        try:
+            result = await asyncio.wrap_future(job)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        self.completed += 1
+        return result
+
+    def _release(self, slots: asyncio.Semaphore) -> None:
+        self.in_flight -= 1
+        slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(Hasher.get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(Hasher.verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_kind,
+            "max_workers": self.max_workers,
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._slots = None
+
+async_hasher = AsyncHasher(
+    executor_kind=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+)
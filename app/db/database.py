@@ -1,9 +1,58 @@
 # app/db/database.py
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import hashlib
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+def sqlite_pragmas(profile: str, in_memory: bool = False) -> list[str]:
+    """PRAGMA statements applied to every new SQLite connection for a storage profile."""
+    pragmas = [f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}"]
+    if profile != "production":
+        return pragmas
+    if not in_memory:
+        pragmas.append(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        pragmas.append(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE_MB) * 1024 * 1024}")
+    pragmas.append(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+    pragmas.append(f"PRAGMA cache_size = -{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    pragmas.append("PRAGMA temp_store = MEMORY")
+    return pragmas
+
+def create_engine_for(url: str, profile: str | None = None, echo: bool | None = None) -> AsyncEngine:
+    """
+    Creates an async engine with the configured storage profile: SQL echo, pool sizing
+    and, for SQLite, a busy timeout plus the profile's pragmas on every connection.
+    """
+    profile = profile or settings.SQLITE_STORAGE_PROFILE
+    parsed = make_url(url)
+    is_sqlite = parsed.get_backend_name() == "sqlite"
+    in_memory = is_sqlite and parsed.database in (None, "", ":memory:")
+
+    options = {"echo": settings.DB_ECHO if echo is None else echo}
+    if not in_memory:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        )
+    if is_sqlite:
+        options["connect_args"] = {"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+
+    new_engine = create_async_engine(url, **options)
+    if is_sqlite:
+        pragmas = sqlite_pragmas(profile, in_memory)
+
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def _apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    return new_engine
+
+engine = create_engine_for(settings.DATABASE_URL)
 
 AsyncSessionLocal = sessionmaker(
     engine,
@@ -15,4 +64,59 @@ Base = declarative_base()
 
 async def get_db_session() -> AsyncSession:
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+def schema_fingerprint(metadata=Base.metadata) -> int:
+    """
+    Stable 31-bit hash of the declared tables, columns, indexes and constraints.
+    Stored in SQLite's `PRAGMA user_version` so startup can tell in one read whether
+    the database already has this schema.
+    """
+    parts = []
+    for table in metadata.sorted_tables:
+        parts.append(f"table {table.name}")
+        for column in table.columns:
+            parts.append(
+                f"column {column.name} {type(column.type).__name__} "
+                f"null={column.nullable} pk={column.primary_key} fk={sorted(fk.target_fullname for fk in column.foreign_keys)}"
+            )
+        # Indexes and constraints are unordered sets, often unnamed: sort their rendered form.
+        parts.extend(sorted(
+            f"index {index.name} {[column.name for column in index.columns]} unique={index.unique}"
+            for index in table.indexes
+        ))
+        parts.extend(sorted(
+            f"constraint {type(constraint).__name__} {constraint.name} {sorted(column.name for column in constraint.columns)}"
+            for constraint in table.constraints
+        ))
+    digest = hashlib.blake2b("\n".join(parts).encode(), digest_size=4).digest()
+    return int.from_bytes(digest, "big") & 0x7FFFFFFF
+
+def create_missing_indexes(connection, metadata=Base.metadata) -> None:
+    """`create_all` only indexes the tables it creates; this adds indexes declared later on existing ones."""
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+async def ensure_schema(target: AsyncEngine | None = None) -> bool:
+    """
+    Creates missing tables unless the database is stamped with the current schema fingerprint.
+    On SQLite a matching `user_version` skips `create_all` (and its per-table reflection)
+    entirely; other backends always run it. Returns True when `create_all` ran.
+    Indexes added to existing tables are created too, but existing columns are never
+    altered: a changed column still needs a migration.
+    """
+    import app.db.models  # noqa: F401  (registers the tables on Base.metadata)
+
+    target = target or engine
+    fingerprint = schema_fingerprint()
+    is_sqlite = target.dialect.name == "sqlite"
+    async with target.begin() as conn:
+        if is_sqlite and (await conn.exec_driver_sql("PRAGMA user_version")).scalar() == fingerprint:
+            return False
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_missing_indexes)
+        if is_sqlite:
+            await conn.exec_driver_sql(f"PRAGMA user_version = {fingerprint}")
+    print(f"--- Database schema created or updated (fingerprint {fingerprint}) ---")
+    return True
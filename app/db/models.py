@@ -1,8 +1,9 @@
 import enum
 from sqlalchemy import (
-    Column, Integer, String, DateTime, Text, ForeignKey, Enum as SAEnum, Float, Table
+    Column, Integer, String, DateTime, Text, ForeignKey, Enum as SAEnum, Float, Table, LargeBinary,
+    UniqueConstraint, Index
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from app.db.database import Base
 
@@ -19,6 +20,13 @@ class SessionStatus(str, enum.Enum):
     CANCELLED = "cancelled"
     FAILED = "failed"
 
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
 user_skills_association = Table(
     'user_skills', Base.metadata,
     Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
@@ -45,17 +53,65 @@ class Skill(Base):
 
 class MentorshipSession(Base):
     __tablename__ = "mentorship_sessions"
+    # Session lists are paged newest first on (created_at, id): one index per filter they support.
+    __table_args__ = (
+        Index("ix_mentorship_sessions_mentee_created", "mentee_id", "created_at", "id"),
+        Index("ix_mentorship_sessions_mentor_created", "mentor_id", "created_at", "id"),
+        Index("ix_mentorship_sessions_status_created", "status", "created_at", "id"),
+        Index("ix_mentorship_sessions_created", "created_at", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     mentee_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     mentor_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     requested_skill_id = Column(Integer, ForeignKey("skills.id"), nullable=False)
     status = Column(SAEnum(SessionStatus), default=SessionStatus.PENDING, nullable=False)
     failure_reason = Column(Text, nullable=True)
-    transcript = Column(Text, nullable=True)
-    summary = Column(Text, nullable=True)
+    # Large text is deferred so status lookups never load it; new transcripts live in transcript_chunks.
+    transcript = deferred(Column(Text, nullable=True))
+    summary = deferred(Column(Text, nullable=True))
     created_at = Column(DateTime, default=datetime.utcnow)
     scheduled_at = Column(DateTime, nullable=True)
 
     mentee = relationship("User", foreign_keys=[mentee_id])
     mentor = relationship("User", foreign_keys=[mentor_id])
-    skill = relationship("Skill", foreign_keys=[requested_skill_id])
\ No newline at end of file
+    skill = relationship("Skill", foreign_keys=[requested_skill_id])
+
+class TranscriptChunk(Base):
+    """A zlib-compressed slice of a session transcript; chunks are read back in `sequence` order."""
+    __tablename__ = "transcript_chunks"
+    __table_args__ = (UniqueConstraint("session_id", "sequence"),)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(Integer, ForeignKey("mentorship_sessions.id"), nullable=False)
+    sequence = Column(Integer, nullable=False)
+    message_count = Column(Integer, nullable=False)
+    raw_size = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class MatchmakingJob(Base):
+    __tablename__ = "matchmaking_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("mentorship_sessions.id"), unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    skill_name = Column(String, nullable=False)
+    request_details = Column(Text, nullable=True)
+    status = Column(SAEnum(JobStatus), default=JobStatus.QUEUED, nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class BroadcastMessage(Base):
+    """Outbox for cross-worker WebSocket broadcasts (used by the SQLite broker)."""
+    __tablename__ = "broadcast_messages"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    channel = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class WorkerLease(Base):
+    """A named singleton task held by one worker process until `expires_at` (e.g. the batch assigner)."""
+    __tablename__ = "worker_leases"
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -0,0 +1,95 @@
+# app/db/write_serializer.py
+import asyncio
+from typing import Any, Awaitable, Callable, List, Tuple, TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+
+T = TypeVar("T")
+WriteOp = Callable[[AsyncSession], Awaitable[Any]]
+
+class WriteSerializer:
+    """
+    Funnels small writes from concurrent background tasks through a single writer.
+    Operations submitted within `window_ms` of each other run in one session and are
+    committed together, so N concurrent status updates cost one SQLite write lock and
+    one fsync instead of N contending transactions. Operations must not commit.
+    """
+
+    def __init__(self, session_factory: sessionmaker = AsyncSessionLocal, window_ms: int | None = None, max_batch: int | None = None):
+        self._session_factory = session_factory
+        self.window_ms = settings.DB_WRITE_BATCH_WINDOW_MS if window_ms is None else window_ms
+        self.max_batch = settings.DB_WRITE_BATCH_MAX_SIZE if max_batch is None else max_batch
+        self._queue: asyncio.Queue[Tuple[WriteOp, asyncio.Future]] | None = None
+        self._writer: asyncio.Task | None = None
+        self.batches = 0
+        self.writes = 0
+
+    async def submit(self, op: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """Queues `op` for the next batch and returns its result once the batch has committed."""
+        if self._writer is None or self._writer.done():
+            self._queue = asyncio.Queue()
+            self._writer = asyncio.create_task(self._writer_loop(), name="db-write-serializer")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, future))
+        return await future
+
+    async def stop(self) -> None:
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+
+    async def _writer_loop(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = asyncio.get_running_loop().time() + self.window_ms / 1000
+            while len(batch) < self.max_batch:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._apply(batch)
+
+    async def _apply(self, batch: List[Tuple[WriteOp, asyncio.Future]]) -> None:
+        try:
+            async with self._session_factory() as db:
+                results = [await op(db) for op, _ in batch]
+                await db.commit()
+        except Exception:
+            # One bad operation must not fail its neighbours: retry each in its own transaction.
+            for op, future in batch:
+                await self._apply_one(op, future)
+            return
+        self.batches += 1
+        self.writes += len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _apply_one(self, op: WriteOp, future: asyncio.Future) -> None:
+        try:
+            async with self._session_factory() as db:
+                result = await op(db)
+                await db.commit()
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+            return
+        self.batches += 1
+        self.writes += 1
+        if not future.done():
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "writes": self.writes,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+status_writer = WriteSerializer()
@@ -1,31 +1,101 @@
+import asyncio
+import importlib
+import time
 import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
-from app.db.database import engine, Base
-from app.api.v1 import mentorship, users
+from app.core.metrics import loop_lag_monitor, metrics
+from app.core.security import async_hasher
+from app.db.database import engine, AsyncSessionLocal, ensure_schema
+from app.db.write_serializer import status_writer
+from app.api.v1 import mentorship, skills, users
+from app.agents import import_agent_stack, loaded_agent_stack
+from app.agents.llm_cache import llm_cache
+from app.api.v1.mentorship import run_matchmaking_background
 from app.api.websockets import manager
+from app.services.broker import broker
+from app.services.job_queue import matchmaking_queue
+from app.services.mentor_index import mentor_index
+from app.services.skill_index import skill_index
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
 @app.on_event("startup")
 async def startup():
-    """Initializes the database and creates tables on application startup."""
-    async with engine.begin() as conn:
-        # await conn.run_sync(Base.metadata.drop_all) # Use cautiously for development
-        await conn.run_sync(Base.metadata.create_all)
+    """Checks the database schema, builds the mentor index and starts the matchmaking workers on startup."""
+    await ensure_schema(engine)
+    if settings.EVENT_LOOP_LAG_PROBE_SECONDS > 0:
+        loop_lag_monitor.start(settings.EVENT_LOOP_LAG_PROBE_SECONDS)
+    if settings.MENTOR_INDEX_ENABLED:
+        async with AsyncSessionLocal() as db:
+            await mentor_index.build(db)
+    if settings.SKILL_INDEX_ENABLED:
+        async with AsyncSessionLocal() as db:
+            await skill_index.build(db)
+    await broker.start()
+    await matchmaking_queue.start(run_matchmaking_background)
+    if settings.BATCH_ASSIGN_INTERVAL_SECONDS > 0:
+        # Imported only when enabled: the solver pulls in NumPy.
+        from app.services.batch_assigner import batch_assigner
+        batch_assigner.start(settings.BATCH_ASSIGN_INTERVAL_SECONDS)
+        app.state.batch_assigner = batch_assigner
+    if settings.AGENT_POOL_PREWARM:
+        # Loads autogen and builds the agents after the app is already serving requests.
+        app.state.agent_warmup = asyncio.create_task(prewarm_agents())
+    if settings.SEMANTIC_MATCHING_ENABLED:
+        # Built in the background so the first matchmaking request does not pay for it.
+        app.state.embeddings_build = asyncio.create_task(build_mentor_embeddings())
+
+async def build_mentor_embeddings():
+    started = time.perf_counter()
+    # Imported in a thread: the module pulls in NumPy, which stays off the cold-start path.
+    module = await asyncio.to_thread(importlib.import_module, "app.services.mentor_embeddings")
+    async with AsyncSessionLocal() as db:
+        await module.mentor_embeddings.ensure_built(db)
+    print(f"--- Mentor embeddings built for {len(module.mentor_embeddings)} mentors in {time.perf_counter() - started:.3f}s ---")
+
+async def prewarm_agents():
+    started = time.perf_counter()
+    agents = await import_agent_stack()
+    await agents.agent_pool.prewarm(count=settings.AGENT_POOL_PREWARM)
+    print(f"--- Agent stack loaded and pool prewarmed in {time.perf_counter() - started:.3f}s ---")
 
 @app.on_event("shutdown")
 async def shutdown():
-    """Disposes of the database engine connection on application shutdown."""
+    """Stops the matchmaking workers and disposes of the database engine on application shutdown."""
+    for name in ("agent_warmup", "embeddings_build"):
+        task = getattr(app.state, name, None)
+        if task is not None and not task.done():
+            task.cancel()
+    assigner = getattr(app.state, "batch_assigner", None)
+    if assigner is not None:
+        await assigner.stop()
+    await matchmaking_queue.stop()
+    await loop_lag_monitor.stop()
+    await status_writer.stop()
+    await manager.close()
+    await broker.stop()
+    llm_cache.shutdown()
+    agents = loaded_agent_stack()
+    if agents is not None:
+        agents.agent_pool.clear()
+        agents.llm_gateway.close()
+    async_hasher.shutdown()
     await engine.dispose()
 
 # Include API routers
 app.include_router(users.router, prefix="/api/v1", tags=["Users"])
 app.include_router(mentorship.router, prefix="/api/v1", tags=["Mentorship"])
+app.include_router(skills.router, prefix="/api/v1", tags=["Skills"])
 
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
-    """Handles WebSocket connections for real-time session communication."""
+    """
+    Handles WebSocket connections for real-time session communication.
+    Chat text is broadcast to the session as plain text; session lifecycle events
+    (pending -> verifying -> matching -> matched/failed) are pushed as JSON.
+    """
     await manager.connect(websocket, session_id)
     try:
         while True:
@@ -40,5 +110,29 @@ async def root():
     """Root endpoint for the API."""
     return {"message": "Skill-Exchange Mentor Network API is running."}
 
+@app.get("/stats")
+async def runtime_stats():
+    """Reports queue depths and counters of the in-process worker pools."""
+    stats = {
+        "password_hashing": async_hasher.stats(),
+        "llm_cache": llm_cache.stats(),
+        "event_loop": loop_lag_monitor.stats(),
+    }
+    assigner = getattr(app.state, "batch_assigner", None)
+    if assigner is not None:
+        stats["batch_assignment"] = assigner.stats()
+    # The agent stack reports only once something has loaded it.
+    agents = loaded_agent_stack()
+    if agents is not None:
+        stats["llm_gateway"] = agents.llm_gateway.stats()
+        stats["agent_pool"] = agents.agent_pool.stats()
+        stats["mentor_scoring"] = agents.mentor_scorer.stats()
+    return stats
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage histograms, LLM latency and token counters, and the /stats counters, in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(await runtime_stats()), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
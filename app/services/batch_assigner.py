@@ -0,0 +1,320 @@
+from __future__ import annotations
+import asyncio
+import os
+import socket
+import time
+import uuid
+import traceback
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Set
+import numpy as np
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload, sessionmaker
+from app.core.config import settings
+from app.db import models
+from app.db.database import AsyncSessionLocal
+from app.services.mentor_embeddings import mentor_embeddings
+from app.services.mentor_index import MENTOR_ROLES, skill_tokens
+from app.services.mentor_scoring import MentorScorer, mentor_scorer
+from app.services.session_manager import SessionManager
+
+# Costs of a session left unassigned and of a pair that is not allowed; any real pair costs far less.
+UNASSIGNED_COST = 1e3
+FORBIDDEN_COST = 1e6
+
+def min_cost_assignment(cost: np.ndarray) -> np.ndarray:
+    """
+    Hungarian algorithm (shortest augmenting paths with potentials) for a rows <= columns
+    cost matrix. Returns the column assigned to each row, minimizing the total cost.
+    The inner scan over the columns is vectorized, so a solve is O(rows^2) NumPy passes.
+    """
+    rows, columns = cost.shape
+    if rows > columns:
+        raise ValueError("min_cost_assignment needs at least as many columns as rows")
+    # 1-based with a virtual column 0, as in the textbook formulation.
+    u = np.zeros(rows + 1)
+    v = np.zeros(columns + 1)
+    owner = np.zeros(columns + 1, dtype=np.int64)
+    way = np.zeros(columns + 1, dtype=np.int64)
+    for row in range(1, rows + 1):
+        owner[0] = row
+        column = 0
+        min_reduced = np.full(columns + 1, np.inf)
+        used = np.zeros(columns + 1, dtype=bool)
+        while owner[column] != 0:
+            used[column] = True
+            current_row = owner[column]
+            reduced = cost[current_row - 1] - u[current_row] - v[1:]
+            free = ~used[1:]
+            improved = free & (reduced < min_reduced[1:])
+            min_reduced[1:][improved] = reduced[improved]
+            way[1:][improved] = column
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_reduced[1:][free] -= delta
+            column = next_column
+        # Flip the augmenting path back to the root.
+        while column:
+            previous = way[column]
+            owner[column] = owner[previous]
+            column = previous
+    assignment = np.full(rows, -1, dtype=np.int64)
+    assigned_columns = np.flatnonzero(owner[1:])
+    assignment[owner[1:][assigned_columns] - 1] = assigned_columns
+    return assignment
+
+@dataclass
+class PendingRequest:
+    session_id: int
+    mentee_id: int
+    required: Set[str]
+    wanted: Set[str]
+    details: str = ""
+
+@dataclass
+class MentorCandidate:
+    id: int
+    trust_score: float
+    tokens: Set[str]
+
+class BatchAssigner:
+    """
+    Periodic global matcher for PENDING sessions. Each run takes the oldest PENDING
+    sessions whose job is still queued and whose mentee passes the trust gate, builds a
+    session x mentor-slot cost matrix from the MentorScorer terms (request_details included) (a mentor with load L
+    contributes one column per free slot, the k-th slot paying the load penalty of L + k),
+    solves the min-cost assignment and applies it with one bulk UPDATE in one transaction.
+    Popular mentors therefore fill up gradually instead of taking every request.
+    With several worker processes only the holder of the `worker_leases` row runs the
+    periodic loop, so two assigners never plan against the same mentor capacity.
+    """
+
+    LEASE_NAME = "batch-assigner"
+
+    def __init__(self, scorer: MentorScorer = mentor_scorer, session_factory: sessionmaker = AsyncSessionLocal,
+                 max_sessions: int = 500, lease_seconds: float | None = None):
+        self.scorer = scorer
+        self.session_factory = session_factory
+        self.max_sessions = max_sessions
+        self.lease_seconds = settings.BATCH_ASSIGN_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._task: asyncio.Task | None = None
+        self.runs = 0
+        self.assigned = 0
+        self.left_pending = 0
+        self.last_run_seconds = 0.0
+
+    async def run_once(self, db: AsyncSession | None = None) -> Dict[int, int]:
+        """Assigns what it can of the current backlog; returns {session_id: mentor_id} as applied."""
+        if db is None:
+            async with self.session_factory() as own_db:
+                return await self.run_once(own_db)
+        started = time.perf_counter()
+        requests = await self._pending(db)
+        mentors = await self._mentors(db) if requests else []
+        plan = await self._plan(db, requests, mentors) if mentors else {}
+        applied: List[int] = []
+        if plan:
+            applied = await SessionManager.bulk_assign_mentors(db, plan, commit=False)
+            # Their queued jobs are settled in the same transaction, so no worker runs them afterwards.
+            await db.execute(
+                update(models.MatchmakingJob)
+                .where(models.MatchmakingJob.session_id.in_(applied), models.MatchmakingJob.status == models.JobStatus.QUEUED)
+                .values(status=models.JobStatus.DONE)
+            )
+            await db.commit()
+        self.runs += 1
+        self.assigned += len(applied)
+        self.left_pending = len(requests) - len(applied)
+        self.last_run_seconds = time.perf_counter() - started
+        if requests:
+            print(f"--- Batch assignment: {len(applied)} of {len(requests)} pending session(s) matched in {self.last_run_seconds:.3f}s ---")
+        return {session_id: plan[session_id] for session_id in applied}
+
+    async def _pending(self, db: AsyncSession) -> List[PendingRequest]:
+        sessions = models.MentorshipSession
+        jobs = models.MatchmakingJob
+        result = await db.execute(
+            select(sessions.id, sessions.mentee_id, models.Skill.name, jobs.request_details)
+            .join(models.Skill, models.Skill.id == sessions.requested_skill_id)
+            .join(models.User, models.User.id == sessions.mentee_id)
+            .outerjoin(jobs, jobs.session_id == sessions.id)
+            .where(
+                sessions.status == models.SessionStatus.PENDING,
+                models.User.trust_score >= settings.TRUST_SCORE_THRESHOLD,
+                # A job a worker is already running is left to that worker.
+                (jobs.id.is_(None)) | (jobs.status == models.JobStatus.QUEUED),
+            )
+            .order_by(sessions.created_at, sessions.id)
+            .limit(self.max_sessions)
+        )
+        rows = result.all()
+        mentee_ids = {row.mentee_id for row in rows}
+        mentee_tokens: Dict[int, Set[str]] = {mentee_id: set() for mentee_id in mentee_ids}
+        if mentee_ids:
+            association = models.user_skills_association
+            skills = await db.execute(
+                select(association.c.user_id, models.Skill.name)
+                .join(models.Skill, models.Skill.id == association.c.skill_id)
+                .where(association.c.user_id.in_(mentee_ids))
+            )
+            for user_id, name in skills:
+                mentee_tokens[user_id].update(skill_tokens(name))
+        return [
+            PendingRequest(
+                session_id, mentee_id, set(skill_tokens(skill)), set(skill_tokens(skill)) | mentee_tokens[mentee_id],
+                f"{skill}\n{details}" if details else "",
+            )
+            for session_id, mentee_id, skill, details in rows
+        ]
+
+    async def _mentors(self, db: AsyncSession) -> List[MentorCandidate]:
+        result = await db.execute(
+            select(models.User)
+            .options(selectinload(models.User.skills))
+            .where(models.User.role.in_(MENTOR_ROLES), models.User.trust_score > self.scorer.min_trust)
+        )
+        return [
+            MentorCandidate(user.id, user.trust_score, {token for skill in user.skills for token in skill_tokens(skill.name)})
+            for user in result.scalars().all()
+        ]
+
+    async def _plan(self, db: AsyncSession, requests: List[PendingRequest], mentors: List[MentorCandidate]) -> Dict[int, int]:
+        vocabulary = {token: position for position, token in enumerate(
+            {token for request in requests for token in request.wanted} | {token for mentor in mentors for token in mentor.tokens}
+        )}
+
+        def token_matrix(token_sets: List[Set[str]]) -> np.ndarray:
+            matrix = np.zeros((len(token_sets), len(vocabulary)), dtype=np.float32)
+            for row, tokens in enumerate(token_sets):
+                matrix[row, [vocabulary[token] for token in tokens]] = 1
+            return matrix
+
+        mentor_tokens = token_matrix([mentor.tokens for mentor in mentors]).T
+        required = token_matrix([request.required for request in requests])
+        wanted = token_matrix([request.wanted for request in requests])
+        # A mentor is eligible for a session when it covers every token of the requested skill.
+        eligible = (required @ mentor_tokens) >= required.sum(axis=1, keepdims=True)
+        mentor_ids = np.array([mentor.id for mentor in mentors], dtype=np.int64)
+        eligible &= mentor_ids[None, :] != np.array([request.mentee_id for request in requests])[:, None]
+
+        useful = np.flatnonzero(eligible.any(axis=0))
+        if not len(useful):
+            return {}
+        mentor_ids = mentor_ids[useful]
+        eligible = eligible[:, useful]
+        activity = await self.scorer.activity(db, mentor_ids.tolist())
+        now = datetime.utcnow()
+        load = np.zeros(len(mentor_ids), dtype=np.float32)
+        idle_days = np.full(len(mentor_ids), np.inf, dtype=np.float32)
+        for position, mentor_id in enumerate(mentor_ids.tolist()):
+            active, last_session = activity.get(mentor_id, (0, None))
+            load[position] = active
+            if last_session is not None:
+                idle_days[position] = (now - last_session).total_seconds() / 86400
+
+        weights = self.scorer.weights
+        capacity = self.scorer.capacity
+        trust = np.array([mentors[position].trust_score for position in useful], dtype=np.float32)
+        overlap = (wanted @ mentor_tokens[:, useful]) / np.maximum(wanted.sum(axis=1, keepdims=True), 1)
+        score = (
+            weights.get("trust", 0.0) * trust / 100
+            + weights.get("recency", 0.0) * self.scorer.recency(idle_days)
+        )[None, :] + weights.get("overlap", 0.0) * overlap
+        if settings.SEMANTIC_MATCHING_ENABLED and any(request.details for request in requests):
+            await mentor_embeddings.ensure_built(db)
+            queries = mentor_embeddings.embedder.embed_many([request.details for request in requests])
+            score += weights.get("semantic", 0.0) * (queries @ mentor_embeddings.vectors(mentor_ids.tolist()).T)
+
+        # One column per free slot; the k-th slot of a mentor pays the load penalty of load + k.
+        free_slots = np.clip(capacity - load, 0, len(requests)).astype(np.int64)
+        slot_mentor = np.repeat(np.arange(len(mentor_ids)), free_slots)
+        if not len(slot_mentor):
+            return {}
+        slot_rank = np.arange(len(slot_mentor)) - np.repeat(np.cumsum(free_slots) - free_slots, free_slots)
+        load_penalty = weights.get("load", 0.0) * (load[slot_mentor] + slot_rank) / capacity
+        cost = np.where(eligible[:, slot_mentor], load_penalty[None, :] - score[:, slot_mentor], FORBIDDEN_COST)
+        # Every session can also stay PENDING, so a solution always exists.
+        cost = np.hstack([cost, np.full((len(requests), len(requests)), UNASSIGNED_COST)])
+
+        plan = {}
+        for row, column in enumerate(min_cost_assignment(cost)):
+            if column < len(slot_mentor) and cost[row, column] < UNASSIGNED_COST:
+                plan[requests[row].session_id] = int(mentor_ids[slot_mentor[column]])
+        return plan
+
+    def start(self, interval_seconds: float) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(interval_seconds), name="batch-assigner")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            try:
+                await self.release_lease()
+            except Exception:
+                traceback.print_exc()
+
+    async def acquire_lease(self) -> bool:
+        """Takes or renews the assigner lease; False while another live process holds it."""
+        leases = models.WorkerLease
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        async with self.session_factory() as db:
+            claimed = await db.execute(
+                update(leases)
+                .where(leases.name == self.LEASE_NAME, or_(leases.owner == self.owner, leases.expires_at < now))
+                .values(owner=self.owner, expires_at=expires_at)
+            )
+            if claimed.rowcount == 1:
+                await db.commit()
+                return True
+            db.add(leases(name=self.LEASE_NAME, owner=self.owner, expires_at=expires_at))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Another process holds the lease (or created it first).
+                return False
+            return True
+
+    async def release_lease(self) -> None:
+        """Expires this process's lease so another worker takes over on its next tick."""
+        leases = models.WorkerLease
+        async with self.session_factory() as db:
+            await db.execute(
+                update(leases)
+                .where(leases.name == self.LEASE_NAME, leases.owner == self.owner)
+                .values(expires_at=datetime.utcnow())
+            )
+            await db.commit()
+
+    async def _loop(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                if await self.acquire_lease():
+                    await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                print("--- Batch assignment run failed ---")
+                traceback.print_exc()
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "assigned": self.assigned,
+            "left_pending": self.left_pending,
+            "last_run_seconds": round(self.last_run_seconds, 4),
+        }
+
+batch_assigner = BatchAssigner(max_sessions=settings.BATCH_ASSIGN_MAX_SESSIONS)
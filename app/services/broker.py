@@ -0,0 +1,163 @@
+from __future__ import annotations
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+from sqlalchemy import delete, func, insert
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db import models
+from app.db.database import AsyncSessionLocal
+
+Handler = Callable[[dict], None]
+
+dropped_broadcasts = metrics.counter("broadcast_messages_dropped_total", "Broadcasts dropped before they reached the broker table.", ("reason",))
+
+class Broker(ABC):
+    """
+    Carries broadcast messages to every API worker process, including the publisher.
+    `publish` never blocks; handlers are plain callables run on the worker's event loop.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def unsubscribe(self, channel: str, handler: Handler) -> None:
+        handlers = self._handlers.get(channel, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    @abstractmethod
+    def publish(self, channel: str, message: dict) -> None:
+        """Delivers `message` to the `channel` handlers of every worker."""
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def _dispatch(self, channel: str, message: dict) -> None:
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(message)
+            except Exception:
+                traceback.print_exc()
+
+class InProcessBroker(Broker):
+    """Single-worker default: delivers synchronously to local handlers."""
+
+    def publish(self, channel: str, message: dict) -> None:
+        self._dispatch(channel, message)
+
+class SQLiteBroker(Broker):
+    """
+    Multi-worker broker backed by the `broadcast_messages` table of the shared SQLite DB.
+    Published messages are written in small batches; every worker polls for rows newer
+    than the last one it has seen and prunes rows older than the retention window.
+    """
+
+    def __init__(self, session_factory: sessionmaker = AsyncSessionLocal, poll_interval_ms: int | None = None, retention_seconds: float | None = None):
+        super().__init__()
+        self._session_factory = session_factory
+        self.poll_interval = (poll_interval_ms or settings.BROADCAST_POLL_INTERVAL_MS) / 1000
+        self.retention = timedelta(seconds=retention_seconds or settings.BROADCAST_RETENTION_SECONDS)
+        self._outbox: List[dict] = []
+        self._wakeup: asyncio.Event | None = None
+        self._tasks: List[asyncio.Task] = []
+        self._last_id = 0
+
+    def publish(self, channel: str, message: dict) -> None:
+        self._outbox.append({"channel": channel, "payload": json.dumps(message, default=str)})
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        async with self._session_factory() as db:
+            self._last_id = (await db.execute(select(func.max(models.BroadcastMessage.id)))).scalar() or 0
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._flush_loop()), asyncio.create_task(self._poll_loop())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            await self._flush()
+        except Exception:
+            traceback.print_exc()
+            self._drop(len(self._outbox), "shutdown")
+            self._outbox = []
+
+    async def _flush(self) -> None:
+        """Writes the outbox; on failure the drained rows go back in front of newer ones."""
+        if not self._outbox:
+            return
+        rows, self._outbox = self._outbox, []
+        now = datetime.utcnow()
+        try:
+            async with self._session_factory() as db:
+                await db.execute(insert(models.BroadcastMessage), [{**row, "created_at": now} for row in rows])
+                await db.execute(delete(models.BroadcastMessage).where(models.BroadcastMessage.created_at < now - self.retention))
+                await db.commit()
+        except BaseException:
+            self._outbox = rows + self._outbox
+            overflow = len(self._outbox) - settings.BROADCAST_OUTBOX_MAX
+            if overflow > 0:
+                del self._outbox[:overflow]
+                self._drop(overflow, "outbox full")
+            raise
+
+    @staticmethod
+    def _drop(count: int, reason: str) -> None:
+        if count:
+            dropped_broadcasts.inc(count, reason)
+            print(f"--- Dropped {count} broadcast message(s): {reason} ---")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                await self._flush()
+            except Exception:
+                traceback.print_exc()
+                # Retry the re-queued rows after a pause instead of waiting for the next publish.
+                await asyncio.sleep(self.poll_interval)
+                self._wakeup.set()
+
+    async def _poll_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                async with self._session_factory() as db:
+                    result = await db.execute(
+                        select(models.BroadcastMessage.id, models.BroadcastMessage.channel, models.BroadcastMessage.payload)
+                        .where(models.BroadcastMessage.id > self._last_id)
+                        .order_by(models.BroadcastMessage.id)
+                    )
+                    rows = result.all()
+            except Exception:
+                traceback.print_exc()
+                continue
+            for message_id, channel, payload in rows:
+                self._last_id = message_id
+                self._dispatch(channel, json.loads(payload))
+
+def create_broker(kind: str | None = None) -> Broker:
+    kind = kind or settings.BROADCAST_BROKER
+    if kind == "sqlite":
+        return SQLiteBroker()
+    if kind == "memory":
+        return InProcessBroker()
+    raise ValueError(f"Unknown BROADCAST_BROKER '{kind}'; expected 'memory' or 'sqlite'.")
+
+broker = create_broker()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+from collections import OrderedDict, deque
+from datetime import datetime
+from itertools import count
+from typing import Callable, Deque, List, Literal
+from pydantic import BaseModel
+from app.core.config import settings
+from app.services.broker import Broker, broker as default_broker
+
+EVENTS_CHANNEL = "session_events"
+
+class SessionEvent(BaseModel):
+    """A lifecycle event of a mentorship session, pushed to WebSocket subscribers as JSON."""
+    type: Literal["session.status"] = "session.status"
+    sequence: int
+    session_id: int
+    # A SessionStatus value, or one of the in-flight stages "verifying" / "matching".
+    status: str
+    reason: str | None = None
+    mentor_id: int | None = None
+    timestamp: datetime
+
+Listener = Callable[[SessionEvent], None]
+
+class SessionEventBus:
+    """
+    Pub/sub for session lifecycle events.
+    Events are published through the broadcast broker, so every API worker records them,
+    whichever worker ran the transition. The last `history_size` events of the
+    `max_sessions` most recently active sessions are kept in ring buffers and replayed to
+    late subscribers. Listeners are called synchronously and must not block.
+    """
+
+    def __init__(
+        self,
+        history_size: int | None = None,
+        max_sessions: int | None = None,
+        broker: Broker | None = None,
+    ):
+        self.history_size = history_size or settings.SESSION_EVENT_HISTORY_SIZE
+        self.max_sessions = max_sessions or settings.SESSION_EVENT_MAX_SESSIONS
+        self._history: "OrderedDict[int, Deque[SessionEvent]]" = OrderedDict()
+        self._listeners: List[Listener] = []
+        self._sequence = count(1)
+        self._broker = broker or default_broker
+        self._broker.subscribe(EVENTS_CHANNEL, self.ingest)
+
+    def publish(self, session_id: int, status: str, reason: str | None = None, mentor_id: int | None = None) -> None:
+        self._broker.publish(EVENTS_CHANNEL, {
+            "session_id": session_id,
+            "status": status,
+            "reason": reason,
+            "mentor_id": mentor_id,
+            "timestamp": datetime.utcnow().isoformat(),
+        })
+
+    def add_listener(self, listener: Listener) -> None:
+        """Registers a callable invoked with every event this worker receives."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Listener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def ingest(self, message: dict) -> SessionEvent:
+        """Records a brokered event locally and hands it to this worker's subscribers."""
+        event = SessionEvent(sequence=next(self._sequence), **message)
+        session_id = event.session_id
+        history = self._history.get(session_id)
+        if history is None:
+            history = self._history[session_id] = deque(maxlen=self.history_size)
+            while len(self._history) > self.max_sessions:
+                self._history.popitem(last=False)
+        else:
+            self._history.move_to_end(session_id)
+        history.append(event)
+
+        for listener in self._listeners:
+            listener(event)
+        return event
+
+    def clear(self, session_id: int | None = None) -> None:
+        """Drops the replay buffer of one session, or of all sessions."""
+        if session_id is None:
+            self._history.clear()
+        else:
+            self._history.pop(session_id, None)
+
+    def history(self, session_id: int) -> List[SessionEvent]:
+        return list(self._history.get(session_id, ()))
+
+event_bus = SessionEventBus()
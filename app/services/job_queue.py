@@ -0,0 +1,295 @@
+from __future__ import annotations
+import asyncio
+import traceback
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.db import models
+from app.db.database import AsyncSessionLocal
+
+MatchmakingHandler = Callable[[int, int, str, str], Awaitable[None]]
+
+class QueueFullError(Exception):
+    """Raised when the matchmaking queue has reached its pending-job capacity."""
+
+class QueueUnavailableError(Exception):
+    """Raised when the matchmaking queue is not accepting jobs (not started or shutting down)."""
+
+class MatchmakingQueue:
+    """
+    Durable, bounded job queue for matchmaking runs.
+    Jobs live in the `matchmaking_jobs` table, and a fixed pool of async workers claims them
+    from there with a conditional UPDATE, so PENDING sessions survive a process restart and
+    a job enqueued by any process (including producer-only ones, MATCHMAKING_WORKERS=0) is
+    picked up by whichever worker polls first. A local enqueue wakes this process's workers
+    at once; other processes see the job on their next poll.
+    Running jobs are leased: their `updated_at` is renewed while they run, and only jobs whose
+    lease has expired (their process died) are re-queued, never those of a live worker.
+    Capacity is measured on the QUEUED rows, so it also holds across processes.
+    """
+
+    def __init__(self, session_factory: sessionmaker = AsyncSessionLocal):
+        self._session_factory = session_factory
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._maintenance: asyncio.Task | None = None
+        self._handler: MatchmakingHandler | None = None
+        self._running_jobs = 0
+        # In-flight handler runs by session ID, so a cancelled session can abort its run.
+        self._runs: Dict[int, asyncio.Task] = {}
+        self.max_pending = settings.MATCHMAKING_QUEUE_MAX_PENDING
+        self.poll_seconds = settings.MATCHMAKING_QUEUE_POLL_SECONDS
+        self.lease_seconds = settings.MATCHMAKING_JOB_LEASE_SECONDS
+        self.accepting = False
+
+    def stats(self) -> dict:
+        return {
+            "accepting": self.accepting,
+            "workers": len(self._workers),
+            "running": self._running_jobs,
+            "max_pending": self.max_pending,
+        }
+
+    @staticmethod
+    async def pending_jobs(db: AsyncSession) -> int:
+        """Counts the jobs waiting for a worker, whichever process enqueued them."""
+        result = await db.execute(
+            select(func.count(models.MatchmakingJob.id)).where(models.MatchmakingJob.status == models.JobStatus.QUEUED)
+        )
+        return result.scalar_one()
+
+    async def check_capacity(self, db: AsyncSession) -> None:
+        """Raises if a new job would be rejected; call before creating the session row."""
+        if not self.accepting:
+            raise QueueUnavailableError("Matchmaking queue is not accepting jobs.")
+        pending = await self.pending_jobs(db)
+        if pending >= self.max_pending:
+            raise QueueFullError(f"Matchmaking queue is full ({pending} pending jobs).")
+
+    async def enqueue(
+        self, db: AsyncSession, session_id: int, user_id: int, skill_name: str, request_details: str
+    ) -> models.MatchmakingJob:
+        """
+        Persists a job for the session and wakes the local workers. The job is committed
+        together with whatever the caller has already written in `db` (normally the session
+        row), so a session never exists without its request details.
+        """
+        if not self.accepting:
+            raise QueueUnavailableError("Matchmaking queue is not accepting jobs.")
+        job = models.MatchmakingJob(
+            session_id=session_id,
+            user_id=user_id,
+            skill_name=skill_name,
+            request_details=request_details,
+            status=models.JobStatus.QUEUED,
+        )
+        db.add(job)
+        await db.commit()
+        self._wakeup.set()
+        return job
+
+    async def cancel(self, db: AsyncSession, session_id: int) -> bool:
+        """
+        Withdraws the session's queued jobs (committed together with whatever the caller has
+        written in `db`, normally the CANCELLED transition) and cancels its run if one is in
+        flight in this process. A run in another process finishes, but cannot assign a mentor
+        to a session that is no longer PENDING. Returns whether a run was cancelled.
+        """
+        await db.execute(
+            update(models.MatchmakingJob)
+            .where(models.MatchmakingJob.session_id == session_id, models.MatchmakingJob.status == models.JobStatus.QUEUED)
+            .values(status=models.JobStatus.CANCELLED)
+        )
+        await db.commit()
+        run = self._runs.get(session_id)
+        if run is None or run.done():
+            return False
+        run.cancel()
+        return True
+
+    async def start(self, handler: MatchmakingHandler, workers: int | None = None) -> None:
+        """Requeues jobs left behind by dead workers and starts the worker pool."""
+        self._handler = handler
+        self.max_pending = settings.MATCHMAKING_QUEUE_MAX_PENDING
+        worker_count = settings.MATCHMAKING_WORKERS if workers is None else workers
+        if worker_count > 0:
+            recovered = await self.recover()
+            if recovered:
+                print(f"--- {recovered} pending matchmaking job(s) waiting for the workers ---")
+            self._workers = [
+                asyncio.create_task(self._worker_loop(n), name=f"matchmaking-worker-{n}")
+                for n in range(worker_count)
+            ]
+            self._maintenance = asyncio.create_task(self._maintenance_loop(), name="matchmaking-leases")
+        self.accepting = True
+
+    async def stop(self) -> None:
+        """Stops accepting jobs and cancels the workers; the jobs they were running go back in the queue."""
+        self.accepting = False
+        interrupted = list(self._runs)
+        tasks = self._workers + ([self._maintenance] if self._maintenance is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._maintenance = None
+        if interrupted:
+            async with self._session_factory() as db:
+                await db.execute(
+                    update(models.MatchmakingJob)
+                    .where(
+                        models.MatchmakingJob.session_id.in_(interrupted),
+                        models.MatchmakingJob.status == models.JobStatus.RUNNING,
+                    )
+                    .values(status=models.JobStatus.QUEUED)
+                )
+                await db.commit()
+
+    async def recover(self) -> int:
+        """Gives job rows to orphaned PENDING sessions, requeues expired leases and counts the claimable jobs."""
+        async with self._session_factory() as db:
+            # Sessions created without a job row (e.g. before the queue existed) get one now.
+            orphans = await db.execute(
+                select(models.MentorshipSession)
+                .outerjoin(models.MatchmakingJob, models.MatchmakingJob.session_id == models.MentorshipSession.id)
+                .where(
+                    models.MentorshipSession.status == models.SessionStatus.PENDING,
+                    models.MatchmakingJob.id.is_(None),
+                )
+            )
+            for session in orphans.scalars().all():
+                skill = await db.get(models.Skill, session.requested_skill_id)
+                db.add(models.MatchmakingJob(
+                    session_id=session.id,
+                    user_id=session.mentee_id,
+                    skill_name=skill.name if skill else "",
+                    request_details="",
+                    status=models.JobStatus.QUEUED,
+                ))
+            await self._requeue_expired(db)
+            await db.commit()
+            result = await db.execute(self._claimable().with_only_columns(func.count(models.MatchmakingJob.id)))
+            return result.scalar_one()
+
+    @staticmethod
+    def _claimable():
+        """QUEUED jobs of still-PENDING sessions, oldest first."""
+        return (
+            select(models.MatchmakingJob.id)
+            .join(models.MentorshipSession, models.MatchmakingJob.session_id == models.MentorshipSession.id)
+            .where(
+                models.MatchmakingJob.status == models.JobStatus.QUEUED,
+                models.MentorshipSession.status == models.SessionStatus.PENDING,
+            )
+        )
+
+    async def _requeue_expired(self, db: AsyncSession) -> int:
+        """Puts RUNNING jobs whose lease was not renewed in time back in the queue."""
+        expired_before = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        result = await db.execute(
+            update(models.MatchmakingJob)
+            .where(models.MatchmakingJob.status == models.JobStatus.RUNNING, models.MatchmakingJob.updated_at < expired_before)
+            .values(status=models.JobStatus.QUEUED)
+        )
+        return result.rowcount
+
+    async def _claim_next(self) -> models.MatchmakingJob | None:
+        """Moves the oldest claimable job from QUEUED to RUNNING; another worker winning the race means trying the next one."""
+        async with self._session_factory() as db:
+            while True:
+                result = await db.execute(self._claimable().order_by(models.MatchmakingJob.id).limit(1))
+                job_id = result.scalar_one_or_none()
+                if job_id is None:
+                    return None
+                claimed = await db.execute(
+                    update(models.MatchmakingJob)
+                    .where(models.MatchmakingJob.id == job_id, models.MatchmakingJob.status == models.JobStatus.QUEUED)
+                    .values(
+                        status=models.JobStatus.RUNNING,
+                        attempts=models.MatchmakingJob.attempts + 1,
+                        updated_at=datetime.utcnow(),
+                    )
+                )
+                await db.commit()
+                if claimed.rowcount == 1:
+                    return await db.get(models.MatchmakingJob, job_id)
+
+    async def _finish(self, job_id: int, status: models.JobStatus) -> None:
+        async with self._session_factory() as db:
+            await db.execute(
+                update(models.MatchmakingJob).where(models.MatchmakingJob.id == job_id).values(status=status)
+            )
+            await db.commit()
+
+    async def _maintenance_loop(self) -> None:
+        """Renews the leases of this process's running jobs and requeues the expired leases of dead ones."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self._session_factory() as db:
+                    if self._runs:
+                        await db.execute(
+                            update(models.MatchmakingJob)
+                            .where(
+                                models.MatchmakingJob.session_id.in_(list(self._runs)),
+                                models.MatchmakingJob.status == models.JobStatus.RUNNING,
+                            )
+                            .values(updated_at=datetime.utcnow())
+                        )
+                    requeued = await self._requeue_expired(db)
+                    await db.commit()
+                if requeued:
+                    print(f"--- Re-queued {requeued} matchmaking job(s) with expired leases ---")
+                    self._wakeup.set()
+            except Exception:
+                traceback.print_exc()
+
+    async def _worker_loop(self, worker_number: int) -> None:
+        while True:
+            # Cleared before looking, so an enqueue that lands after an empty claim is not missed.
+            self._wakeup.clear()
+            try:
+                job = await self._claim_next()
+            except Exception:
+                print(f"--- Matchmaking worker {worker_number} could not claim a job ---")
+                traceback.print_exc()
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(job)
+            except Exception:
+                print(f"--- Matchmaking worker {worker_number} could not process job {job.id} ---")
+                traceback.print_exc()
+
+    async def _run(self, job: models.MatchmakingJob) -> None:
+        self._running_jobs += 1
+        # The run is a task of its own so cancel() can abort it without stopping this worker.
+        run = asyncio.create_task(
+            self._handler(job.session_id, job.user_id, job.skill_name, job.request_details or ""),
+            name=f"matchmaking-session-{job.session_id}",
+        )
+        self._runs[job.session_id] = run
+        try:
+            await run
+            await self._finish(job.id, models.JobStatus.DONE)
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise
+            await self._finish(job.id, models.JobStatus.CANCELLED)
+        except Exception:
+            traceback.print_exc()
+            await self._finish(job.id, models.JobStatus.FAILED)
+        finally:
+            self._runs.pop(job.session_id, None)
+            self._running_jobs -= 1
+
+matchmaking_queue = MatchmakingQueue()
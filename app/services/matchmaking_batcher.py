@@ -0,0 +1,80 @@
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Set
+from app.core.config import settings
+from app.services.mentor_index import normalize_skill
+
+@dataclass
+class MatchRequest:
+    user_id: int
+    request_details: str
+    future: asyncio.Future = field(repr=False)
+
+BatchRunner = Callable[[str, List[MatchRequest]], Awaitable[List[dict]]]
+
+@dataclass
+class _PendingBatch:
+    skill_name: str
+    runner: BatchRunner
+    requests: List[MatchRequest] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+class MatchmakingBatcher:
+    """
+    Coalesces concurrent matchmaking requests for the same skill.
+    The first request for a skill opens a short window; every request for that
+    skill arriving inside the window joins the batch, and the batch is resolved by
+    a single runner call (one candidate query, one LLM ranking) whose results are
+    fanned back to the individual callers.
+    """
+
+    def __init__(self, window_ms: int | None = None, max_batch_size: int | None = None):
+        self.window_ms = settings.MATCHMAKING_BATCH_WINDOW_MS if window_ms is None else window_ms
+        self.max_batch_size = settings.MATCHMAKING_BATCH_MAX_SIZE if max_batch_size is None else max_batch_size
+        self._pending: Dict[str, _PendingBatch] = {}
+        # Strong references to flushes in flight; the event loop only keeps weak ones.
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def submit(self, skill_name: str, user_id: int, request_details: str, runner: BatchRunner) -> dict:
+        """Joins (or opens) the batch for `skill_name` and waits for this request's result."""
+        loop = asyncio.get_running_loop()
+        key = normalize_skill(skill_name)
+        batch = self._pending.get(key)
+        if batch is None:
+            # The runner of the request that opens the batch resolves the whole batch.
+            batch = _PendingBatch(skill_name=skill_name, runner=runner)
+            self._pending[key] = batch
+            batch.timer = loop.call_later(self.window_ms / 1000, self._schedule_flush, key, batch)
+
+        request = MatchRequest(user_id=user_id, request_details=request_details, future=loop.create_future())
+        batch.requests.append(request)
+        if len(batch.requests) >= self.max_batch_size:
+            batch.timer.cancel()
+            self._schedule_flush(key, batch)
+        return await request.future
+
+    def _schedule_flush(self, key: str, batch: _PendingBatch) -> None:
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+            task = asyncio.ensure_future(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: _PendingBatch) -> None:
+        print(f"--- Resolving matchmaking batch of {len(batch.requests)} for skill '{batch.skill_name}' ---")
+        try:
+            results = await batch.runner(batch.skill_name, batch.requests)
+        except Exception as exc:
+            for request in batch.requests:
+                if not request.future.done():
+                    request.future.set_exception(exc)
+            return
+        for request, result in zip(batch.requests, results):
+            if not request.future.done():
+                request.future.set_result(result)
+        for request in batch.requests[len(results):]:
+            if not request.future.done():
+                request.future.set_result({"status": "FAILED", "reason": "Batch matchmaking returned no result for this request."})
+
+matchmaking_batcher = MatchmakingBatcher()
@@ -0,0 +1,216 @@
+from __future__ import annotations
+import asyncio
+import re
+import zlib
+from typing import Dict, Iterable, List, Sequence, Tuple
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from app.core.config import settings
+from app.db import models
+from app.services.mentor_index import MENTOR_ROLES, MentorIndex, mentor_index
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+# Words that say nothing about what a mentee wants to learn.
+STOP_WORDS = frozenset(
+    "a an and are as at be but by can for from have how i in is it me my need of on or so that the "
+    "this to want we what with would you your help please learn learning".split()
+)
+
+class HashingEmbedder:
+    """
+    Offline text embedding: word unigrams and bigrams are hashed (CRC32, stable across
+    processes) into `dim` signed buckets, weighted by log term frequency and L2-normalized.
+    No vocabulary, model download or GPU; similar wording gives a high cosine similarity.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def features(self, text: str) -> List[str]:
+        words = [word for word in _WORD_RE.findall((text or "").lower()) if word not in STOP_WORDS]
+        return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        counts: Dict[str, int] = {}
+        for feature in self.features(text):
+            counts[feature] = counts.get(feature, 0) + 1
+        for feature, count in counts.items():
+            digest = zlib.crc32(feature.encode())
+            sign = 1.0 if (digest // self.dim) & 1 else -1.0
+            vector[digest % self.dim] += sign * (1.0 + np.log(count))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            matrix[row] = self.embed(text)
+        return matrix
+
+class MentorEmbeddingIndex:
+    """
+    Nearest-neighbour index of mentor profile embeddings in one contiguous float32 matrix.
+    A profile is the mentor's skill names plus the summaries of their latest completed
+    sessions. Rows are updated in place when MentorIndex reports a (re)registered mentor,
+    so the index follows registrations without a rebuild; lookups are a matrix-vector product.
+    It is built once after startup (or by the first request that needs it, whichever comes
+    first); embedding all profiles runs in a worker thread.
+    """
+
+    def __init__(self, embedder: HashingEmbedder, mentors: MentorIndex = mentor_index, capacity: int = 1024):
+        self.embedder = embedder
+        self.mentors = mentors
+        self._matrix = np.zeros((capacity, embedder.dim), dtype=np.float32)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._rows: Dict[int, int] = {}
+        self._skills: Dict[int, List[str]] = {}
+        self._notes: Dict[int, List[str]] = {}
+        self._build_lock = asyncio.Lock()
+        # Registrations reported while a build is in flight, applied once it has swapped in.
+        self._pending: List[Tuple[int, models.UserRole, List[str]]] | None = None
+        self._following = False
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    async def ensure_built(self, db: AsyncSession) -> None:
+        """Builds the index unless it is ready; concurrent first callers wait for one build."""
+        if self.ready:
+            return
+        async with self._build_lock:
+            if not self.ready:
+                await self.build(db)
+
+    async def build(self, db: AsyncSession) -> None:
+        """Embeds every mentor's profile from the database and follows MentorIndex updates from then on."""
+        if not self._following:
+            self.mentors.add_listener(self.on_mentor_changed)
+            self._following = True
+        self._pending = []
+        try:
+            mentors = await db.execute(
+                select(models.User).options(selectinload(models.User.skills)).where(models.User.role.in_(MENTOR_ROLES))
+            )
+            sessions = models.MentorshipSession
+            # Only the latest few summaries per mentor, already truncated, leave the database.
+            ranked = (
+                select(
+                    sessions.mentor_id,
+                    func.substr(sessions.summary, 1, settings.SEMANTIC_PROFILE_SUMMARY_CHARS).label("summary"),
+                    func.row_number().over(partition_by=sessions.mentor_id, order_by=sessions.id.desc()).label("position"),
+                )
+                .where(sessions.status == models.SessionStatus.COMPLETED, sessions.summary.is_not(None))
+                .subquery()
+            )
+            summaries = await db.execute(
+                select(ranked.c.mentor_id, ranked.c.summary)
+                .where(ranked.c.position <= settings.SEMANTIC_PROFILE_SUMMARIES)
+                .order_by(ranked.c.mentor_id, ranked.c.position)
+            )
+            notes: Dict[int, List[str]] = {}
+            for mentor_id, summary in summaries.all():
+                notes.setdefault(mentor_id, []).append(summary)
+            skills = {user.id: [skill.name for skill in user.skills] for user in mentors.scalars().all()}
+            ids = list(skills)
+            profiles = [self._profile(skills.get(mentor_id, []), notes.get(mentor_id, [])) for mentor_id in ids]
+            matrix = await asyncio.to_thread(self.embedder.embed_many, profiles)
+
+            self._rows = {}
+            self._skills, self._notes = skills, notes
+            self._reserve(len(ids))
+            self._matrix[:len(ids)] = matrix
+            self._ids[:len(ids)] = ids
+            self._rows = {mentor_id: row for row, mentor_id in enumerate(ids)}
+            self.ready = True
+        finally:
+            pending, self._pending = self._pending, None
+        for change in pending:
+            self.on_mentor_changed(*change)
+
+    @staticmethod
+    def _profile(skill_names: List[str], notes: List[str]) -> str:
+        return "\n".join([" ".join(skill_names), *notes])
+
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._ids):
+            return
+        capacity = max(size, 2 * len(self._ids))
+        matrix = np.zeros((capacity, self.embedder.dim), dtype=np.float32)
+        ids = np.zeros(capacity, dtype=np.int64)
+        count = len(self._rows)
+        matrix[:count] = self._matrix[:count]
+        ids[:count] = self._ids[:count]
+        self._matrix, self._ids = matrix, ids
+
+    def on_mentor_changed(self, user_id: int, role: models.UserRole, skill_names: List[str]) -> None:
+        """MentorIndex listener: re-embeds a (re)registered mentor, drops users who stopped mentoring."""
+        if self._pending is not None:
+            self._pending.append((user_id, role, list(skill_names)))
+            return
+        if role in MENTOR_ROLES:
+            self._skills[user_id] = list(skill_names)
+            self._store(user_id)
+        else:
+            self.remove(user_id)
+
+    def add_note(self, mentor_id: int, text: str) -> None:
+        """Adds a completed session's summary to the mentor's profile."""
+        if mentor_id not in self._rows:
+            return
+        notes = self._notes.setdefault(mentor_id, [])
+        notes.insert(0, text[:settings.SEMANTIC_PROFILE_SUMMARY_CHARS])
+        del notes[settings.SEMANTIC_PROFILE_SUMMARIES:]
+        self._store(mentor_id)
+
+    def _store(self, mentor_id: int) -> None:
+        row = self._rows.get(mentor_id)
+        if row is None:
+            row = len(self._rows)
+            self._reserve(row + 1)
+            self._rows[mentor_id] = row
+            self._ids[row] = mentor_id
+        self._matrix[row] = self.embedder.embed(self._profile(self._skills.get(mentor_id, []), self._notes.get(mentor_id, [])))
+
+    def remove(self, mentor_id: int) -> None:
+        row = self._rows.pop(mentor_id, None)
+        self._skills.pop(mentor_id, None)
+        self._notes.pop(mentor_id, None)
+        if row is None:
+            return
+        # Keep the matrix dense: the last row moves into the hole.
+        last = len(self._rows)
+        if row != last:
+            moved_id = int(self._ids[last])
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+        self._matrix[last] = 0
+
+    def vectors(self, mentor_ids: Iterable[int]) -> np.ndarray:
+        """Profile embeddings of `mentor_ids`, one row each (zeros for mentors not indexed)."""
+        rows = np.fromiter((self._rows.get(int(mentor_id), -1) for mentor_id in mentor_ids), dtype=np.int64)
+        vectors = np.zeros((len(rows), self.embedder.dim), dtype=np.float32)
+        known = rows >= 0
+        vectors[known] = self._matrix[rows[known]]
+        return vectors
+
+    def similarity(self, query: np.ndarray, mentor_ids: Iterable[int]) -> np.ndarray:
+        """Cosine similarity of `query` to each of `mentor_ids` (0 for mentors not indexed)."""
+        return self.vectors(mentor_ids) @ query
+
+    def search(self, text: str, k: int = 10) -> List[Tuple[int, float]]:
+        """The `k` mentors whose profiles are most similar to `text`, best first."""
+        count = len(self._rows)
+        if not count:
+            return []
+        scores = self._matrix[:count] @ self.embedder.embed(text)
+        top = np.argpartition(-scores, min(k, count) - 1)[:k] if count > k else np.arange(count)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self._ids[row]), float(scores[row])) for row in top]
+
+mentor_embeddings = MentorEmbeddingIndex(HashingEmbedder(dim=settings.SEMANTIC_EMBEDDING_DIM))
@@ -0,0 +1,172 @@
+from __future__ import annotations
+import bisect
+import heapq
+import itertools
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from app.db import models
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+MENTOR_ROLES = (models.UserRole.MENTOR, models.UserRole.BOTH)
+
+# Called with (user_id, role, skill_names) after every upsert, e.g. to keep derived indexes in step.
+MentorListener = Callable[[int, models.UserRole, List[str]], None]
+
+def skill_tokens(skill_name: str) -> List[str]:
+    """Splits a skill name into normalized lowercase tokens ("Python Web-Dev" -> ["python", "web", "dev"])."""
+    return _TOKEN_RE.findall(skill_name.lower())
+
+def normalize_skill(skill_name: str) -> str:
+    """Returns the canonical, whitespace-collapsed form of a skill name."""
+    return " ".join(skill_tokens(skill_name))
+
+@dataclass
+class MentorEntry:
+    id: int
+    username: str
+    trust_score: float
+    tokens: Set[str]
+    # The tokens of each skill on its own; a query must be covered by a single skill.
+    skills: List[Set[str]]
+
+    @property
+    def sort_key(self) -> Tuple[float, int]:
+        return (-self.trust_score, self.id)
+
+class MentorIndex:
+    """
+    In-memory inverted index from normalized skill tokens to mentors.
+    Each posting list is kept sorted by trust score (descending), so a top-k
+    lookup walks at most k entries instead of scanning the users table.
+    Tokens are also kept in a sorted list, so a prefix query ("pyth") finds its
+    indexed completions with a bisect instead of a scan of the vocabulary.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, List[Tuple[float, int]]] = {}
+        self._tokens: List[str] = []
+        self._mentors: Dict[int, MentorEntry] = {}
+        self._listeners: List[MentorListener] = []
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._mentors)
+
+    def add_listener(self, listener: MentorListener) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: MentorListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def build(self, db: AsyncSession) -> None:
+        """(Re)builds the index from all mentors in the database."""
+        query = (
+            select(models.User)
+            .options(selectinload(models.User.skills))
+            .where(models.User.role.in_(MENTOR_ROLES))
+        )
+        result = await db.execute(query)
+        self._postings.clear()
+        self._tokens.clear()
+        self._mentors.clear()
+        for user in result.scalars().all():
+            self.index_user(user)
+        self.ready = True
+
+    def index_user(self, user: models.User) -> None:
+        """Adds or refreshes a user whose `skills` relationship is already loaded."""
+        self.upsert_mentor(
+            user_id=user.id,
+            username=user.username,
+            trust_score=user.trust_score if user.trust_score is not None else 50.0,
+            role=user.role,
+            skill_names=[skill.name for skill in user.skills],
+        )
+
+    def upsert_mentor(
+        self,
+        user_id: int,
+        username: str,
+        trust_score: float,
+        role: models.UserRole,
+        skill_names: Iterable[str],
+    ) -> None:
+        """Incrementally inserts or updates a single mentor's postings."""
+        self.remove(user_id)
+        skill_names = list(skill_names)
+        for listener in self._listeners:
+            listener(user_id, role, skill_names)
+        if role not in MENTOR_ROLES:
+            return
+        skills = [set(skill_tokens(name)) for name in skill_names]
+        tokens = set().union(*skills)
+        entry = MentorEntry(id=user_id, username=username, trust_score=trust_score, tokens=tokens, skills=skills)
+        self._mentors[user_id] = entry
+        for token in tokens:
+            if token not in self._postings:
+                self._postings[token] = []
+                bisect.insort(self._tokens, token)
+            bisect.insort(self._postings[token], entry.sort_key)
+
+    def remove(self, user_id: int) -> None:
+        entry = self._mentors.pop(user_id, None)
+        if entry is None:
+            return
+        key = entry.sort_key
+        for token in entry.tokens:
+            postings = self._postings[token]
+            del postings[bisect.bisect_left(postings, key)]
+            if not postings:
+                del self._postings[token]
+                del self._tokens[bisect.bisect_left(self._tokens, token)]
+
+    def top_mentors(self, skill_name: str, limit: int = 10, min_trust: float = 50.0) -> List[MentorEntry]:
+        """
+        Returns up to `limit` mentors with a skill covering every token of `skill_name`,
+        ordered by trust score, keeping only those strictly above `min_trust`.
+        """
+        return list(itertools.islice(self.matching_mentors(skill_name, min_trust), limit))
+
+    def matching_mentors(self, skill_name: str, min_trust: float = 50.0) -> Iterator[MentorEntry]:
+        """
+        Yields the mentors with one skill covering every token of `skill_name` in trust order,
+        stopping at `min_trust`; "machine learning" does not match "Machine Design" plus
+        "Learning Theory", just as the SQL fallback's LIKE does not. A query token that is not indexed verbatim matches the indexed tokens it is a
+        prefix of; their posting lists are merged lazily, so only the entries actually
+        walked are paid for.
+        """
+        tokens = skill_tokens(skill_name)
+        if not tokens:
+            return
+        required = [self._expand(token) for token in tokens]
+        if not all(required):
+            return
+        # Walk the token with the fewest postings; the others are checked per mentor.
+        narrowest = min(required, key=lambda options: sum(len(self._postings[token]) for token in options))
+        candidates = heapq.merge(*(self._postings[token] for token in narrowest))
+
+        last_id = None
+        for neg_trust, user_id in candidates:
+            if -neg_trust <= min_trust:
+                break
+            if user_id == last_id:
+                continue
+            last_id = user_id
+            entry = self._mentors[user_id]
+            if any(all(skill & options for options in required) for skill in entry.skills):
+                yield entry
+
+    def _expand(self, token: str) -> Set[str]:
+        """The indexed tokens `token` stands for: itself, or else every indexed token it prefixes."""
+        if token in self._postings:
+            return {token}
+        start = bisect.bisect_left(self._tokens, token)
+        end = bisect.bisect_left(self._tokens, token + "\uffff", lo=start)
+        return set(self._tokens[start:end])
+
+mentor_index = MentorIndex()
@@ -0,0 +1,209 @@
+from __future__ import annotations
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Sequence, Set
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from app.core.config import settings
+from app.db import models
+from app.services.mentor_embeddings import mentor_embeddings
+from app.services.mentor_index import MENTOR_ROLES, mentor_index, skill_tokens
+from app.services.skill_index import skill_name_filter
+
+# Sessions that keep a mentor busy.
+ACTIVE_STATUSES = (models.SessionStatus.MATCHED, models.SessionStatus.ACTIVE)
+# SQLite caps bound parameters; larger candidate sets aggregate over every mentor instead.
+_MAX_IN_CLAUSE = 900
+
+@dataclass
+class CandidateFeatures:
+    """Column-oriented features of the mentors eligible for one request."""
+    mentor_ids: np.ndarray        # int64
+    usernames: List[str]
+    trust: np.ndarray             # float32, 0..100
+    overlap: np.ndarray           # float32, share of the wanted skill tokens the mentor covers
+    load: np.ndarray              # float32, MATCHED/ACTIVE sessions
+    idle_days: np.ndarray         # float32, days since the mentor's last session (inf if never)
+    similarity: np.ndarray | None = field(default=None)  # float32, profile similarity to the request
+
+    def __len__(self) -> int:
+        return len(self.mentor_ids)
+
+    @classmethod
+    def build(cls, mentors: Sequence[tuple[int, str, float, Set[str]]], wanted: Set[str],
+              activity: Dict[int, tuple[int, datetime | None]], now: datetime,
+              similarity: np.ndarray | None = None) -> "CandidateFeatures":
+        count = len(mentors)
+        wanted_size = max(len(wanted), 1)
+        loads = np.zeros(count, dtype=np.float32)
+        idle = np.full(count, np.inf, dtype=np.float32)
+        for position, (mentor_id, _, _, _) in enumerate(mentors):
+            active, last_session = activity.get(mentor_id, (0, None))
+            loads[position] = active
+            if last_session is not None:
+                idle[position] = (now - last_session).total_seconds() / 86400
+        return cls(
+            mentor_ids=np.fromiter((mentor[0] for mentor in mentors), dtype=np.int64, count=count),
+            usernames=[mentor[1] for mentor in mentors],
+            trust=np.fromiter((mentor[2] for mentor in mentors), dtype=np.float32, count=count),
+            overlap=np.fromiter((len(mentor[3] & wanted) / wanted_size for mentor in mentors), dtype=np.float32, count=count),
+            load=loads,
+            idle_days=idle,
+            similarity=similarity,
+        )
+
+@dataclass
+class ScoredMentor:
+    id: int
+    username: str
+    score: float
+    trust_score: float
+    overlap: float
+    load: int
+
+class MentorScorer:
+    """
+    Deterministic mentor ranking. Every eligible mentor is scored in one vectorized pass:
+
+        score = w_trust * trust / 100 + w_overlap * overlap
+              - w_load * load / capacity + w_recency * 0.5 ** (idle_days / half_life)
+              + w_semantic * similarity(profile, request_details)
+
+    Mentors already at `capacity` active sessions are excluded. Recency rewards mentors
+    who had a session lately, i.e. who are likely still responsive.
+    """
+
+    def __init__(self, weights: Dict[str, float], capacity: int, recency_half_life_days: float, min_trust: float = 50.0):
+        self.weights = weights
+        self.capacity = capacity
+        self.recency_half_life_days = recency_half_life_days
+        self.min_trust = min_trust
+        self.scored = 0
+        self.score_seconds = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "MentorScorer":
+        return cls(
+            weights=settings.MENTOR_SCORE_WEIGHTS,
+            capacity=settings.MENTOR_MAX_ACTIVE_SESSIONS,
+            recency_half_life_days=settings.MENTOR_RECENCY_HALF_LIFE_DAYS,
+        )
+
+    def score(self, features: CandidateFeatures) -> np.ndarray:
+        """Scores every candidate; mentors at capacity get -inf."""
+        weights = self.weights
+        recency = self.recency(features.idle_days)
+        scores = (
+            weights.get("trust", 0.0) * features.trust / np.float32(100)
+            + weights.get("overlap", 0.0) * features.overlap
+            - weights.get("load", 0.0) * features.load / np.float32(self.capacity)
+            + weights.get("recency", 0.0) * recency
+        ).astype(np.float32)
+        if features.similarity is not None:
+            scores += np.float32(weights.get("semantic", 0.0)) * features.similarity
+        scores[features.load >= self.capacity] = -np.inf
+        return scores
+
+    def recency(self, idle_days: np.ndarray) -> np.ndarray:
+        """1.0 for a session today, halving every `recency_half_life_days`; 0.0 for mentors without sessions."""
+        return np.exp2(-idle_days / np.float32(self.recency_half_life_days))
+
+    def rank(self, features: CandidateFeatures, limit: int) -> List[ScoredMentor]:
+        """The `limit` best mentors, best first; ties go to the lower mentor ID."""
+        if not len(features):
+            return []
+        started = time.perf_counter()
+        scores = self.score(features)
+        eligible = np.flatnonzero(np.isfinite(scores))
+        if len(eligible) > limit:
+            # Partial selection first, so only `limit` entries are fully sorted.
+            eligible = eligible[np.argpartition(-scores[eligible], limit - 1)[:limit]]
+        top = eligible[np.lexsort((features.mentor_ids[eligible], -scores[eligible]))]
+        self.scored += len(features)
+        self.score_seconds += time.perf_counter() - started
+        return [
+            ScoredMentor(
+                id=int(features.mentor_ids[position]),
+                username=features.usernames[position],
+                score=round(float(scores[position]), 4),
+                trust_score=float(features.trust[position]),
+                overlap=round(float(features.overlap[position]), 4),
+                load=int(features.load[position]),
+            )
+            for position in top
+        ]
+
+    async def load_features(
+        self, db: AsyncSession, skill_name: str, mentee_id: int | None = None, request_details: str | None = None
+    ) -> CandidateFeatures:
+        """Collects the mentors covering `skill_name` and their features with one query per feature source."""
+        mentors = await self._candidates(db, skill_name)
+        wanted = set(skill_tokens(skill_name))
+        if mentee_id is not None:
+            mentee_skills = await db.execute(
+                select(models.Skill.name)
+                .join(models.user_skills_association, models.user_skills_association.c.skill_id == models.Skill.id)
+                .where(models.user_skills_association.c.user_id == mentee_id)
+            )
+            wanted.update(token for name in mentee_skills.scalars() for token in skill_tokens(name))
+        mentors = [mentor for mentor in mentors if mentor[0] != mentee_id]
+        activity = await self.activity(db, [mentor[0] for mentor in mentors])
+        similarity = None
+        if request_details and settings.SEMANTIC_MATCHING_ENABLED:
+            await mentor_embeddings.ensure_built(db)
+            query = mentor_embeddings.embedder.embed(f"{skill_name}\n{request_details}")
+            similarity = mentor_embeddings.similarity(query, (mentor[0] for mentor in mentors))
+        return CandidateFeatures.build(mentors, wanted, activity, datetime.utcnow(), similarity)
+
+    async def _candidates(self, db: AsyncSession, skill_name: str) -> List[tuple[int, str, float, Set[str]]]:
+        if settings.MENTOR_INDEX_ENABLED and mentor_index.ready:
+            return [
+                (entry.id, entry.username, entry.trust_score, entry.tokens)
+                for entry in mentor_index.matching_mentors(skill_name, min_trust=self.min_trust)
+            ]
+        query = (
+            select(models.User)
+            .options(selectinload(models.User.skills))
+            .join(models.User.skills)
+            .where(
+                skill_name_filter(skill_name),
+                models.User.role.in_(MENTOR_ROLES),
+                models.User.trust_score > self.min_trust,
+            )
+        )
+        users = (await db.execute(query)).scalars().unique().all()
+        return [
+            (user.id, user.username, user.trust_score, {token for skill in user.skills for token in skill_tokens(skill.name)})
+            for user in users
+        ]
+
+    async def activity(self, db: AsyncSession, mentor_ids: List[int]) -> Dict[int, tuple[int, datetime | None]]:
+        """Active-session count and last session time per mentor, in one grouped query."""
+        if not mentor_ids:
+            return {}
+        sessions = models.MentorshipSession
+        query = (
+            select(
+                sessions.mentor_id,
+                func.count().filter(sessions.status.in_(ACTIVE_STATUSES)),
+                func.max(sessions.created_at),
+            )
+            .where(sessions.mentor_id.is_not(None))
+            .group_by(sessions.mentor_id)
+        )
+        if len(mentor_ids) <= _MAX_IN_CLAUSE:
+            query = query.where(sessions.mentor_id.in_(mentor_ids))
+        rows = await db.execute(query)
+        return {mentor_id: (active, last_session) for mentor_id, active, last_session in rows}
+
+    def stats(self) -> dict:
+        return {
+            "candidates_scored": self.scored,
+            "score_seconds": round(self.score_seconds, 6),
+        }
+
+mentor_scorer = MentorScorer.from_settings()
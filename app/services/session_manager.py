@@ -1,9 +1,44 @@
 from __future__ import annotations
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence, Tuple
+from sqlalchemy import Row, case, event, func, insert, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import metrics
 from app.db import models
+from app.services.event_bus import event_bus
+from app.services.skill_index import canonical_skill_name, index_after_commit, skill_index
+
+_PENDING_EVENTS = "pending_session_events"
+# What the session read API returns: everything but the transcript and summary text.
+SESSION_VIEW_COLUMNS = (
+    models.MentorshipSession.id,
+    models.MentorshipSession.mentee_id,
+    models.MentorshipSession.mentor_id,
+    models.MentorshipSession.requested_skill_id,
+    models.MentorshipSession.status,
+    models.MentorshipSession.failure_reason,
+    models.MentorshipSession.created_at,
+    models.MentorshipSession.scheduled_at,
+)
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_events(session: Session) -> None:
+    """Lifecycle events are only published once the transition they describe is durable."""
+    for pending in session.info.pop(_PENDING_EVENTS, []):
+        event_bus.publish(**pending)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_events(session: Session) -> None:
+    session.info.pop(_PENDING_EVENTS, None)
 
 class SessionManager:
+    @staticmethod
+    def _queue_event(db: AsyncSession, session_id: int, status: models.SessionStatus, **fields) -> None:
+        db.info.setdefault(_PENDING_EVENTS, []).append({"session_id": session_id, "status": status.value, **fields})
+
     @staticmethod
     async def get_session_by_id(db: AsyncSession, session_id: int) -> models.MentorshipSession | None:
         """Retrieves a single session by its ID."""
@@ -11,46 +46,182 @@ class SessionManager:
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def create_session_request(db: AsyncSession, mentee_id: int, skill_id: int) -> models.MentorshipSession:
-        """Creates a new mentorship session with a 'PENDING' status."""
-        new_session = models.MentorshipSession(
-            mentee_id=mentee_id,
-            requested_skill_id=skill_id,
-            status=models.SessionStatus.PENDING
+    async def get_session_view(db: AsyncSession, session_id: int) -> Row | None:
+        """The lean projection of one session, without loading the ORM object."""
+        result = await db.execute(select(*SESSION_VIEW_COLUMNS).where(models.MentorshipSession.id == session_id))
+        return result.one_or_none()
+
+    @staticmethod
+    @metrics.timed("db.list_sessions")
+    async def list_sessions(
+        db: AsyncSession,
+        mentee_id: int | None = None,
+        mentor_id: int | None = None,
+        status: models.SessionStatus | None = None,
+        before: Tuple[datetime, int] | None = None,
+        limit: int = 50,
+    ) -> Sequence[Row]:
+        """
+        One page of lean session rows, newest first. `before` is the (created_at, id) of the
+        previous page's last row: with the matching composite index every page is a range
+        scan from that key, however deep the client pages (OFFSET would rescan the skipped rows).
+        """
+        query = select(*SESSION_VIEW_COLUMNS)
+        if mentee_id is not None:
+            query = query.where(models.MentorshipSession.mentee_id == mentee_id)
+        if mentor_id is not None:
+            query = query.where(models.MentorshipSession.mentor_id == mentor_id)
+        if status is not None:
+            query = query.where(models.MentorshipSession.status == status)
+        if before is not None:
+            query = query.where(tuple_(models.MentorshipSession.created_at, models.MentorshipSession.id) < tuple_(*before))
+        result = await db.execute(
+            query.order_by(models.MentorshipSession.created_at.desc(), models.MentorshipSession.id.desc()).limit(limit)
         )
-        db.add(new_session)
-        await db.commit()
-        await db.refresh(new_session)
+        return result.all()
+
+    @staticmethod
+    @metrics.timed("db.create_session_request")
+    async def create_session_request(
+        db: AsyncSession, mentee_id: int, skill_id: int, commit: bool = True
+    ) -> models.MentorshipSession:
+        """Creates a new mentorship session with a 'PENDING' status in a single INSERT ... RETURNING."""
+        result = await db.execute(
+            insert(models.MentorshipSession)
+            .values(mentee_id=mentee_id, requested_skill_id=skill_id, status=models.SessionStatus.PENDING)
+            .returning(models.MentorshipSession)
+        )
+        new_session = result.scalar_one()
+        SessionManager._queue_event(db, new_session.id, models.SessionStatus.PENDING)
+        if commit:
+            await db.commit()
         return new_session
 
     @staticmethod
-    async def assign_mentor_to_session(db: AsyncSession, session_id: int, mentor_id: int) -> models.MentorshipSession | None:
-        """Assigns a mentor to a session and updates its status to 'MATCHED'."""
-        session = await SessionManager.get_session_by_id(db, session_id)
-        if session:
-            session.mentor_id = mentor_id
-            session.status = models.SessionStatus.MATCHED
+    @metrics.timed("db.transition_session")
+    async def transition_session(
+        db: AsyncSession,
+        session_id: int,
+        to_status: models.SessionStatus,
+        from_status: models.SessionStatus = models.SessionStatus.PENDING,
+        commit: bool = True,
+        **values,
+    ) -> models.MentorshipSession | None:
+        """
+        Moves a session from `from_status` to `to_status` with one conditional
+        UPDATE ... WHERE status = from_status RETURNING. Returns None when the session
+        does not exist or another worker already moved it. With commit=False the caller commits.
+        """
+        result = await db.execute(
+            update(models.MentorshipSession)
+            .where(models.MentorshipSession.id == session_id, models.MentorshipSession.status == from_status)
+            .values(status=to_status, **values)
+            .returning(models.MentorshipSession)
+            .execution_options(populate_existing=True)
+        )
+        session = result.scalar_one_or_none()
+        if session is not None:
+            SessionManager._queue_event(
+                db, session_id, to_status, reason=session.failure_reason, mentor_id=session.mentor_id
+            )
+        if commit:
             await db.commit()
-            await db.refresh(session)
-            return session
-        return None
+        return session
 
     @staticmethod
-    async def mark_session_failed(db: AsyncSession, session_id: int, reason: str) -> models.MentorshipSession | None:
-        """Updates a session's status to 'FAILED' and records the reason."""
-        session = await SessionManager.get_session_by_id(db, session_id)
-        if session:
-            session.status = models.SessionStatus.FAILED
-            session.failure_reason = reason
+    @metrics.timed("db.assign_mentor_to_session")
+    async def assign_mentor_to_session(db: AsyncSession, session_id: int, mentor_id: int, commit: bool = True) -> models.MentorshipSession | None:
+        """Assigns a mentor to a PENDING session and updates its status to 'MATCHED'."""
+        return await SessionManager.transition_session(
+            db, session_id, models.SessionStatus.MATCHED, commit=commit, mentor_id=mentor_id
+        )
+
+    @staticmethod
+    @metrics.timed("db.mark_session_failed")
+    async def mark_session_failed(db: AsyncSession, session_id: int, reason: str, commit: bool = True) -> models.MentorshipSession | None:
+        """Updates a PENDING session's status to 'FAILED' and records the reason."""
+        return await SessionManager.transition_session(
+            db, session_id, models.SessionStatus.FAILED, commit=commit, failure_reason=reason
+        )
+
+    @staticmethod
+    @metrics.timed("db.cancel_session")
+    async def cancel_session(db: AsyncSession, session_id: int, commit: bool = True) -> models.MentorshipSession | None:
+        """Moves a PENDING session to 'CANCELLED'; returns None if it is no longer pending."""
+        return await SessionManager.transition_session(db, session_id, models.SessionStatus.CANCELLED, commit=commit)
+
+    @staticmethod
+    @metrics.timed("db.bulk_transition")
+    async def bulk_transition(
+        db: AsyncSession,
+        session_ids: Iterable[int],
+        to_status: models.SessionStatus,
+        from_status: models.SessionStatus = models.SessionStatus.PENDING,
+        commit: bool = True,
+        **values,
+    ) -> List[int]:
+        """Moves many sessions in one statement; returns the IDs that were actually transitioned."""
+        session_ids = list(session_ids)
+        if not session_ids:
+            return []
+        result = await db.execute(
+            update(models.MentorshipSession)
+            .where(models.MentorshipSession.id.in_(session_ids), models.MentorshipSession.status == from_status)
+            .values(status=to_status, **values)
+            .returning(models.MentorshipSession.id, models.MentorshipSession.mentor_id, models.MentorshipSession.failure_reason)
+            .execution_options(synchronize_session="fetch")
+        )
+        moved = []
+        for session_id, mentor_id, reason in result.all():
+            moved.append(session_id)
+            SessionManager._queue_event(db, session_id, to_status, reason=reason, mentor_id=mentor_id)
+        if commit:
             await db.commit()
-            await db.refresh(session)
-            return session
-        return None
+        return moved
+
+    @staticmethod
+    @metrics.timed("db.bulk_assign_mentors")
+    async def bulk_assign_mentors(db: AsyncSession, assignments: Dict[int, int], commit: bool = True) -> List[int]:
+        """Assigns a (possibly different) mentor to each PENDING session in one statement."""
+        if not assignments:
+            return []
+        return await SessionManager.bulk_transition(
+            db,
+            assignments.keys(),
+            models.SessionStatus.MATCHED,
+            commit=commit,
+            mentor_id=case(assignments, value=models.MentorshipSession.id),
+        )
 
-    # --- THIS IS THE CORRECTED METHOD ---
-    # The indentation has been fixed to align it with the other methods in the class.
     @staticmethod
     async def get_skill_by_name(db: AsyncSession, skill_name: str) -> models.Skill | None:
-        """Retrieves a skill by its name (case-insensitive)."""
-        result = await db.execute(select(models.Skill).where(models.Skill.name.ilike(skill_name)))
-        return result.scalar_one_or_none()
\ No newline at end of file
+        """
+        Retrieves a skill by name, treating spelling variants ("python", "Python3", "py")
+        as the same skill. The in-memory skill index answers most lookups with a primary-key
+        get; misses (e.g. skills created by another worker) fall back to SQL.
+        """
+        canonical = canonical_skill_name(skill_name)
+        if not canonical:
+            return None
+        if settings.SKILL_INDEX_ENABLED and skill_index.ready:
+            skill_id = skill_index.resolve(skill_name)
+            if skill_id is not None:
+                skill = await db.get(models.Skill, skill_id)
+                # The index is a cache; the row must still carry the name it was indexed under.
+                if skill is not None and canonical_skill_name(skill.name) == canonical:
+                    return skill
+
+        # The exact name is served by the skills.name index; variants need the lower() scan.
+        result = await db.execute(select(models.Skill).where(models.Skill.name == skill_name.strip()))
+        skill = result.scalars().first()
+        if skill is None:
+            result = await db.execute(
+                select(models.Skill)
+                .where(func.lower(models.Skill.name).in_({skill_name.strip().lower(), canonical}))
+                .order_by(models.Skill.id)
+            )
+            skill = next((row for row in result.scalars() if canonical_skill_name(row.name) == canonical), None)
+        if skill is not None and skill_index.ready:
+            # The row may only be flushed in the caller's transaction: index it once that commits.
+            index_after_commit(db, skill.id, skill.name)
+        return skill
@@ -0,0 +1,222 @@
+from __future__ import annotations
+import bisect
+import heapq
+from collections import Counter
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, List, Set, Tuple
+from sqlalchemy import and_, event, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db import models
+from app.services.mentor_index import normalize_skill, skill_tokens
+
+def canonical_skill_name(skill_name: str) -> str:
+    """
+    Normalized form under which spelling variants collapse onto one skill:
+    lowercase tokens, then SKILL_ALIASES applied to the whole name and to each token
+    ("Python3", "py" and " PYTHON " are all "python").
+    """
+    tokens = skill_tokens(skill_name)
+    aliases = settings.SKILL_ALIASES
+    joined = " ".join(tokens)
+    if joined in aliases:
+        return aliases[joined]
+    return " ".join(aliases.get(token, token) for token in tokens)
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of `text` padded with spaces, so word starts and ends get their own trigrams."""
+    padded = f"  {text} "
+    return {padded[start:start + 3] for start in range(len(padded) - 2)}
+
+@dataclass
+class SkillMatch:
+    id: int
+    name: str
+    score: float
+
+class SkillIndex:
+    """
+    In-memory index over skill names, keyed by canonical name.
+    Exact lookups are a dict hit; substring search intersects trigram posting sets
+    (like '%x%' but without a table scan); fuzzy search ranks the skills sharing the most
+    trigrams with the query by Dice similarity; autocomplete bisects a sorted list of
+    canonical names. The database stays the source of truth: callers verify a hit
+    against the row and fall back to SQL on a miss (skills created by another worker).
+    """
+
+    def __init__(self):
+        self._names: Dict[int, str] = {}
+        self._canonical: Dict[int, str] = {}
+        self._by_canonical: Dict[str, int] = {}
+        self._sorted: List[Tuple[str, int]] = []
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._gram_counts: Dict[int, int] = {}
+        # Skills above this id were created after the index last saw the table (e.g. by another worker).
+        self.max_id = 0
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    async def build(self, db: AsyncSession) -> None:
+        """(Re)builds the index from every skill in the database."""
+        result = await db.execute(select(models.Skill.id, models.Skill.name).order_by(models.Skill.id))
+        self.clear()
+        for skill_id, name in result.all():
+            self._sorted.append((self._add(skill_id, name), skill_id))
+        # Sorted once at the end instead of an insort per skill.
+        self._sorted.sort()
+        self.ready = True
+
+    def clear(self) -> None:
+        for mapping in (self._names, self._canonical, self._by_canonical, self._trigrams, self._gram_counts):
+            mapping.clear()
+        self._sorted.clear()
+        self.max_id = 0
+        self.ready = False
+
+    def add(self, skill_id: int, name: str) -> None:
+        """
+        Indexes one skill, replacing its entry if the id was indexed under another name;
+        when several rows share a canonical name the lowest id wins.
+        """
+        if self._names.get(skill_id) == name:
+            return
+        self.remove(skill_id)
+        bisect.insort(self._sorted, (self._add(skill_id, name), skill_id))
+
+    def remove(self, skill_id: int) -> None:
+        if self._names.pop(skill_id, None) is None:
+            return
+        canonical = self._canonical.pop(skill_id)
+        self._gram_counts.pop(skill_id, None)
+        for gram in trigrams(canonical):
+            postings = self._trigrams.get(gram)
+            if postings is not None:
+                postings.discard(skill_id)
+                if not postings:
+                    del self._trigrams[gram]
+        position = bisect.bisect_left(self._sorted, (canonical, skill_id))
+        if position < len(self._sorted) and self._sorted[position] == (canonical, skill_id):
+            del self._sorted[position]
+        if self._by_canonical.get(canonical) == skill_id:
+            others = [other for other, other_canonical in self._canonical.items() if other_canonical == canonical]
+            if others:
+                self._by_canonical[canonical] = min(others)
+            else:
+                del self._by_canonical[canonical]
+        self.max_id = max(self._names, default=0)
+
+    def _add(self, skill_id: int, name: str) -> str:
+        canonical = canonical_skill_name(name)
+        self.max_id = max(self.max_id, skill_id)
+        self._names[skill_id] = name
+        self._canonical[skill_id] = canonical
+        if canonical not in self._by_canonical or skill_id < self._by_canonical[canonical]:
+            self._by_canonical[canonical] = skill_id
+        grams = trigrams(canonical)
+        self._gram_counts[skill_id] = len(grams)
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(skill_id)
+        return canonical
+
+    def name(self, skill_id: int) -> str | None:
+        return self._names.get(skill_id)
+
+    def resolve(self, skill_name: str) -> int | None:
+        """The id of the skill `skill_name` is a spelling variant of, if any."""
+        return self._by_canonical.get(canonical_skill_name(skill_name))
+
+    def containing(self, text: str) -> List[int]:
+        """Ids of the skills whose canonical name contains the canonical form of `text`."""
+        needle = canonical_skill_name(text)
+        if not needle:
+            return []
+        # Inner trigrams only: the padded ones would anchor the needle at a word boundary.
+        grams = {needle[start:start + 3] for start in range(len(needle) - 2)}
+        if not grams:
+            return sorted(skill_id for skill_id, canonical in self._canonical.items() if needle in canonical)
+        postings = sorted((self._trigrams.get(gram, set()) for gram in grams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return sorted(skill_id for skill_id in candidates if needle in self._canonical[skill_id])
+
+    def fuzzy(self, text: str, limit: int = 10, min_similarity: float | None = None) -> List[SkillMatch]:
+        """Skills ranked by trigram Dice similarity to `text`, at least `min_similarity`."""
+        threshold = settings.SKILL_FUZZY_MIN_SIMILARITY if min_similarity is None else min_similarity
+        grams = trigrams(canonical_skill_name(text))
+        shared = Counter(chain.from_iterable(self._trigrams.get(gram, ()) for gram in grams))
+        # Duplicate rows of one canonical name are represented by the row `resolve` returns.
+        scored = (
+            (2 * count / (len(grams) + self._gram_counts[skill_id]), skill_id)
+            for skill_id, count in shared.items()
+            if self._by_canonical[self._canonical[skill_id]] == skill_id
+        )
+        best = heapq.nlargest(limit, (item for item in scored if item[0] >= threshold), key=lambda item: (item[0], -item[1]))
+        return [SkillMatch(skill_id, self._names[skill_id], round(score, 3)) for score, skill_id in best]
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[SkillMatch]:
+        """
+        Suggestions for a partially typed skill: the skill the text is an alias of, then
+        canonical names starting with it (shortest first), topped up with fuzzy matches.
+        """
+        needle = normalize_skill(prefix)
+        if not needle:
+            return []
+        matches: List[SkillMatch] = []
+        seen: Set[str] = set()
+
+        def offer(skill_id: int, score: float) -> None:
+            canonical = self._canonical[skill_id]
+            if canonical not in seen and len(matches) < limit:
+                seen.add(canonical)
+                matches.append(SkillMatch(self._by_canonical[canonical], self._names[self._by_canonical[canonical]], score))
+
+        aliased = self.resolve(prefix)
+        if aliased is not None:
+            offer(aliased, 1.0)
+        start = bisect.bisect_left(self._sorted, (needle,))
+        end = bisect.bisect_left(self._sorted, (needle + "\uffff",), lo=start)
+        # Only the `limit` shortest completions are ordered, however many share a short prefix.
+        for _, skill_id in heapq.nsmallest(limit + 1, self._sorted[start:end], key=lambda item: (len(item[0]), item)):
+            offer(skill_id, 1.0)
+        if len(matches) < limit:
+            for match in self.fuzzy(prefix, limit=limit):
+                offer(match.id, match.score)
+        return matches
+
+skill_index = SkillIndex()
+
+_PENDING_SKILLS = "pending_skill_index_entries"
+
+def index_after_commit(db: AsyncSession, skill_id: int, name: str) -> None:
+    """Adds a newly inserted skill to the index once its transaction commits."""
+    db.info.setdefault(_PENDING_SKILLS, []).append((skill_id, name))
+
+@event.listens_for(Session, "after_commit")
+def _index_committed_skills(session: Session) -> None:
+    for skill_id, name in session.info.pop(_PENDING_SKILLS, []):
+        if skill_index.ready:
+            skill_index.add(skill_id, name)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_skills(session: Session) -> None:
+    session.info.pop(_PENDING_SKILLS, None)
+
+# SQLite caps bound parameters; broader substring matches are left to LIKE.
+_MAX_IN_CLAUSE = 900
+
+def skill_name_filter(skill_name: str):
+    """
+    WHERE clause selecting the skills whose name contains `skill_name`. Served by the
+    trigram index as an id list when it is built, plus a LIKE over the ids the index has
+    not seen yet (skills created by another worker); a miss falls back to LIKE '%x%' alone.
+    """
+    like = models.Skill.name.ilike(f"%{skill_name}%")
+    if settings.SKILL_INDEX_ENABLED and skill_index.ready:
+        skill_ids = skill_index.containing(skill_name)
+        if skill_ids and len(skill_ids) <= _MAX_IN_CLAUSE:
+            return or_(models.Skill.id.in_(skill_ids), and_(models.Skill.id > skill_index.max_id, like))
+    return like
@@ -0,0 +1,84 @@
+from __future__ import annotations
+import zlib
+from typing import AsyncIterator, Iterable, List
+from sqlalchemy import func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.config import settings
+from app.db import models
+
+class TranscriptStore:
+    """
+    Append-only transcript storage. Messages are written as zlib-compressed chunks in
+    `transcript_chunks`, so appending never rewrites what is already stored and the
+    session row stays small. Sessions recorded before the store existed are read from
+    the legacy `MentorshipSession.transcript` column.
+    """
+
+    @staticmethod
+    def _pack(messages: Iterable[str]) -> List[List[str]]:
+        """Groups messages (one line each) into chunks of at most TRANSCRIPT_CHUNK_MAX_BYTES."""
+        chunks: List[List[str]] = []
+        current: List[str] = []
+        size = 0
+        for message in messages:
+            line = message.rstrip("\n") + "\n"
+            line_size = len(line.encode("utf-8"))
+            if current and size + line_size > settings.TRANSCRIPT_CHUNK_MAX_BYTES:
+                chunks.append(current)
+                current, size = [], 0
+            current.append(line)
+            size += line_size
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    async def append(db: AsyncSession, session_id: int, messages: Iterable[str], commit: bool = True) -> int:
+        """Appends messages to the session transcript; returns the number of chunks written."""
+        chunks = TranscriptStore._pack(messages)
+        for lines in chunks:
+            raw = "".join(lines).encode("utf-8")
+            next_sequence = (
+                select(func.coalesce(func.max(models.TranscriptChunk.sequence), 0) + 1)
+                .where(models.TranscriptChunk.session_id == session_id)
+                .scalar_subquery()
+            )
+            await db.execute(
+                insert(models.TranscriptChunk).values(
+                    session_id=session_id,
+                    sequence=next_sequence,
+                    message_count=len(lines),
+                    raw_size=len(raw),
+                    data=zlib.compress(raw, settings.TRANSCRIPT_COMPRESSION_LEVEL),
+                )
+            )
+        if commit:
+            await db.commit()
+        return len(chunks)
+
+    @staticmethod
+    async def stream(db: AsyncSession, session_id: int) -> AsyncIterator[str]:
+        """Yields the transcript chunk by chunk, decompressing one chunk at a time."""
+        result = await db.stream(
+            select(models.TranscriptChunk.data)
+            .where(models.TranscriptChunk.session_id == session_id)
+            .order_by(models.TranscriptChunk.sequence)
+            .execution_options(yield_per=16)
+        )
+        found = False
+        async for data in result.scalars():
+            found = True
+            yield zlib.decompress(data).decode("utf-8")
+        if not found:
+            legacy = await db.execute(
+                select(models.MentorshipSession.transcript).where(models.MentorshipSession.id == session_id)
+            )
+            transcript = legacy.scalar_one_or_none()
+            if transcript:
+                yield transcript
+
+    @staticmethod
+    async def read(db: AsyncSession, session_id: int) -> str:
+        """Returns the whole transcript as one string."""
+        return "".join([part async for part in TranscriptStore.stream(db, session_id)])
@@ -0,0 +1,215 @@
+from __future__ import annotations
+import asyncio
+import csv
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.config import settings
+from app.core.security import async_hasher
+from app.db import models
+from app.services.mentor_index import mentor_index
+from app.services.skill_index import canonical_skill_name, index_after_commit, skill_index
+
+# A row is the 1-based row number plus either the validated registration or why it was rejected.
+ParsedRow = Tuple[int, Any]
+
+async def iter_lines(chunks: AsyncIterable[bytes | str]) -> AsyncIterator[str]:
+    """Re-splits an async stream of byte/str chunks into text lines."""
+    buffer = ""
+    async for chunk in chunks:
+        buffer += chunk.decode("utf-8") if isinstance(chunk, bytes) else chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    if buffer:
+        yield buffer.rstrip("\r")
+
+class RowError(Exception):
+    """A row that could not be parsed or validated."""
+
+async def parse_rows(lines: AsyncIterable[str], schema: Type[BaseModel], fmt: str = "jsonl") -> AsyncIterator[ParsedRow]:
+    """
+    Parses a stream of JSONL or CSV lines and validates each record against `schema`.
+    CSV input needs a header row; its `skills` column is a ';'-separated list.
+    Rows that cannot be parsed or validated are yielded as (row_number, RowError).
+    """
+    header: List[str] | None = None
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            header = [column.strip() for column in next(csv.reader([line]))]
+            continue
+        row_number += 1
+        try:
+            if fmt == "csv":
+                record = dict(zip(header, next(csv.reader([line]))))
+                skills = record.get("skills") or ""
+                record["skills"] = [skill.strip() for skill in skills.split(";") if skill.strip()]
+                if not record.get("role"):
+                    record.pop("role", None)
+            else:
+                record = json.loads(line)
+        except (ValueError, csv.Error) as exc:
+            yield row_number, RowError(f"Unparseable row: {exc}")
+            continue
+        try:
+            yield row_number, schema.model_validate(record)
+        except ValidationError as exc:
+            yield row_number, RowError("; ".join(
+                f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in exc.errors()
+            ))
+
+class UserImporter:
+    """Set-based bulk registration of users and their skills."""
+
+    @staticmethod
+    async def import_users(
+        db: AsyncSession, rows: AsyncIterable[ParsedRow], batch_size: int = 500
+    ) -> AsyncIterator[dict]:
+        """Imports rows in batched transactions and yields one report per input row."""
+        batch: List[ParsedRow] = []
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                for report in await UserImporter._import_batch(db, batch):
+                    yield report
+                batch = []
+        if batch:
+            for report in await UserImporter._import_batch(db, batch):
+                yield report
+
+    @staticmethod
+    async def _import_batch(db: AsyncSession, batch: List[ParsedRow]) -> List[dict]:
+        reports: Dict[int, dict] = {}
+        valid: List[ParsedRow] = []
+        for row_number, user in batch:
+            if isinstance(user, RowError):
+                reports[row_number] = _error(row_number, str(user))
+            else:
+                valid.append((row_number, user))
+
+        valid = await UserImporter._drop_duplicates(db, valid, reports)
+        if not valid:
+            return [reports[row_number] for row_number, _ in batch]
+        hashes = await asyncio.gather(*(async_hasher.hash(user.password) for _, user in valid))
+        try:
+            created = await UserImporter._insert_users(db, valid, hashes)
+            await db.commit()
+        except IntegrityError:
+            # Something the duplicate check could not see (e.g. a concurrent registration):
+            # replay the batch row by row so only the offending rows are reported.
+            await db.rollback()
+            created = []
+            for row, hashed in zip(valid, hashes):
+                try:
+                    created += await UserImporter._insert_users(db, [row], [hashed])
+                    await db.commit()
+                except IntegrityError as exc:
+                    await db.rollback()
+                    reports[row[0]] = _error(row[0], f"Rejected by the database: {exc.orig}")
+
+        for row_number, user_id, user_data in created:
+            mentor_index.upsert_mentor(user_id, user_data.username, 50.0, user_data.role, user_data.skills)
+            reports[row_number] = {
+                "row": row_number, "status": "created", "user_id": user_id, "username": user_data.username
+            }
+        return [reports[row_number] for row_number, _ in batch]
+
+    @staticmethod
+    async def _drop_duplicates(
+        db: AsyncSession, rows: List[ParsedRow], reports: Dict[int, dict]
+    ) -> List[ParsedRow]:
+        """Rejects rows whose username or email already exists in the DB or earlier in the batch."""
+        if not rows:
+            return rows
+        usernames = {user.username for _, user in rows}
+        emails = {user.email for _, user in rows}
+        result = await db.execute(
+            select(models.User.username, models.User.email).where(
+                or_(models.User.username.in_(usernames), models.User.email.in_(emails))
+            )
+        )
+        taken_usernames, taken_emails = set(), set()
+        for username, email in result.all():
+            taken_usernames.add(username)
+            taken_emails.add(email)
+
+        unique = []
+        for row_number, user in rows:
+            if user.username in taken_usernames or user.email in taken_emails:
+                reports[row_number] = _error(row_number, "Username or email already exists.")
+                continue
+            taken_usernames.add(user.username)
+            taken_emails.add(user.email)
+            unique.append((row_number, user))
+        return unique
+
+    @staticmethod
+    async def _resolve_skills(db: AsyncSession, names: List[str]) -> Dict[str, int]:
+        """Maps canonical skill names to ids, creating all missing skills in one statement."""
+        wanted: Dict[str, str] = {}
+        for name in names:
+            wanted.setdefault(canonical_skill_name(name), name.strip())
+        wanted.pop("", None)
+        if not wanted:
+            return {}
+        skill_ids: Dict[str, int] = {}
+        if settings.SKILL_INDEX_ENABLED and skill_index.ready:
+            hinted = {skill_index.resolve(canonical) for canonical in wanted} - {None}
+            if hinted:
+                # Index hits are confirmed by primary key; the index is a cache of the table.
+                result = await db.execute(select(models.Skill.name, models.Skill.id).where(models.Skill.id.in_(hinted)))
+                for name, skill_id in result.all():
+                    if canonical_skill_name(name) in wanted:
+                        skill_ids.setdefault(canonical_skill_name(name), skill_id)
+        unresolved = {name.lower() for canonical, name in wanted.items() if canonical not in skill_ids}
+        unresolved |= {canonical for canonical in wanted if canonical not in skill_ids}
+        if unresolved:
+            result = await db.execute(
+                select(models.Skill.name, models.Skill.id)
+                .where(func.lower(models.Skill.name).in_(unresolved))
+                .order_by(models.Skill.id)
+            )
+            for name, skill_id in result.all():
+                skill_ids.setdefault(canonical_skill_name(name), skill_id)
+        missing = [{"name": name, "domain": "Uncategorized"} for canonical, name in wanted.items() if canonical not in skill_ids]
+        if missing:
+            result = await db.execute(insert(models.Skill).returning(models.Skill.name, models.Skill.id), missing)
+            for name, skill_id in result.all():
+                skill_ids[canonical_skill_name(name)] = skill_id
+                index_after_commit(db, skill_id, name)
+        return skill_ids
+
+    @staticmethod
+    async def _insert_users(db: AsyncSession, rows: List[ParsedRow], hashes: List[str]) -> List[Tuple[int, int, Any]]:
+        skill_ids = await UserImporter._resolve_skills(db, [name for _, user in rows for name in user.skills])
+        result = await db.execute(
+            insert(models.User).returning(models.User.username, models.User.id),
+            [
+                {"username": user.username, "email": user.email, "hashed_password": hashed, "role": user.role}
+                for (_, user), hashed in zip(rows, hashes)
+            ],
+        )
+        user_ids = dict(result.all())
+
+        links = {
+            (user_ids[user.username], skill_ids[canonical_skill_name(name)])
+            for _, user in rows
+            for name in user.skills
+            if name.strip()
+        }
+        if links:
+            await db.execute(
+                insert(models.user_skills_association),
+                [{"user_id": user_id, "skill_id": skill_id} for user_id, skill_id in links],
+            )
+        return [(row_number, user_ids[user.username], user) for row_number, user in rows]
+
+def _error(row_number: int, message: str) -> dict:
+    return {"row": row_number, "status": "error", "error": message}
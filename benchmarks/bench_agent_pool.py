@@ -0,0 +1,67 @@
+"""
+Per-request agent setup: building AutoGen agents per request vs. leasing them from the pool.
+
+Measures only the setup a request pays before its first completion (no model is called):
+the legacy path builds the agent, a UserProxyAgent and re-registers the tool function map
+every time; the pooled path leases a prebuilt chat, binds the DB session and resets it.
+
+    python -m benchmarks.bench_agent_pool --requests 500 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import time
+import autogen
+from app.agents.agent_pool import AgentPool
+from app.agents.orchestrator import agent_pool
+
+def build_fresh(pool: AgentPool, name: str) -> None:
+    kind = pool._kinds[name]
+    kind.agent_factory()
+    if kind.proxy_name:
+        proxy = autogen.UserProxyAgent(
+            name=kind.proxy_name, human_input_mode="NEVER", code_execution_config=False, **kind.proxy_options
+        )
+        proxy.register_function(function_map=dict(kind.tools))
+
+async def run_case(mode: str, name: str, args) -> dict:
+    pool = AgentPool(max_idle=args.concurrency)
+    pool._kinds = agent_pool._kinds
+    pool._idle = {kind: type(idle)() for kind, idle in agent_pool._idle.items()}
+    if mode == "pooled":
+        await pool.prewarm([name], count=args.concurrency)
+    gate = asyncio.Semaphore(args.concurrency)
+
+    async def request():
+        async with gate:
+            if mode == "fresh":
+                build_fresh(pool, name)
+            else:
+                async with pool.lease(name, db=None):
+                    pass
+            # Yields like a request awaiting its first completion would.
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "kind": name,
+        "mode": mode,
+        "requests": args.requests,
+        "setup_ms_per_request": round(elapsed / args.requests * 1000, 3),
+        "agents_built": pool.built if mode == "pooled" else args.requests,
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--kinds", nargs="*", default=["verification", "matchmaking", "summary"])
+    args = parser.parse_args()
+    for name in args.kinds:
+        for mode in ("fresh", "pooled"):
+            print(json.dumps(await run_case(mode, name, args)))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""
+Semantic mentor matching: hashed-embedding index build, incremental updates and lookups.
+
+Embeds synthetic mentor profiles (skills plus a session-summary-like note), then times
+a full-index nearest-neighbour search and the shortlist reordering the mentor tool does
+(similarity of one request to SEMANTIC_SHORTLIST_POOL candidates).
+
+    python -m benchmarks.bench_embeddings --mentors 50000 --queries 500
+"""
+import argparse
+import json
+import random
+import time
+from app.core.config import settings
+from app.db.models import UserRole
+from app.services.mentor_embeddings import HashingEmbedder, MentorEmbeddingIndex
+from app.services.mentor_index import MentorIndex
+
+WORDS = (
+    "python rust go java react django flask fastapi spark kafka redis postgresql docker kubernetes "
+    "terraform aws pandas numpy pytorch graphql linux testing performance security design api data"
+).split()
+
+def sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mentors", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=settings.SEMANTIC_EMBEDDING_DIM)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    mentors = MentorIndex()
+    index = MentorEmbeddingIndex(HashingEmbedder(dim=args.dim), mentors=mentors)
+    mentors.add_listener(index.on_mentor_changed)
+    started = time.perf_counter()
+    for mentor_id in range(1, args.mentors + 1):
+        mentors.upsert_mentor(mentor_id, f"mentor{mentor_id}", 80.0, UserRole.MENTOR, [sentence(rng, 2), sentence(rng, 1)])
+        index.add_note(mentor_id, sentence(rng, 12))
+    print(json.dumps({
+        "step": "incremental_build", "mentors": args.mentors,
+        "us_per_mentor": round((time.perf_counter() - started) / args.mentors * 1e6, 1),
+    }))
+
+    queries = [sentence(rng, 8) for _ in range(args.queries)]
+    started = time.perf_counter()
+    for query in queries:
+        index.search(query, k=10)
+    print(json.dumps({"step": "search_top10", "ms_per_query": round((time.perf_counter() - started) / len(queries) * 1000, 3)}))
+
+    pool = settings.SEMANTIC_SHORTLIST_POOL
+    started = time.perf_counter()
+    for query in queries:
+        index.similarity(index.embedder.embed(query), rng.sample(range(1, args.mentors + 1), pool))
+    print(json.dumps({"step": f"shortlist_{pool}", "ms_per_query": round((time.perf_counter() - started) / len(queries) * 1000, 3)}))
+
+if __name__ == "__main__":
+    main()
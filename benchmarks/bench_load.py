@@ -0,0 +1,321 @@
+"""
+End-to-end load test: real uvicorn worker, real matchmaking pipeline, stub LLM.
+
+Seeds a fresh SQLite database with mentors and mentees, starts the stub OpenAI-compatible
+server from `benchmarks.fake_llm` and a uvicorn worker pointed at both, then for every
+concurrency level:
+
+  * registers users through POST /api/v1/users/register (requests/sec, p50/p99 latency);
+  * submits mentorship requests through POST /api/v1/mentorship-requests and follows each
+    session in the database until it leaves PENDING (requests/sec, p50/p99 time to MATCHED);
+  * reads the worker's event-loop lag histogram from /metrics (p99 over the level).
+
+Each run is appended to --results as one JSON line with the commit and configuration, and
+--compare reports the change against the previous run with the same configuration.
+
+    python -m benchmarks.bench_load --concurrency 1,8,32 --requests 64 --latency-ms 200
+    python -m benchmarks.bench_load --mode agent --verification agent --compare --max-regression 0.25
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.db.database import Base, create_engine_for
+from app.db.models import Skill, User, UserRole
+from benchmarks.fake_llm import FakeLLMServer
+
+SKILLS = "Python Rust Go Java React Django FastAPI Kafka Redis PostgreSQL Docker Kubernetes Terraform Pandas".split()
+DEFAULT_RESULTS = os.path.join(os.path.dirname(__file__), "results", "bench_load.jsonl")
+_LAG_BUCKET = re.compile(r'^skill_exchange_event_loop_lag_seconds_bucket\{le="([^"]+)"\} (\d+)$', re.MULTILINE)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return math.nan
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(math.ceil(fraction * len(ordered))) - 1)]
+
+def latency_summary(samples: list[float], wall_seconds: float) -> dict:
+    return {
+        "completed": len(samples),
+        "requests_per_second": round(len(samples) / wall_seconds, 2) if wall_seconds else 0.0,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 1),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+    }
+
+async def seed(database_url: str, mentors: int, mentees: int, rng: random.Random) -> list[int]:
+    """Creates the schema, the skills and the users; returns the mentee IDs."""
+    engine = create_engine_for(database_url, profile="production")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        skills = [Skill(name=name, domain="bench") for name in SKILLS]
+        users = [
+            User(username=f"mentor{number}", email=f"mentor{number}@example.com", hashed_password="x",
+                 role=UserRole.MENTOR, trust_score=rng.uniform(55, 99), skills=rng.sample(skills, rng.randint(1, 3)))
+            for number in range(mentors)
+        ]
+        users += [
+            User(username=f"mentee{number}", email=f"mentee{number}@example.com", hashed_password="x",
+                 role=UserRole.MENTEE, trust_score=80.0, skills=rng.sample(skills, 1))
+            for number in range(mentees)
+        ]
+        db.add_all(users)
+        await db.commit()
+        mentee_ids = [user.id for user in users if user.role == UserRole.MENTEE]
+    await engine.dispose()
+    return mentee_ids
+
+def start_server(port: int, database_url: str, llm_url: str, args) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "LLM_BASE_URL": llm_url,
+        "MATCHMAKING_MODE": args.mode,
+        "TRUST_VERIFICATION_MODE": args.verification,
+        "MATCHMAKING_WORKERS": str(args.workers),
+        "MATCHMAKING_QUEUE_MAX_PENDING": str(args.queue_max_pending),
+        # Every request is new work; cached completions would flatter the numbers.
+        "LLM_CACHE_ENABLED": "false",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+
+async def wait_until_up(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.05)
+    raise TimeoutError(f"worker did not answer within {timeout}s")
+
+async def loop_lag_buckets(client: httpx.AsyncClient) -> dict[float, int]:
+    text = (await client.get("/metrics")).text
+    return {float(bound.replace("+Inf", "inf")): int(count) for bound, count in _LAG_BUCKET.findall(text)}
+
+def lag_p99_ms(before: dict[float, int], after: dict[float, int]) -> float | None:
+    """Upper bound of the bucket holding the 99th percentile of the lag samples taken in between."""
+    deltas = sorted((bound, after[bound] - before.get(bound, 0)) for bound in after)
+    total = deltas[-1][1] if deltas else 0
+    if not total:
+        return None
+    bound = next(bound for bound, cumulative in deltas if cumulative >= 0.99 * total)
+    return None if math.isinf(bound) else round(bound * 1000, 2)
+
+async def register_level(client: httpx.AsyncClient, concurrency: int, count: int, level: int) -> dict:
+    slots = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def register(number: int) -> None:
+        nonlocal errors
+        payload = {
+            "username": f"load{level}_{number}", "email": f"load{level}_{number}@example.com", "password": "pw",
+            "role": "mentee", "skills": [SKILLS[number % len(SKILLS)]],
+        }
+        async with slots:
+            started = time.perf_counter()
+            response = await client.post("/api/v1/users/register", json=payload)
+            if response.status_code == 201:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(register(number) for number in range(count)))
+    return {**latency_summary(latencies, time.perf_counter() - started), "errors": errors}
+
+async def matchmaking_level(client: httpx.AsyncClient, database_path: str, concurrency: int, count: int,
+                            mentee_ids: list[int], rng: random.Random, timeout: float) -> dict:
+    slots = asyncio.Semaphore(concurrency)
+    submitted: dict[int, float] = {}
+    finished: dict[int, tuple[float, str]] = {}
+    rejected = 0
+
+    async def submit(number: int) -> None:
+        nonlocal rejected
+        payload = {
+            "user_id": mentee_ids[number % len(mentee_ids)], "skill_name": rng.choice(SKILLS),
+            "request_details": "I want to build a small production service and learn the idioms.",
+        }
+        async with slots:
+            started = time.perf_counter()
+            response = await client.post("/api/v1/mentorship-requests", json=payload)
+            if response.status_code == 202:
+                submitted[response.json()["session_id"]] = started
+            else:
+                rejected += 1
+            # A concurrency slot stays taken until the session has an outcome, like a waiting client.
+            session_id = response.json().get("session_id") if response.status_code == 202 else None
+            while session_id is not None and session_id not in finished and time.perf_counter() - started < timeout:
+                await asyncio.sleep(0.01)
+
+    async def follow() -> None:
+        # Reads the worker's database directly, so following sessions adds no HTTP load.
+        connection = sqlite3.connect(database_path, timeout=5)
+        try:
+            while True:
+                waiting = [session_id for session_id in submitted if session_id not in finished]
+                for start in range(0, len(waiting), 900):
+                    chunk = waiting[start:start + 900]
+                    rows = connection.execute(
+                        f"SELECT id, status FROM mentorship_sessions WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    now = time.perf_counter()
+                    for session_id, status in rows:
+                        if status.upper() != "PENDING":
+                            finished[session_id] = (now - submitted[session_id], status.upper())
+                await asyncio.sleep(0.01)
+        finally:
+            connection.close()
+
+    follower = asyncio.create_task(follow())
+    started = time.perf_counter()
+    await asyncio.gather(*(submit(number) for number in range(count)))
+    wall = time.perf_counter() - started
+    follower.cancel()
+    await asyncio.gather(follower, return_exceptions=True)
+
+    matched = [seconds for seconds, status in finished.values() if status == "MATCHED"]
+    return {
+        **latency_summary(matched, wall),
+        "failed": sum(1 for _, status in finished.values() if status != "MATCHED"),
+        "timed_out": len(submitted) - len(finished),
+        "rejected": rejected,
+    }
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def previous_run(path: str, config: dict) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path) as results:
+        runs = [json.loads(line) for line in results if line.strip()]
+    return next((run for run in reversed(runs) if run.get("config") == config), None)
+
+def regressions(previous: dict, current: dict) -> list[dict]:
+    """Relative change per level and metric; positive means worse."""
+    changes = []
+    earlier = {level["concurrency"]: level for level in previous["levels"]}
+    for level in current["levels"]:
+        before = earlier.get(level["concurrency"])
+        if before is None:
+            continue
+        for phase in ("register", "matchmaking"):
+            old, new = before[phase], level[phase]
+            if old["requests_per_second"]:
+                changes.append({"concurrency": level["concurrency"], "metric": f"{phase}.requests_per_second",
+                                "change": round(1 - new["requests_per_second"] / old["requests_per_second"], 3)})
+            if old["p99_ms"] and not math.isnan(old["p99_ms"]) and not math.isnan(new["p99_ms"]):
+                changes.append({"concurrency": level["concurrency"], "metric": f"{phase}.p99_ms",
+                                "change": round(new["p99_ms"] / old["p99_ms"] - 1, 3)})
+    return changes
+
+async def run(args) -> dict:
+    rng = random.Random(7)
+    levels = []
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, "bench.db")
+        database_url = f"sqlite+aiosqlite:///{database_path}"
+        mentee_ids = await seed(database_url, args.mentors, args.mentees, rng)
+        llm = FakeLLMServer(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000).start()
+        port = free_port()
+        server = start_server(port, database_url, llm.base_url, args)
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=args.timeout,
+                                         limits=httpx.Limits(max_connections=max(args.concurrency) + 8)) as client:
+                await wait_until_up(client)
+                for level, concurrency in enumerate(args.concurrency):
+                    lag_before = await loop_lag_buckets(client)
+                    llm_before = llm.stats()["requests"]
+                    register = await register_level(client, concurrency, args.registrations, level)
+                    matchmaking = await matchmaking_level(
+                        client, database_path, concurrency, args.requests, mentee_ids, rng, args.timeout
+                    )
+                    result = {
+                        "concurrency": concurrency,
+                        "register": register,
+                        "matchmaking": matchmaking,
+                        "llm_requests": llm.stats()["requests"] - llm_before,
+                        "event_loop_lag_p99_ms": lag_p99_ms(lag_before, await loop_lag_buckets(client)),
+                    }
+                    print(json.dumps(result))
+                    levels.append(result)
+        finally:
+            server.terminate()
+            server.wait()
+            llm.stop()
+    return {"levels": levels}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=lambda text: [int(part) for part in text.split(",")], default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=64, help="mentorship requests per concurrency level")
+    parser.add_argument("--registrations", type=int, default=32, help="registrations per concurrency level")
+    parser.add_argument("--mentors", type=int, default=500)
+    parser.add_argument("--mentees", type=int, default=200)
+    parser.add_argument("--mode", default="scoring", help="MATCHMAKING_MODE of the worker (scoring or agent)")
+    parser.add_argument("--verification", default="deterministic", help="TRUST_VERIFICATION_MODE of the worker")
+    parser.add_argument("--workers", type=int, default=4, help="MATCHMAKING_WORKERS of the worker")
+    parser.add_argument("--queue-max-pending", type=int, default=10_000)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="stub LLM latency per completion")
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds a session may take to leave PENDING")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="JSON lines file the run is appended to ('' to skip)")
+    parser.add_argument("--compare", action="store_true", help="compare with the previous run of the same configuration")
+    parser.add_argument("--max-regression", type=float, default=None, help="exit 1 when a metric is this much worse")
+    parser.add_argument("--verbose", action="store_true", help="show the worker's stderr")
+    args = parser.parse_args()
+
+    config = {key: getattr(args, key) for key in (
+        "concurrency", "requests", "registrations", "mentors", "mentees", "mode", "verification", "workers",
+        "latency_ms", "jitter_ms",
+    )}
+    previous = previous_run(args.results, config) if args.results else None
+    outcome = asyncio.run(run(args))
+    record = {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"), "commit": git_commit(),
+              "config": config, **outcome}
+    if args.results:
+        os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+        with open(args.results, "a") as results:
+            results.write(json.dumps(record) + "\n")
+
+    if args.compare or args.max_regression is not None:
+        if previous is None:
+            print(json.dumps({"compare": "no previous run with this configuration"}))
+            return 0
+        changes = regressions(previous, record)
+        print(json.dumps({"compare_with": previous.get("commit"), "changes": changes}))
+        if args.max_regression is not None and any(change["change"] > args.max_regression for change in changes):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
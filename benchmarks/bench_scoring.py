@@ -0,0 +1,49 @@
+"""
+Mentor ranking cost: the vectorized MentorScorer over synthetic candidate sets.
+
+Feature arrays are built once per size (as `load_features` would from the index and the
+activity query); the timed part is one `rank` call, i.e. what a request pays to pick
+its mentor once the candidates are known.
+
+    python -m benchmarks.bench_scoring --sizes 100 1000 10000 --top-k 5
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.services.mentor_scoring import CandidateFeatures, MentorScorer
+
+def make_features(size: int, rng: random.Random) -> CandidateFeatures:
+    now = datetime.utcnow()
+    vocabulary = ["python", "async", "django", "fastapi", "numpy", "testing", "rust", "go"]
+    mentors = [
+        (mentor_id, f"mentor{mentor_id}", rng.uniform(50, 100), {"python", *rng.sample(vocabulary, 3)})
+        for mentor_id in range(size)
+    ]
+    activity = {
+        mentor_id: (rng.randint(0, settings.MENTOR_MAX_ACTIVE_SESSIONS), now - timedelta(days=rng.uniform(0, 90)))
+        for mentor_id in range(size) if rng.random() < 0.7
+    }
+    return CandidateFeatures.build(mentors, {"python", "async", "testing"}, activity, now)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(7)
+    scorer = MentorScorer.from_settings()
+    for size in args.sizes:
+        features = make_features(size, rng)
+        scorer.rank(features, args.top_k)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            scorer.rank(features, args.top_k)
+        elapsed = (time.perf_counter() - started) / args.repeat
+        print(json.dumps({"candidates": size, "top_k": args.top_k, "rank_ms": round(elapsed * 1000, 4)}))
+
+if __name__ == "__main__":
+    main()
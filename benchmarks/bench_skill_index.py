@@ -0,0 +1,104 @@
+"""
+Skill lookups at 100k skills: SQL LIKE/ilike scans vs. the in-memory skill index.
+
+Seeds a temporary SQLite database with synthetic skill names, builds the index from it,
+and times each lookup the API performs: exact (variant-tolerant) lookup, substring
+search for the mentor query, autocomplete and fuzzy suggestions.
+
+    python -m benchmarks.bench_skill_index --skills 100000 --queries 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from app.db.database import Base, create_engine_for
+from app.db.models import Skill
+from app.services.session_manager import SessionManager
+from app.services.skill_index import skill_index
+
+WORDS = (
+    "python rust go java kotlin swift react vue django flask fastapi spark kafka redis postgresql "
+    "docker kubernetes terraform aws azure gcp pandas numpy pytorch tensorflow graphql grpc linux"
+).split()
+QUALIFIERS = "advanced basics testing performance security design architecture tooling web data cloud".split()
+
+def skill_names(count: int, rng: random.Random) -> list[str]:
+    names = set(WORDS)
+    while len(names) < count:
+        names.add(f"{rng.choice(WORDS).title()} {rng.choice(QUALIFIERS)} {rng.randint(1, 9999)}")
+    return list(names)[:count]
+
+async def timed(label: str, queries: list[str], lookup) -> dict:
+    started = time.perf_counter()
+    for query in queries:
+        await lookup(query)
+    return {"lookup": label, "ms_per_query": round((time.perf_counter() - started) / len(queries) * 1000, 3)}
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--skills", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine_for(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}", profile="production")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        names = skill_names(args.skills, rng)
+        async with factory() as db:
+            await db.execute(insert(Skill), [{"name": name, "domain": "bench"} for name in names])
+            await db.commit()
+
+            started = time.perf_counter()
+            await skill_index.build(db)
+            print(json.dumps({"skills": len(skill_index), "index_build_s": round(time.perf_counter() - started, 3)}))
+
+            exact = [rng.choice(names).upper() for _ in range(args.queries)]
+            fragments = [rng.choice(WORDS)[1:5] for _ in range(args.queries)]
+            prefixes = [rng.choice(WORDS)[:3] for _ in range(args.queries)]
+            typos = [word[:2] + word[3] + word[2] + word[4:] for word in (rng.choice(WORDS) for _ in range(args.queries)) if len(word) > 4]
+
+            async def sql_exact(query):
+                await db.execute(select(Skill).where(Skill.name.ilike(query)))
+
+            async def sql_substring(query):
+                await db.execute(select(Skill.id).where(Skill.name.ilike(f"%{query}%")))
+
+            async def sql_prefix(query):
+                await db.execute(select(Skill.id, Skill.name).where(Skill.name.ilike(f"{query}%")).limit(10))
+
+            async def index_exact(query):
+                await SessionManager.get_skill_by_name(db, query)
+
+            async def index_substring(query):
+                skill_index.containing(query)
+
+            async def index_autocomplete(query):
+                skill_index.autocomplete(query)
+
+            async def index_fuzzy(query):
+                skill_index.fuzzy(query)
+
+            for result in [
+                await timed("exact: sql ilike", exact, sql_exact),
+                await timed("exact: index + pk get", exact, index_exact),
+                await timed("substring: sql like '%x%'", fragments, sql_substring),
+                await timed("substring: trigram index", fragments, index_substring),
+                await timed("autocomplete: sql prefix ilike", prefixes, sql_prefix),
+                await timed("autocomplete: index", prefixes, index_autocomplete),
+                await timed("fuzzy: index", typos, index_fuzzy),
+            ]:
+                print(json.dumps(result))
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""
+Worker cold start: import time of `app.main` and time until the first HTTP response.
+
+Every run starts a fresh interpreter. The import case measures `import app.main` in a
+subprocess; the serve case launches uvicorn on a free port against a fresh SQLite file
+(first boot, schema created) and then again against the same file (warm boot, schema
+fingerprint matches) and polls `GET /` until it answers.
+
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --max-first-response-seconds 5   # CI: exit 1 when slower
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import app.main; print(time.perf_counter() - started)"
+
+def import_seconds() -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def first_response_seconds(database_url: str, timeout: float = 60.0) -> float:
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": database_url, "MATCHMAKING_WORKERS": "0"}
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"no response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def summarize(samples: list[float]) -> dict:
+    return {"median_s": round(statistics.median(samples), 3), "max_s": round(max(samples), 3)}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-seconds", type=float, default=None)
+    parser.add_argument("--max-first-response-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    imports = [import_seconds() for _ in range(args.runs)]
+    first_boot, warm_boot = [], []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as directory:
+            url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+            first_boot.append(first_response_seconds(url))
+            warm_boot.append(first_response_seconds(url))
+
+    results = {
+        "import_app_main": summarize(imports),
+        "first_response_first_boot": summarize(first_boot),
+        "first_response_warm_boot": summarize(warm_boot),
+    }
+    print(json.dumps(results))
+
+    failed = (
+        args.max_import_seconds is not None and results["import_app_main"]["median_s"] > args.max_import_seconds
+    ) or (
+        args.max_first_response_seconds is not None
+        and results["first_response_warm_boot"]["median_s"] > args.max_first_response_seconds
+    )
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Status-update throughput under concurrent matchmaking.
+
+Simulates `run_matchmaking_background` finishing for many sessions at once: every task
+"thinks" for a few milliseconds and then moves its session to MATCHED or FAILED.
+Compares the legacy storage setup (SQLite defaults, one commit per task) with the
+production profile (WAL + pragmas), with and without the write serializer.
+
+    python -m benchmarks.bench_storage --sessions 500 --concurrency 100
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.db.database import Base, create_engine_for
+from app.db.models import MentorshipSession, Skill, User
+from app.db.write_serializer import WriteSerializer
+from app.services.session_manager import SessionManager
+
+async def seed(session_factory, sessions: int) -> tuple[list[int], int]:
+    async with session_factory() as db:
+        mentee = User(username="mentee", email="mentee@bench.local", hashed_password="x")
+        mentor = User(username="mentor", email="mentor@bench.local", hashed_password="x")
+        skill = Skill(name="Python")
+        db.add_all([mentee, mentor, skill])
+        await db.flush()
+        rows = [MentorshipSession(mentee_id=mentee.id, requested_skill_id=skill.id) for _ in range(sessions)]
+        db.add_all(rows)
+        await db.commit()
+        return [row.id for row in rows], mentor.id
+
+async def run_case(profile: str, serialized: bool, sessions: int, concurrency: int, think_ms: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine_for(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}", profile=profile, echo=False)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_ids, mentor_id = await seed(session_factory, sessions)
+        writer = WriteSerializer(session_factory=session_factory)
+        gate = asyncio.Semaphore(concurrency)
+
+        async def task(session_id: int):
+            async with gate:
+                await asyncio.sleep(random.uniform(0, think_ms) / 1000)
+                if session_id % 5:
+                    op = lambda db, commit=True: SessionManager.assign_mentor_to_session(db, session_id, mentor_id, commit=commit)
+                else:
+                    op = lambda db, commit=True: SessionManager.mark_session_failed(db, session_id, "no mentor", commit=commit)
+                if serialized:
+                    await writer.submit(lambda db: op(db, commit=False))
+                else:
+                    async with session_factory() as db:
+                        await op(db)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(task(session_id) for session_id in session_ids))
+        elapsed = time.perf_counter() - started
+        await writer.stop()
+        await engine.dispose()
+    return {
+        "profile": profile,
+        "write_serializer": serialized,
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "writes_per_sec": round(sessions / elapsed, 1),
+        "commits": writer.batches if serialized else sessions,
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--think-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    for profile, serialized in [("default", False), ("production", False), ("production", True)]:
+        result = await run_case(profile, serialized, args.sessions, args.concurrency, args.think_ms)
+        print(json.dumps(result))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+Session summary latency: single-shot prompt vs. map-reduce over transcript chunks.
+
+Runs `MatchmakingOrchestrator.facilitate_session_summary` against a simulated local
+model instead of a real LLM. A completion costs a fixed overhead, a prefill time per
+prompt token that grows with the prompt length (attention is quadratic in the context),
+and a decode time per generated token; the server runs `--parallel` completions at once,
+like llama.cpp / Ollama with several slots. Prompts longer than the context window are
+truncated, as the local model would do.
+
+    python -m benchmarks.bench_summary --messages 2000 --parallel 4
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from unittest.mock import patch
+from app.agents.orchestrator import MatchmakingOrchestrator
+from app.agents.summarization import estimate_tokens
+from app.core.config import settings
+
+class SimulatedLocalModel:
+    def __init__(self, parallel: int, context_tokens: int, time_scale: float):
+        self.slots = asyncio.Semaphore(parallel)
+        self.context_tokens = context_tokens
+        self.time_scale = time_scale
+        self.calls = 0
+        self.truncated = 0
+
+    async def complete(self, prompt: str, output_tokens: int) -> str:
+        tokens = estimate_tokens(prompt)
+        if tokens > self.context_tokens:
+            self.truncated += 1
+            tokens = self.context_tokens
+        # ~1B model on CPU: 0.1 s overhead, ~400 tok/s prefill slowing with length, ~25 tok/s decode.
+        prefill = tokens * 0.0025 * (1 + tokens / 4096)
+        seconds = 0.1 + prefill + output_tokens * 0.04
+        async with self.slots:
+            self.calls += 1
+            await asyncio.sleep(seconds * self.time_scale)
+        return "Topics, advice and next steps of this part. " * (output_tokens // 10)
+
+def make_transcript(messages: int) -> str:
+    rng = random.Random(7)
+    words = "async python borrow lifetimes testing profiling index cache query deploy review".split()
+    return "".join(
+        f"{'mentor' if n % 2 else 'mentee'}: " + " ".join(rng.choice(words) for _ in range(rng.randint(8, 30))) + "\n"
+        for n in range(messages)
+    )
+
+async def run_case(mode: str, transcript: str, args) -> dict:
+    model = SimulatedLocalModel(args.parallel, args.context_tokens, args.time_scale)
+    orchestrator = MatchmakingOrchestrator(db_session=None)
+
+    async def ask(self, kind, prompt):
+        return await model.complete(prompt, output_tokens=120)
+
+    async def summary_chat(self, session_id, material):
+        # The SummaryAgent's tool-call turn plus its confirmation turn.
+        await model.complete(material, output_tokens=250)
+        await model.complete("saved", output_tokens=10)
+        return {"status": "SUCCESS"}
+
+    single_shot_limit = 10**9 if mode == "single-shot" else settings.SUMMARY_SINGLE_SHOT_MAX_TOKENS
+    with patch.object(MatchmakingOrchestrator, "_ask", ask), \
+         patch.object(MatchmakingOrchestrator, "_run_summary_chat", summary_chat), \
+         patch.object(settings, "SUMMARY_SINGLE_SHOT_MAX_TOKENS", single_shot_limit):
+        started = time.perf_counter()
+        await orchestrator.facilitate_session_summary(1, transcript)
+        elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "transcript_tokens": estimate_tokens(transcript),
+        "completions": model.calls,
+        "truncated_prompts": model.truncated,
+        "simulated_seconds": round(elapsed / args.time_scale, 1),
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--parallel", type=int, default=4)
+    parser.add_argument("--context-tokens", type=int, default=8192)
+    parser.add_argument("--time-scale", type=float, default=0.1, help="Wall-clock seconds per simulated second.")
+    args = parser.parse_args()
+    for messages in sorted({args.messages // 10, args.messages}):
+        transcript = make_transcript(messages)
+        for mode in ("single-shot", "map-reduce"):
+            print(json.dumps({"messages": messages, **await run_case(mode, transcript, args)}))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,218 @@
+"""
+Stub OpenAI-compatible chat completion server standing in for the LiteLLM / Ollama proxy.
+
+Answers POST /chat/completions (and /v1/chat/completions) after a configurable latency with
+scripted replies that follow each agent's protocol: the tool-using agents first get a tool
+call (verify_user_trust, find_potential_mentors, save_session_summary) and, once the tool
+result is in the conversation, the JSON or confirmation their caller parses. Batch, rerank
+and single-turn prompts get valid choices picked from the mentors in the prompt. Every reply
+carries a usage block, so token metrics work as against the real endpoint.
+
+    python -m benchmarks.fake_llm --port 4000 --latency-ms 200 --jitter-ms 50
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_decoder = json.JSONDecoder()
+
+def _json_after(text: str, marker: str):
+    """The first JSON value following `marker` in `text`, or None."""
+    start = text.find(marker)
+    if start < 0:
+        return None
+    for position in range(start + len(marker), len(text)):
+        if text[position] in "[{":
+            try:
+                return _decoder.raw_decode(text, position)[0]
+            except ValueError:
+                return None
+    return None
+
+def _match(pattern: str, text: str, default: str = "") -> str:
+    found = re.search(pattern, text)
+    return found.group(1) if found else default
+
+def scripted_reply(messages: list) -> dict:
+    """The assistant message for one conversation: either {"content": ...} or {"tool_calls": [...]}."""
+    system = next((message.get("content") or "" for message in messages if message.get("role") == "system"), "")
+    prompt = "\n".join(message.get("content") or "" for message in messages if message.get("role") == "user")
+    tool_results = [message.get("content") or "" for message in messages if message.get("role") == "tool"]
+
+    def tool_call(name: str, **arguments) -> dict:
+        return {"tool_calls": [{"name": name, "arguments": arguments}]}
+
+    if "verify_user_trust" in system:
+        if not tool_results:
+            return tool_call("verify_user_trust", user_id=int(_match(r"ID (\d+)", prompt, "0")))
+        status = (_json_after(tool_results[-1], "") or {}).get("status", "UNKNOWN")
+        return {"content": f"The user is {status}."}
+    if "find_potential_mentors" in system:
+        if not tool_results:
+            return tool_call("find_potential_mentors", skill_name=_match(r"skill '([^']*)'", prompt))
+        mentors = (_json_after(tool_results[-1], "") or {}).get("mentors") or []
+        if not mentors:
+            return {"content": "No suitable mentor was found."}
+        return {"content": json.dumps({"best_mentor_id": mentors[0]["id"]})}
+    if '"assignments"' in system:
+        mentors = _json_after(prompt, "Mentors for the skill") or []
+        mentees = _json_after(prompt, "Mentee requests:") or []
+        assignments = [
+            {"request": mentee["request"], "best_mentor_id": mentors[position % len(mentors)]["id"]}
+            for position, mentee in enumerate(mentees)
+        ] if mentors else []
+        return {"content": json.dumps({"assignments": assignments})}
+    if "already retrieved for you" in system:
+        mentors = _json_after(prompt, "Candidate mentors") or []
+        return {"content": json.dumps({"best_mentor_id": mentors[0]["id"] if mentors else None})}
+    if "already ranked by a scoring engine" in system:
+        mentors = _json_after(prompt, "best first:") or []
+        return {"content": json.dumps({"best_mentor_id": mentors[0]["id"] if mentors else None})}
+    if "save_session_summary" in system:
+        if not tool_results:
+            return tool_call(
+                "save_session_summary",
+                session_id=int(_match(r"ID (\d+)", prompt, "0")),
+                summary_text="Key topics: the requested skill. Next steps: practice with a small project.",
+            )
+        return {"content": "The summary has been saved. TERMINATE"}
+    if "condense one part" in system:
+        return {"content": "- Topics: the requested skill.\n- Advice: practice daily.\n- Next steps: a small project."}
+    return {"content": "OK"}
+
+def build_completion(request: dict, completion_id: int = 1) -> dict:
+    """The chat.completion body for one request (also usable behind an httpx.MockTransport)."""
+    messages = request.get("messages") or []
+    reply = scripted_reply(messages)
+    message = {"role": "assistant", "content": reply.get("content")}
+    finish_reason = "stop"
+    if "tool_calls" in reply:
+        message["tool_calls"] = [
+            {"id": f"call_{completion_id}_{position}", "type": "function",
+             "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])}}
+            for position, call in enumerate(reply["tool_calls"])
+        ]
+        finish_reason = "tool_calls"
+    # Roughly four characters per token, as the repo's own estimate_tokens assumes.
+    prompt_tokens = sum(len(message.get("content") or "") for message in messages) // 4 + 1
+    completion_tokens = len(json.dumps(message)) // 4 + 1
+    return {
+        "id": f"chatcmpl-fake-{completion_id}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "fake"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+class FakeLLMServer:
+    """Threaded stub server; each request sleeps `latency` +/- `jitter` seconds before replying."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.2, jitter: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = 7):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send(200, {"object": "list", "data": [{"id": "fake", "object": "model"}]})
+                else:
+                    self._send(200, {"status": "ok", "requests": server.requests})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+                    return
+                status, payload = server.complete(request)
+                self._send(status, payload)
+
+        return Handler
+
+    def complete(self, request: dict) -> tuple[int, dict]:
+        with self._lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            fail = self._random.random() < self.failure_rate
+            completion_id = next(self._ids)
+        time.sleep(delay)
+        if fail:
+            return 500, {"error": {"message": "scripted failure", "type": "server_error"}}
+
+        payload = build_completion(request, completion_id)
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += payload["usage"]["prompt_tokens"]
+            self.completion_tokens += payload["usage"]["completion_tokens"]
+        return 200, payload
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "prompt_tokens": self.prompt_tokens, "completion_tokens": self.completion_tokens}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4000)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeLLMServer(args.host, args.port, args.latency_ms / 1000, args.jitter_ms / 1000, args.failure_rate)
+    print(json.dumps({"fake_llm": server.base_url, "latency_ms": args.latency_ms}))
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
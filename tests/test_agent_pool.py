@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.agents.agent_pool import AgentKind, AgentPool
+from app.agents.llm_gateway import llm_gateway
+from app.agents.specialized_agents import create_trust_agent
+
+
+async def echo_binding(bindings, key: str) -> str:
+    await asyncio.sleep(0.01)
+    return str(bindings[key])
+
+
+def make_pool() -> AgentPool:
+    pool = AgentPool(max_idle=2)
+    pool.register("trust", AgentKind(
+        agent_factory=lambda: create_trust_agent(llm_config=llm_gateway.llm_config()),
+        proxy_name="Proxy",
+        tools={"echo_binding": echo_binding},
+    ))
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_lease_reuses_a_reset_agent():
+    pool = make_pool()
+    async with pool.lease("trust", db="first") as chat:
+        first = chat
+        chat.agent.client_cache = object()
+        await chat.proxy.a_send({"content": "hello"}, chat.agent, request_reply=False)
+        assert chat.agent.chat_messages[chat.proxy]
+
+    async with pool.lease("trust", db="second") as chat:
+        assert chat is first
+        assert not chat.agent.chat_messages[chat.proxy]
+        assert chat.agent.client_cache is None
+        assert chat.bindings == {"db": "second"}
+
+    assert pool.stats()["built"] == 1
+    assert pool.stats()["reused"] == 1
+    assert first.bindings == {}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_leases_are_isolated():
+    pool = make_pool()
+
+    async def request(value: int) -> str:
+        async with pool.lease("trust", value=value) as chat:
+            tool = chat.proxy.function_map["echo_binding"]
+            return await tool(key="value"), id(chat)
+
+    results = await asyncio.gather(*(request(value) for value in range(4)))
+
+    assert [reply for reply, _ in results] == ["0", "1", "2", "3"]
+    assert len({chat_id for _, chat_id in results}) == 4
+    assert pool.stats()["idle"] == {"trust": 2}
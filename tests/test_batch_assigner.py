@@ -0,0 +1,88 @@
+import itertools
+from collections import Counter
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.db.models import JobStatus, MatchmakingJob, MentorshipSession, SessionStatus, Skill, User, UserRole
+from app.services.batch_assigner import BatchAssigner, min_cost_assignment
+from app.services.mentor_scoring import MentorScorer
+
+
+def test_min_cost_assignment_matches_brute_force():
+    rng = np.random.default_rng(3)
+    for rows, columns in [(3, 3), (3, 5), (4, 6)]:
+        cost = rng.uniform(-2, 2, size=(rows, columns))
+        assignment = min_cost_assignment(cost)
+        best = min(
+            sum(cost[row, column] for row, column in enumerate(permutation))
+            for permutation in itertools.permutations(range(columns), rows)
+        )
+        assert len(set(assignment)) == rows
+        assert cost[np.arange(rows), assignment].sum() == pytest.approx(best)
+
+
+@pytest.mark.asyncio
+async def test_run_once_spreads_sessions_within_mentor_capacity():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    scorer = MentorScorer({"trust": 1.0, "overlap": 0.5, "load": 0.6, "recency": 0.2}, capacity=2, recency_half_life_days=14)
+    assigner = BatchAssigner(scorer=scorer, session_factory=factory)
+
+    async with factory() as db:
+        python, cobol = Skill(name="Python"), Skill(name="COBOL")
+        star = User(username="star", email="star@test.com", hashed_password="x", role=UserRole.MENTOR, trust_score=99.0, skills=[python])
+        solid = User(username="solid", email="solid@test.com", hashed_password="x", role=UserRole.MENTOR, trust_score=75.0, skills=[python])
+        mentees = [User(username=f"mentee{n}", email=f"mentee{n}@test.com", hashed_password="x") for n in range(5)]
+        db.add_all([star, solid, cobol, *mentees])
+        await db.flush()
+        sessions = [
+            MentorshipSession(mentee_id=mentee.id, requested_skill_id=(cobol if n == 4 else python).id)
+            for n, mentee in enumerate(mentees)
+        ]
+        db.add_all(sessions)
+        await db.flush()
+        db.add_all([
+            MatchmakingJob(session_id=session.id, user_id=session.mentee_id, skill_name="x", status=JobStatus.QUEUED)
+            for session in sessions
+        ])
+        await db.commit()
+
+    plan = await assigner.run_once()
+
+    async with factory() as db:
+        statuses = dict((await db.execute(select(MentorshipSession.id, MentorshipSession.status))).all())
+        job_statuses = dict((await db.execute(select(MatchmakingJob.session_id, MatchmakingJob.status))).all())
+    await engine.dispose()
+
+    assert Counter(plan.values()) == {star.id: 2, solid.id: 2}
+    assert statuses[sessions[4].id] == SessionStatus.PENDING
+    assert job_statuses[sessions[4].id] == JobStatus.QUEUED
+    assert all(job_statuses[session_id] == JobStatus.DONE for session_id in plan)
+    assert assigner.stats()["left_pending"] == 1
+
+
+@pytest.mark.asyncio
+async def test_only_one_process_holds_the_assigner_lease():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    first = BatchAssigner(session_factory=factory, lease_seconds=60)
+    second = BatchAssigner(session_factory=factory, lease_seconds=60)
+
+    assert await first.acquire_lease()
+    assert not await second.acquire_lease()
+    # The holder renews its own lease.
+    assert await first.acquire_lease()
+
+    await first.release_lease()
+    assert await second.acquire_lease()
+    assert not await first.acquire_lease()
+    await engine.dispose()
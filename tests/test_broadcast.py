@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.websockets import ConnectionManager
+from app.db.database import Base
+from app.services.broker import InProcessBroker, SQLiteBroker
+from app.services.event_bus import SessionEventBus
+
+
+class StalledWebSocket:
+    """A client that accepts but never finishes receiving."""
+
+    def __init__(self):
+        self.sent = []
+        self.release = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        await self.release.wait()
+        self.sent.append(message)
+
+    async def send_json(self, message):
+        await self.send_text(message)
+
+    async def close(self, code=1000):
+        pass
+
+
+class FastWebSocket(StalledWebSocket):
+    def __init__(self):
+        super().__init__()
+        self.release.set()
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_does_not_delay_other_clients(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.WS_SEND_QUEUE_SIZE", 2)
+    broker = InProcessBroker()
+    manager = ConnectionManager(broker=broker, event_bus=SessionEventBus(broker=broker))
+    slow, fast = StalledWebSocket(), FastWebSocket()
+    await manager.connect(slow, "chat-room")
+    await manager.connect(fast, "chat-room")
+
+    for n in range(5):
+        await manager.broadcast(f"message {n}", "chat-room")
+        for _ in range(100):
+            if len(fast.sent) == n + 1:
+                break
+            await asyncio.sleep(0)
+
+    try:
+        assert fast.sent == [f"message {n}" for n in range(5)]
+        slow_connection = manager.active_connections["chat-room"][0]
+        assert slow.sent == []
+        assert slow_connection.coalesced >= 2
+    finally:
+        await manager.close()
+    assert manager.active_connections == {}
+    assert not broker._handlers["chat"]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_stops_sender_task():
+    broker = InProcessBroker()
+    manager = ConnectionManager(broker=broker, event_bus=SessionEventBus(broker=broker))
+    client = FastWebSocket()
+    await manager.connect(client, "room")
+    connection = manager.active_connections["room"][0]
+
+    manager.disconnect(client, "room")
+    await asyncio.wait_for(connection.sender, timeout=1)
+    assert connection.sender.done() and not connection.sender.cancelled()
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_broker_delivers_across_workers(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'broker.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    publisher = SQLiteBroker(session_factory=factory, poll_interval_ms=10)
+    subscriber = SQLiteBroker(session_factory=factory, poll_interval_ms=10)
+    received = []
+    subscriber.subscribe("chat", received.append)
+    await publisher.start()
+    await subscriber.start()
+
+    publisher.publish("chat", {"session_id": "7", "text": "hello"})
+    for _ in range(100):
+        if received:
+            break
+        await asyncio.sleep(0.01)
+
+    await publisher.stop()
+    await subscriber.stop()
+    await engine.dispose()
+    assert received == [{"session_id": "7", "text": "hello"}]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_broker_requeues_messages_when_the_write_fails(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'broker.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    failures = [RuntimeError("database is locked")]
+
+    def flaky_factory():
+        if failures:
+            raise failures.pop()
+        return factory()
+
+    publisher = SQLiteBroker(session_factory=factory, poll_interval_ms=10)
+    subscriber = SQLiteBroker(session_factory=factory, poll_interval_ms=10)
+    received = []
+    subscriber.subscribe("chat", received.append)
+    await publisher.start()
+    await subscriber.start()
+    publisher._session_factory = flaky_factory
+
+    publisher.publish("chat", {"session_id": "7", "text": "first"})
+    publisher.publish("chat", {"session_id": "7", "text": "second"})
+    for _ in range(100):
+        if len(received) == 2:
+            break
+        await asyncio.sleep(0.01)
+
+    await publisher.stop()
+    await subscriber.stop()
+    await engine.dispose()
+    assert not failures
+    assert [message["text"] for message in received] == ["first", "second"]
@@ -1,4 +1,5 @@
 import asyncio
+import json
 import sys
 from pathlib import Path
 from unittest.mock import AsyncMock, patch
@@ -6,21 +7,26 @@ from unittest.mock import AsyncMock, patch
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
 from sqlalchemy.orm import sessionmaker
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+from app.agents.orchestrator import MatchmakingOrchestrator
 from app.api.v1.mentorship import run_matchmaking_background
 from app.core.config import settings
 from app.db.database import Base, get_db_session
-from app.db.models import SessionStatus, User
+from app.db.models import SessionStatus, Skill, User
 from app.main import app
+from app.services.event_bus import event_bus
 from app.services.session_manager import SessionManager
+from app.services.skill_index import skill_index
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 engine = create_async_engine(TEST_DATABASE_URL, echo=False)
 TestingSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 settings.GEMINI_API_KEY = "test_api_key_for_pytest"
+settings.MATCHMAKING_WORKERS = 0
 
 async def override_get_db_session():
     async with TestingSessionLocal() as session:
@@ -103,4 +109,155 @@ async def test_failed_matchmaking_due_to_low_trust(mock_flow, client, db_session
     session = await SessionManager.get_session_by_id(db_session, session_id)
     assert session is not None
     assert session.status == SessionStatus.FAILED
-    assert "trust score" in session.failure_reason
\ No newline at end of file
+    assert "trust score" in session.failure_reason
+
+@pytest.mark.asyncio
+@patch('app.agents.orchestrator.create_trust_agent')
+async def test_deterministic_trust_gate_skips_agent_chat(mock_trust_agent, db_session):
+    mentee = User(username="low_trust", email="low@test.com", hashed_password="x", trust_score=10.0)
+    db_session.add(mentee)
+    await db_session.commit()
+
+    orchestrator = MatchmakingOrchestrator(db_session=db_session)
+    result = await orchestrator.initiate_matchmaking_flow(mentee.id, "Python", "Test low trust")
+
+    assert result["status"] == "FAILED"
+    assert "trust score" in result["reason"]
+    assert result["verdict"]["status"] == "UNTRUSTWORTHY"
+    mock_trust_agent.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_bulk_register_returns_per_row_report(client, db_session, setup_users):
+    rows = [
+        {"username": "bulk_mentor", "email": "bulk@test.com", "password": "pw", "role": "mentor", "skills": ["python", "Rust"]},
+        {"username": "test_mentee", "email": "other@test.com", "password": "pw"},
+        {"username": "bad_email", "email": "not-an-email", "password": "pw"},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\n{broken"
+    response = client.post("/api/v1/users/bulk-register", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+
+    reports = [json.loads(line) for line in response.text.splitlines()]
+    assert [report["status"] for report in reports] == ["created", "error", "error", "error"]
+    assert "already exists" in reports[1]["error"]
+    assert reports[2]["error"].startswith("email")
+
+    skills = (await db_session.execute(select(Skill.name))).scalars().all()
+    assert sorted(skills) == ["AI", "Python", "Rust"]
+
+
+@pytest.mark.asyncio
+async def test_session_transitions_are_conditional_and_bulk(db_session):
+    mentee = User(username="bulk_mentee", email="bm@test.com", hashed_password="x")
+    mentor = User(username="bulk_mentor2", email="bm2@test.com", hashed_password="x")
+    skill = Skill(name="Go")
+    db_session.add_all([mentee, mentor, skill])
+    await db_session.commit()
+    sessions = [await SessionManager.create_session_request(db_session, mentee.id, skill.id) for _ in range(3)]
+
+    assert await SessionManager.assign_mentor_to_session(db_session, sessions[0].id, mentor.id) is not None
+    assert await SessionManager.mark_session_failed(db_session, sessions[0].id, "too late") is None
+
+    moved = await SessionManager.bulk_assign_mentors(db_session, {s.id: mentor.id for s in sessions})
+    assert sorted(moved) == [sessions[1].id, sessions[2].id]
+    refreshed = await SessionManager.get_session_by_id(db_session, sessions[2].id)
+    assert (refreshed.status, refreshed.mentor_id) == (SessionStatus.MATCHED, mentor.id)
+
+
+@pytest.mark.asyncio
+async def test_websocket_replays_session_lifecycle_events(client, db_session, setup_users):
+    user_ids = setup_users
+    event_bus.clear()
+    session = await SessionManager.create_session_request(db_session, user_ids["mentee_id"], 1)
+    await SessionManager.assign_mentor_to_session(db_session, session.id, user_ids["mentor_id"])
+
+    with client.websocket_connect(f"/ws/{session.id}") as websocket:
+        pending, matched = websocket.receive_json(), websocket.receive_json()
+
+    assert (pending["type"], pending["status"]) == ("session.status", "pending")
+    assert (matched["status"], matched["mentor_id"]) == ("matched", user_ids["mentor_id"])
+    assert matched["sequence"] > pending["sequence"]
+
+
+def test_runtime_stats_endpoint(client):
+    response = client.get("/stats")
+    assert response.status_code == 200
+    stats = response.json()
+    assert {"queue_depth", "in_flight", "completed"} <= stats["password_hashing"].keys()
+    assert {"hits", "misses", "hit_ratio"} <= stats["llm_cache"].keys()
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE skill_exchange_span_seconds histogram" in response.text
+    assert "skill_exchange_password_hashing_completed " in response.text
+
+
+@pytest.mark.asyncio
+async def test_skill_variants_resolve_to_one_skill_and_autocomplete(client, db_session, setup_users):
+    response = client.post("/api/v1/users/register", json={
+        "username": "variant", "email": "variant@test.com", "password": "pw", "role": "mentor", "skills": ["python3", "PY"],
+    })
+    assert response.status_code == 201
+    assert [skill["name"] for skill in response.json()["skills"]] == ["Python"]
+
+    await skill_index.build(db_session)
+    response = client.get("/api/v1/skills/autocomplete", params={"q": "pyhton"})
+    assert response.status_code == 200
+    assert [suggestion["name"] for suggestion in response.json()] == ["Python"]
+
+    response = client.post("/api/v1/mentorship-requests", json={
+        "user_id": setup_users["mentee_id"], "skill_name": "Pyton", "request_details": "typo",
+    })
+    assert response.status_code == 404
+    assert "Did you mean: Python?" in response.json()["detail"]
+
+@pytest.mark.asyncio
+async def test_cancel_withdraws_a_pending_session(client, db_session, setup_users):
+    response = client.post("/api/v1/mentorship-requests", json={
+        "user_id": setup_users["mentee_id"], "skill_name": "Python", "request_details": "changed my mind",
+    })
+    session_id = response.json()["session_id"]
+
+    response = client.post(f"/api/v1/mentorship-sessions/{session_id}/cancel")
+    assert response.status_code == 200
+    assert response.json() == {"session_id": session_id, "status": "cancelled", "run_aborted": False}
+    assert client.get("/api/v1/mentorship-queue").json()["queued"] == 0
+
+    response = client.post(f"/api/v1/mentorship-sessions/{session_id}/cancel")
+    assert response.status_code == 409
+    assert client.post("/api/v1/mentorship-sessions/999/cancel").status_code == 404
+
+@pytest.mark.asyncio
+async def test_session_lists_page_by_keyset_and_revalidate_with_etags(client, db_session, setup_users):
+    skill = (await db_session.execute(select(Skill).where(Skill.name == "Python"))).scalar_one()
+    session_ids = [
+        (await SessionManager.create_session_request(db_session, setup_users["mentee_id"], skill.id)).id for _ in range(5)
+    ]
+    await SessionManager.assign_mentor_to_session(db_session, session_ids[0], setup_users["mentor_id"])
+
+    seen, cursor = [], None
+    while True:
+        params = {"mentee_id": setup_users["mentee_id"], "limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/mentorship-sessions", params=params).json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == session_ids[::-1]
+    assert "transcript" not in page["items"][0] and "summary" not in page["items"][0]
+
+    response = client.get("/api/v1/mentorship-sessions", params={"mentor_id": setup_users["mentor_id"], "status": "matched"})
+    assert [item["id"] for item in response.json()["items"]] == [session_ids[0]]
+
+    response = client.get(f"/api/v1/mentorship-sessions/{session_ids[1]}")
+    assert response.json()["status"] == "pending"
+    etag = response.headers["ETag"]
+    response = client.get(f"/api/v1/mentorship-sessions/{session_ids[1]}", headers={"If-None-Match": etag})
+    assert response.status_code == 304 and response.content == b""
+
+    await SessionManager.cancel_session(db_session, session_ids[1])
+    response = client.get(f"/api/v1/mentorship-sessions/{session_ids[1]}", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json()["status"] == "cancelled"
+    assert client.get("/api/v1/mentorship-sessions", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,139 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.db.models import JobStatus, MatchmakingJob, MentorshipSession, Skill, User
+from app.services.job_queue import MatchmakingQueue, QueueFullError
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def create_pending_session(db):
+    user = User(username="queued", email="queued@test.com", hashed_password="x")
+    skill = Skill(name="Python")
+    db.add_all([user, skill])
+    await db.flush()
+    return await add_session(db, user.id, skill.id)
+
+
+async def add_session(db, user_id, skill_id):
+    session = MentorshipSession(mentee_id=user_id, requested_skill_id=skill_id)
+    db.add(session)
+    await db.commit()
+    return session
+
+
+async def job_statuses(session_factory):
+    async with session_factory() as db:
+        return [row.status for row in (await db.execute(MatchmakingJob.__table__.select().order_by(MatchmakingJob.id))).all()]
+
+
+async def wait_for_statuses(session_factory, expected):
+    for _ in range(250):
+        if await job_statuses(session_factory) == expected:
+            return
+        await asyncio.sleep(0.02)
+    assert await job_statuses(session_factory) == expected
+
+
+@pytest.mark.asyncio
+async def test_queue_runs_jobs_and_recovers_pending_sessions(session_factory):
+    handled = []
+
+    async def handler(session_id, user_id, skill_name, request_details):
+        handled.append((session_id, skill_name))
+
+    async with session_factory() as db:
+        session = await create_pending_session(db)
+
+    queue = MatchmakingQueue(session_factory=session_factory)
+    await queue.start(handler, workers=2)
+    await wait_for_statuses(session_factory, [JobStatus.DONE])
+    await queue.stop()
+
+    assert handled == [(session.id, "Python")]
+    async with session_factory() as db:
+        job = (await db.execute(MatchmakingJob.__table__.select())).one()
+        assert job.status == JobStatus.DONE
+        assert job.attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_rejects_jobs_when_full_in_producer_only_mode(session_factory):
+    queue = MatchmakingQueue(session_factory=session_factory)
+    await queue.start(handler=None, workers=0)
+    queue.max_pending = 1
+    async with session_factory() as db:
+        await queue.check_capacity(db)
+        session = await create_pending_session(db)
+        await queue.enqueue(db, session.id, session.mentee_id, "Python", "help with asyncio")
+        with pytest.raises(QueueFullError):
+            await queue.check_capacity(db)
+
+
+@pytest.mark.asyncio
+async def test_cancel_aborts_the_run_and_keeps_the_worker(session_factory):
+    started = asyncio.Event()
+
+    async def handler(session_id, user_id, skill_name, request_details):
+        started.set()
+        await asyncio.sleep(60)
+
+    async with session_factory() as db:
+        session = await create_pending_session(db)
+
+    queue = MatchmakingQueue(session_factory=session_factory)
+    await queue.start(handler, workers=1)
+    await asyncio.wait_for(started.wait(), timeout=5)
+    async with session_factory() as db:
+        assert await queue.cancel(db, session.id)
+    await wait_for_statuses(session_factory, [JobStatus.CANCELLED])
+
+    assert [task.done() for task in queue._workers] == [False]
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_workers_claim_jobs_from_other_processes_and_only_expired_leases(session_factory):
+    handled = []
+
+    async def handler(session_id, user_id, skill_name, request_details):
+        handled.append(session_id)
+
+    async with session_factory() as db:
+        first = await create_pending_session(db)
+        running = await add_session(db, first.mentee_id, first.requested_skill_id)
+        stale = await add_session(db, first.mentee_id, first.requested_skill_id)
+        now = datetime.utcnow()
+        db.add_all([
+            MatchmakingJob(session_id=first.id, user_id=first.mentee_id, skill_name="Python", status=JobStatus.DONE),
+            MatchmakingJob(session_id=running.id, user_id=first.mentee_id, skill_name="Python", status=JobStatus.RUNNING, updated_at=now),
+            MatchmakingJob(session_id=stale.id, user_id=first.mentee_id, skill_name="Python", status=JobStatus.RUNNING,
+                           updated_at=now - timedelta(minutes=5)),
+        ])
+        await db.commit()
+
+    producer = MatchmakingQueue(session_factory=session_factory)
+    await producer.start(handler=None, workers=0)
+    worker = MatchmakingQueue(session_factory=session_factory)
+    worker.poll_seconds = 0.05
+    await worker.start(handler, workers=1)
+    async with session_factory() as db:
+        fresh = await add_session(db, first.mentee_id, first.requested_skill_id)
+        await producer.enqueue(db, fresh.id, first.mentee_id, "Python", "")
+
+    # The job another live worker is running is left alone.
+    await wait_for_statuses(session_factory, [JobStatus.DONE, JobStatus.RUNNING, JobStatus.DONE, JobStatus.DONE])
+    await worker.stop()
+    assert handled == [stale.id, fresh.id]
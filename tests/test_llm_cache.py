@@ -0,0 +1,44 @@
+import time
+
+from app.agents.llm_cache import LLMResponseCache
+
+
+def test_lru_eviction_and_counters():
+    cache = LLMResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 1, 1)
+
+
+def test_ttl_expiry_and_sqlite_persistence(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+    cache = LLMResponseCache(max_entries=4, ttl_seconds=60, sqlite_path=path)
+    cache.set("prompt", {"choices": ["cached"]})
+    cache.shutdown()
+
+    reopened = LLMResponseCache(max_entries=4, ttl_seconds=60, sqlite_path=path)
+    assert reopened.get("prompt") == {"choices": ["cached"]}
+
+    short_lived = LLMResponseCache(max_entries=4, ttl_seconds=0.01)
+    short_lived.set("prompt", "value")
+    time.sleep(0.02)
+    assert short_lived.get("prompt") is None
+    assert short_lived.stats()["expirations"] == 1
+
+
+def test_disk_hit_keeps_the_persisted_expiry(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+    writer = LLMResponseCache(max_entries=4, ttl_seconds=0.05, sqlite_path=path)
+    writer.set("prompt", "value")
+    writer.shutdown()
+
+    reader = LLMResponseCache(max_entries=4, ttl_seconds=60, sqlite_path=path)
+    assert reader.get("prompt") == "value"
+    time.sleep(0.06)
+    assert reader.get("prompt") is None
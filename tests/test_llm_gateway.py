@@ -0,0 +1,213 @@
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.agents.llm_gateway import CircuitBreaker, CircuitOpenError, LLMGateway
+from app.agents.specialized_agents import create_matchmaking_agent
+from app.core.metrics import metrics
+
+
+def completion(content):
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "llama3.2:1b",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+
+
+def make_gateway(handler, **options):
+    return LLMGateway(
+        base_url="http://llm.test/v1",
+        api_key="not-needed",
+        default_model="llama3.2:1b",
+        retry_base_seconds=0.001,
+        transport=httpx.MockTransport(handler),
+        **options,
+    )
+
+
+@pytest.mark.asyncio
+async def test_agents_complete_through_gateway_with_retry(monkeypatch):
+    attempts = []
+
+    def handler(request):
+        attempts.append(json.loads(request.content)["model"])
+        if len(attempts) == 1:
+            return httpx.Response(503, json={"error": {"message": "loading model"}})
+        return httpx.Response(200, json=completion('{"best_mentor_id": 7}'))
+
+    gateway = make_gateway(handler, max_retries=2)
+    monkeypatch.setattr("app.agents.llm_gateway.llm_gateway", gateway)
+    agent = create_matchmaking_agent(llm_config=gateway.llm_config())
+
+    reply = await agent.a_generate_reply(messages=[{"role": "user", "content": "pick a mentor"}])
+
+    assert reply == '{"best_mentor_id": 7}'
+    assert attempts == ["llama3.2:1b", "llama3.2:1b"]
+    assert (gateway.stats()["retries"], gateway.stats()["completed"]) == (1, 1)
+    gateway.close()
+
+
+def test_per_model_concurrency_cap():
+    in_flight = peak = 0
+    lock = threading.Lock()
+
+    def handler(request):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        return httpx.Response(200, json=completion("ok"))
+
+    gateway = make_gateway(handler, max_concurrency=2)
+    request = lambda: gateway.client.chat.completions.create(model="llama3.2:1b", messages=[{"role": "user", "content": "hi"}])
+    threads = [threading.Thread(target=gateway.call, args=("llama3.2:1b", request)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    assert gateway.stats()["completed"] == 6
+    gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_requests_stop_waiting_on_the_gateways_threads():
+    release = threading.Event()
+    served = []
+
+    def handler(request):
+        served.append(threading.current_thread().name)
+        release.wait(5)
+        return httpx.Response(200, json=completion("ok"))
+
+    gateway = make_gateway(handler, max_concurrency=1)
+    messages = [{"role": "user", "content": "hi"}]
+    holder = asyncio.ensure_future(gateway.run(lambda: gateway.chat(messages)))
+    while not served:
+        await asyncio.sleep(0.01)
+    waiter = asyncio.ensure_future(gateway.run(lambda: gateway.chat(messages)))
+    await asyncio.sleep(0.05)
+    assert gateway.stats()["waiting"] == 1
+
+    waiter.cancel()
+    await asyncio.sleep(0.3)
+    release.set()
+    assert await holder == "ok"
+    assert len(served) == 1 and served[0].startswith("llm-gateway")
+    assert gateway.stats()["abandoned"] == 1 and gateway.stats()["waiting"] == 0
+    gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_completions_on_the_gateways_threads_join_the_callers_trace():
+    gateway = make_gateway(lambda request: httpx.Response(200, json=completion("ok")))
+    messages = [{"role": "user", "content": "hi"}]
+
+    with metrics.trace() as spans:
+        assert await gateway.run(lambda: gateway.chat(messages)) == "ok"
+
+    assert [name for name, _ in spans] == ["llm.completion"]
+    gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_tool_chats_end_at_the_agents_answer(monkeypatch):
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.agents import orchestrator
+    from app.core.config import settings
+    from app.core.metrics import llm_tokens
+    from app.db.database import Base
+    from app.db.models import Skill, User, UserRole
+    from benchmarks.fake_llm import build_completion
+
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json=build_completion(requests[-1], len(requests)))
+
+    gateway = make_gateway(handler)
+    monkeypatch.setattr("app.agents.llm_gateway.llm_gateway", gateway)
+    monkeypatch.setattr(orchestrator, "llm_gateway", gateway)
+    monkeypatch.setattr(settings, "MENTOR_INDEX_ENABLED", False)
+    monkeypatch.setattr(settings, "SEMANTIC_MATCHING_ENABLED", False)
+    orchestrator.agent_pool.clear()
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    prompt_tokens = llm_tokens.value("llama3.2:1b", "prompt")
+
+    try:
+        async with factory() as db:
+            python = Skill(name="Python")
+            mentor = User(username="mentor", email="mentor@test.com", hashed_password="x", role=UserRole.MENTOR, trust_score=90.0, skills=[python])
+            mentee = User(username="mentee", email="mentee@test.com", hashed_password="x")
+            db.add_all([mentor, mentee])
+            await db.commit()
+            matchmaker = orchestrator.MatchmakingOrchestrator(db_session=db)
+            matchmaker.llm_cache = None
+
+            verdict = await matchmaker._verify_user_with_agent(mentee.id)
+            result = await matchmaker.match_single("Python", "web apps")
+    finally:
+        orchestrator.agent_pool.clear()
+        gateway.close()
+
+    assert verdict["status"] == "VERIFIED"
+    assert result == {"status": "SUCCESS", "mentor_id": mentor.id}
+    # One tool call and one answer per chat, not a run until the auto-reply limit.
+    assert len(requests) == 4
+    assert llm_tokens.value("llama3.2:1b", "prompt") > prompt_tokens
+
+
+def test_circuit_breaker_opens_on_failures_and_closes_after_a_probe():
+    failing = True
+
+    def handler(request):
+        if failing:
+            return httpx.Response(503, json={"error": {"message": "model server down"}})
+        return httpx.Response(200, json=completion("back"))
+
+    gateway = make_gateway(handler, max_retries=0, breaker_failure_threshold=2, breaker_reset_seconds=60)
+    now = [0.0]
+    gateway.breaker = CircuitBreaker(2, 60, clock=lambda: now[0])
+    messages = [{"role": "user", "content": "hi"}]
+    for _ in range(2):
+        with pytest.raises(Exception, match="model server down"):
+            gateway.chat(messages)
+    assert gateway.breaker.is_open()
+    with pytest.raises(CircuitOpenError):
+        gateway.chat(messages)
+
+    failing = False
+    now[0] = 61.0
+    assert not gateway.breaker.is_open()
+    assert gateway.chat(messages) == "back"
+    assert gateway.stats()["breaker"] == {"open": 0, "half_open": 0, "consecutive_failures": 0, "trips": 1, "rejected": 1}
+    gateway.close()
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    now = [0.0]
+    breaker = CircuitBreaker(1, 10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+    now[0] = 10.0
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_failure()
+    assert breaker.is_open() and breaker.trips == 2
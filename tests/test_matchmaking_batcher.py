@@ -0,0 +1,68 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.agents.orchestrator import MatchmakingOrchestrator
+from app.services.matchmaking_batcher import MatchmakingBatcher, MatchRequest
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_for_same_skill_share_one_runner_call():
+    calls = []
+
+    async def runner(skill_name, requests):
+        calls.append((skill_name, [request.user_id for request in requests]))
+        return [{"status": "SUCCESS", "mentor_id": 100 + request.user_id} for request in requests]
+
+    batcher = MatchmakingBatcher(window_ms=20, max_batch_size=10)
+    results = await asyncio.gather(
+        batcher.submit("Python", 1, "async help", runner),
+        batcher.submit("python", 2, "typing help", runner),
+        batcher.submit("Rust", 3, "lifetimes", runner),
+    )
+
+    assert [result["mentor_id"] for result in results] == [101, 102, 103]
+    assert sorted(calls) == [("Python", [1, 2]), ("Rust", [3])]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_before_window_and_propagates_errors():
+    async def runner(skill_name, requests):
+        raise RuntimeError("LLM unavailable")
+
+    batcher = MatchmakingBatcher(window_ms=10_000, max_batch_size=2)
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            batcher.submit("Python", 1, "", runner),
+            batcher.submit("Python", 2, "", runner),
+            return_exceptions=True,
+        ),
+        timeout=1,
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_match_batch_validates_assignments_against_candidates():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    candidates = json.dumps({"mentors": [{"id": 7, "username": "ada"}, {"id": 9, "username": "linus"}]})
+    reply = 'Here you go: {"assignments": [{"request": 0, "best_mentor_id": 9}, {"request": 1, "best_mentor_id": 42}]}'
+    loop = asyncio.get_running_loop()
+    requests = [MatchRequest(user_id=n, request_details=f"request {n}", future=loop.create_future()) for n in range(3)]
+
+    # The opener's own DB session is never used by the batch.
+    orchestrator = MatchmakingOrchestrator(db_session=None, session_factory=factory)
+    with patch("app.agents.orchestrator.find_potential_mentors", AsyncMock(return_value=candidates)), \
+         patch("autogen.ConversableAgent.a_generate_reply", AsyncMock(return_value=reply)) as llm:
+        results = await orchestrator.match_batch("Python", requests)
+    await engine.dispose()
+
+    assert llm.await_count == 1
+    assert results[0] == {"status": "SUCCESS", "mentor_id": 9}
+    # An id outside the candidate list and a missing assignment both fail only their own request.
+    assert [result["status"] for result in results[1:]] == ["FAILED", "FAILED"]
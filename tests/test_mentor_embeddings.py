@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.database import Base
+from app.db.models import MentorshipSession, SessionStatus, Skill, User, UserRole
+from app.services.mentor_embeddings import HashingEmbedder, MentorEmbeddingIndex
+from app.services.mentor_index import MentorIndex
+
+
+def test_embedder_is_deterministic_and_normalized():
+    embedder = HashingEmbedder(dim=256)
+    first = embedder.embed("Pandas dataframes for data cleaning")
+
+    assert (first == embedder.embed("pandas DataFrames for data cleaning")).all()
+    assert abs(float(first @ first) - 1.0) < 1e-5
+    assert float(embedder.embed("please help me").sum()) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_profiles_include_summaries_and_follow_registrations():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with factory() as db:
+        python = Skill(name="Python")
+        mentee = User(username="mentee", email="mentee@test.com", hashed_password="x")
+        analyst = User(username="analyst", email="analyst@test.com", hashed_password="x", role=UserRole.MENTOR, skills=[python])
+        webdev = User(username="webdev", email="webdev@test.com", hashed_password="x", role=UserRole.MENTOR, skills=[python])
+        db.add_all([mentee, analyst, webdev])
+        await db.flush()
+        db.add_all([
+            MentorshipSession(mentee_id=mentee.id, mentor_id=analyst.id, requested_skill_id=python.id,
+                              status=SessionStatus.COMPLETED, summary="Cleaned sales data with pandas dataframes."),
+            MentorshipSession(mentee_id=mentee.id, mentor_id=webdev.id, requested_skill_id=python.id,
+                              status=SessionStatus.COMPLETED, summary="Built a REST API with Django views."),
+        ])
+        await db.commit()
+
+        mentors = MentorIndex()
+        index = MentorEmbeddingIndex(HashingEmbedder(dim=256), mentors=mentors, capacity=2)
+        await index.build(db)
+
+    assert [mentor_id for mentor_id, _ in index.search("python pandas dataframes", k=1)] == [analyst.id]
+    assert [mentor_id for mentor_id, _ in index.search("django rest api", k=1)] == [webdev.id]
+
+    # A new mentor is embedded on registration, growing the matrix past its capacity.
+    mentors.upsert_mentor(99, "rustacean", 80.0, UserRole.MENTOR, ["Rust", "Embedded Systems"])
+    assert index.search("embedded rust firmware", k=1)[0][0] == 99
+    index.add_note(analyst.id, "Tuned Rust embedded firmware.")
+    similarity = index.similarity(index.embedder.embed("rust firmware"), [analyst.id, 12345])
+    assert similarity[0] > 0 and similarity[1] == 0.0
+
+    # Switching to a mentee drops the profile; the last row fills the hole.
+    mentors.upsert_mentor(analyst.id, "analyst", 80.0, UserRole.MENTEE, ["Python"])
+    assert len(index) == 2
+    assert {mentor_id for mentor_id, _ in index.search("python", k=5)} == {webdev.id, 99}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_calls_build_once_and_keep_the_latest_summaries(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(settings, "SEMANTIC_PROFILE_SUMMARIES", 2)
+    monkeypatch.setattr(settings, "SEMANTIC_PROFILE_SUMMARY_CHARS", 8)
+
+    async with factory() as db:
+        python = Skill(name="Python")
+        mentee = User(username="mentee", email="mentee@test.com", hashed_password="x")
+        mentor = User(username="mentor", email="mentor@test.com", hashed_password="x", role=UserRole.MENTOR, skills=[python])
+        db.add_all([mentee, mentor])
+        await db.flush()
+        db.add_all([
+            MentorshipSession(mentee_id=mentee.id, mentor_id=mentor.id, requested_skill_id=python.id,
+                              status=SessionStatus.COMPLETED, summary=f"summary {n} of many")
+            for n in range(5)
+        ])
+        await db.commit()
+
+    mentors = MentorIndex()
+    index = MentorEmbeddingIndex(HashingEmbedder(dim=64), mentors=mentors)
+    builds = []
+    real_embed_many = index.embedder.embed_many
+    monkeypatch.setattr(index.embedder, "embed_many", lambda texts: builds.append(texts) or real_embed_many(texts))
+
+    async def first_call():
+        async with factory() as db:
+            await index.ensure_built(db)
+
+    await asyncio.gather(*(first_call() for _ in range(3)))
+
+    assert len(builds) == 1
+    assert index._notes[mentor.id] == ["summary ", "summary "]
+    assert builds[0] == ["Python\nsummary \nsummary "]
+    assert mentors._listeners.count(index.on_mentor_changed) == 1
@@ -0,0 +1,42 @@
+from app.db.models import UserRole
+from app.services.mentor_index import MentorIndex
+
+
+def test_top_mentors_sorted_by_trust_and_incrementally_updated():
+    index = MentorIndex()
+    index.upsert_mentor(1, "alice", 70.0, UserRole.MENTOR, ["Python", "AI"])
+    index.upsert_mentor(2, "bob", 90.0, UserRole.BOTH, ["Python Programming"])
+    index.upsert_mentor(3, "carol", 40.0, UserRole.MENTOR, ["Python"])
+    index.upsert_mentor(4, "dave", 95.0, UserRole.MENTEE, ["Python"])
+
+    assert [m.id for m in index.top_mentors("python")] == [2, 1]
+    assert [m.id for m in index.top_mentors("Python Programming")] == [2]
+    assert [m.id for m in index.top_mentors("pyth")] == [2, 1]
+    assert [m.id for m in index.top_mentors("python", limit=1)] == [2]
+
+    index.upsert_mentor(1, "alice", 99.0, UserRole.MENTOR, ["Python"])
+    assert [m.id for m in index.top_mentors("python")] == [1, 2]
+    assert index.top_mentors("AI") == []
+
+
+def test_query_tokens_must_be_covered_by_one_skill():
+    index = MentorIndex()
+    index.upsert_mentor(1, "alice", 90.0, UserRole.MENTOR, ["Machine Design", "Learning Theory"])
+    index.upsert_mentor(2, "bob", 80.0, UserRole.MENTOR, ["Machine Learning"])
+
+    assert [m.id for m in index.top_mentors("machine learning")] == [2]
+    assert [m.id for m in index.top_mentors("mach learn")] == [2]
+    assert [m.id for m in index.top_mentors("machine")] == [1, 2]
+
+
+def test_partial_tokens_expand_by_prefix_only():
+    index = MentorIndex()
+    index.upsert_mentor(1, "alice", 70.0, UserRole.MENTOR, ["JavaScript", "Java"])
+    index.upsert_mentor(2, "bob", 80.0, UserRole.MENTOR, ["Python"])
+
+    assert [m.id for m in index.top_mentors("jav")] == [1]
+    assert [m.id for m in index.top_mentors("py")] == [2]
+    assert index.top_mentors("script") == []
+
+    index.remove(1)
+    assert index._tokens == ["python"]
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.agents.orchestrator import MatchmakingOrchestrator
+from app.core.config import settings
+from app.db.database import Base
+from app.db.models import MentorshipSession, SessionStatus, Skill, User, UserRole
+from app.services.mentor_scoring import CandidateFeatures, MentorScorer
+
+WEIGHTS = {"trust": 1.0, "overlap": 0.5, "load": 0.6, "recency": 0.2}
+
+
+def test_rank_prefers_overlap_and_spare_capacity():
+    now = datetime(2026, 1, 1)
+    mentors = [
+        (1, "busy", 95.0, {"python"}),
+        (2, "full", 99.0, {"python"}),
+        (3, "broad", 80.0, {"python", "django"}),
+        (4, "plain", 80.0, {"python"}),
+    ]
+    activity = {1: (4, now), 2: (5, now), 3: (0, now - timedelta(days=14))}
+    features = CandidateFeatures.build(mentors, {"python", "django"}, activity, now)
+    scorer = MentorScorer(WEIGHTS, capacity=5, recency_half_life_days=14)
+
+    ranked = scorer.rank(features, limit=10)
+
+    assert [mentor.id for mentor in ranked] == [3, 4, 1]
+    assert ranked[0].overlap == 1.0
+    assert [mentor.id for mentor in scorer.rank(features, limit=1)] == [3]
+
+
+
+def test_semantic_similarity_breaks_ties():
+    now = datetime(2026, 1, 1)
+    mentors = [(1, "web", 80.0, {"python"}), (2, "data", 80.0, {"python"})]
+    features = CandidateFeatures.build(mentors, {"python"}, {}, now, similarity=np.array([0.1, 0.7], dtype=np.float32))
+    scorer = MentorScorer({**WEIGHTS, "semantic": 0.5}, capacity=5, recency_half_life_days=14)
+
+    assert [mentor.id for mentor in scorer.rank(features, limit=2)] == [2, 1]
+    assert [mentor.id for mentor in MentorScorer(WEIGHTS, capacity=5, recency_half_life_days=14).rank(features, limit=2)] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_scored_matchmaking_runs_without_the_llm(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(settings, "MENTOR_INDEX_ENABLED", False)
+    monkeypatch.setattr(settings, "MATCHMAKING_MODE", "scoring")
+    monkeypatch.setattr(settings, "MATCHMAKING_LLM_RERANK_TOP_K", 0)
+
+    async with factory() as db:
+        python = Skill(name="Python")
+        mentee = User(username="mentee", email="mentee@test.com", hashed_password="x", skills=[python])
+        top = User(username="top", email="top@test.com", hashed_password="x", role=UserRole.MENTOR, trust_score=95.0, skills=[python])
+        spare = User(username="spare", email="spare@test.com", hashed_password="x", role=UserRole.MENTOR, trust_score=85.0, skills=[python])
+        db.add_all([mentee, top, spare])
+        await db.flush()
+        db.add_all([
+            MentorshipSession(mentee_id=mentee.id, mentor_id=top.id, requested_skill_id=python.id, status=SessionStatus.ACTIVE)
+            for _ in range(settings.MENTOR_MAX_ACTIVE_SESSIONS)
+        ])
+        await db.commit()
+
+        with patch("autogen.ConversableAgent.a_generate_reply", AsyncMock()) as llm:
+            result = await MatchmakingOrchestrator(db_session=db).initiate_matchmaking_flow(mentee.id, "python", "help")
+    await engine.dispose()
+
+    assert result["status"] == "SUCCESS"
+    assert result["mentor_id"] == spare.id
+    llm.assert_not_awaited()
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app.core.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry(prefix="test")
+    latency = registry.histogram("latency_seconds", "Latency.", ("model",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, 'llama"3')
+    tokens = registry.counter("tokens_total", "Tokens.", ("type",))
+    tokens.inc(12, "prompt")
+
+    text = registry.render({"llm_cache": {"hits": 3, "hit_ratio": 0.75, "backend": "memory"}, "pool": {"idle": {"summary": 2}}})
+
+    assert 'test_latency_seconds_bucket{model="llama\\"3",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{model="llama\\"3",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{model="llama\\"3",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{model="llama\\"3"} 3' in text
+    assert 'test_tokens_total{type="prompt"} 12' in text
+    assert "test_llm_cache_hits 3" in text and "test_llm_cache_hit_ratio 0.75" in text
+    assert 'test_pool_idle{key="summary"} 2' in text
+    assert "backend" not in text
+
+
+@pytest.mark.asyncio
+async def test_trace_collects_spans_and_follows_its_sampling_decision():
+    registry = MetricsRegistry(prefix="test")
+
+    @registry.timed("tool.lookup")
+    async def lookup():
+        await asyncio.sleep(0)
+        return "ok"
+
+    with registry.trace() as spans:
+        with registry.span("orchestrator.match"):
+            assert await lookup() == "ok"
+    assert [name for name, _ in spans] == ["tool.lookup", "orchestrator.match"]
+
+    with pytest.raises(ValueError):
+        with registry.span("orchestrator.verify"):
+            raise ValueError("boom")
+    assert registry.span_errors.value("orchestrator.verify") == 1
+
+    registry.sample_rate = 0.0
+    with registry.trace() as spans:
+        await lookup()
+    assert spans is None
+    assert registry.span_seconds.count("tool.lookup") == 1
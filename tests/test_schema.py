@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.database import Base, ensure_schema, schema_fingerprint
+
+
+@pytest.mark.asyncio
+async def test_ensure_schema_runs_create_all_only_when_the_fingerprint_changes(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'schema.db'}")
+
+    assert await ensure_schema(engine) is True
+    assert await ensure_schema(engine) is False
+    async with engine.connect() as conn:
+        assert (await conn.exec_driver_sql("PRAGMA user_version")).scalar() == schema_fingerprint()
+        await conn.exec_driver_sql("PRAGMA user_version = 1")
+        await conn.commit()
+    assert await ensure_schema(engine) is True
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_ensure_schema_adds_indexes_declared_on_existing_tables(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'indexes.db'}")
+    await ensure_schema(engine)
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("DROP INDEX ix_mentorship_sessions_mentee_created")
+        await conn.exec_driver_sql("PRAGMA user_version = 1")
+
+    assert await ensure_schema(engine) is True
+    async with engine.connect() as conn:
+        indexes = await conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")
+        assert "ix_mentorship_sessions_mentee_created" in indexes.scalars().all()
+    await engine.dispose()
+
+
+def test_fingerprint_tracks_schema_changes():
+    extended = MetaData()
+    for table in Base.metadata.sorted_tables:
+        table.to_metadata(extended)
+    assert schema_fingerprint(extended) == schema_fingerprint()
+
+    Table("extra", extended, Column("id", Integer, primary_key=True))
+    assert schema_fingerprint(extended) != schema_fingerprint()
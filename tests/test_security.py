@@ -0,0 +1,45 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.security import AsyncHasher
+
+
+@pytest.mark.asyncio
+async def test_async_hasher_round_trip_and_cancellation():
+    hasher = AsyncHasher(executor_kind="thread", max_workers=1)
+    hashed = await hasher.hash("s3cret")
+    assert await hasher.verify("s3cret", hashed)
+    assert not await hasher.verify("wrong", hashed)
+
+    running = asyncio.create_task(hasher.hash("first"))
+    waiting = asyncio.create_task(hasher.hash("second"))
+    await asyncio.sleep(0.01)
+    assert hasher.stats()["queue_depth"] == 1
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert await running
+    assert hasher.stats()["cancelled"] == 1
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_running_call_keeps_its_executor_slot():
+    hasher = AsyncHasher(executor_kind="thread", max_workers=1)
+    unblock = threading.Event()
+    running = asyncio.create_task(hasher._run(unblock.wait))
+    await asyncio.sleep(0.01)
+    running.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await running
+
+    queued = asyncio.create_task(hasher.hash("next"))
+    await asyncio.sleep(0.01)
+    assert hasher.stats()["in_flight"] == 1 and hasher.stats()["queue_depth"] == 1
+    unblock.set()
+    assert await queued
+    assert (hasher.stats()["completed"], hasher.stats()["cancelled"]) == (1, 1)
+    hasher.shutdown()
+
@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.agents import orchestrator
+from app.agents.llm_gateway import CircuitBreaker
+from app.agents.orchestrator import MatchmakingOrchestrator, extract_json_object
+from app.core.config import settings
+from app.db.database import Base
+from app.db.models import Skill, User, UserRole
+
+
+def test_extract_json_object_tolerates_prose_fences_and_extra_objects():
+    assert extract_json_object('Sure! ```json\n{"best_mentor_id": 7}\n``` Hope {this} helps.') == {"best_mentor_id": 7}
+    assert extract_json_object('{"best_mentor_id": 3} and also {"best_mentor_id": 4}') == {"best_mentor_id": 3}
+    assert extract_json_object('{"outer": {"best_mentor_id": 5}}') == {"outer": {"best_mentor_id": 5}}
+    assert extract_json_object("{best_mentor_id: 5}") is None
+
+
+class ScriptedGateway:
+    default_model = "llama3.2:1b"
+
+    def __init__(self, replies, delay=0.0):
+        self.replies = list(replies)
+        self.delay = delay
+        self.calls = []
+        self.breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+
+    def chat(self, messages, **params):
+        self.calls.append((list(messages), params))
+        time.sleep(self.delay)
+        return self.replies.pop(0)
+
+    async def run(self, request):
+        return await asyncio.to_thread(request)
+
+
+@pytest.fixture
+async def db(monkeypatch):
+    monkeypatch.setattr(settings, "MENTOR_INDEX_ENABLED", False)
+    monkeypatch.setattr(settings, "SEMANTIC_MATCHING_ENABLED", False)
+    monkeypatch.setattr(settings, "MATCHMAKING_MODE", "single_turn")
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        python = Skill(name="Python")
+        session.add_all([
+            User(username="mentee", email="mentee@test.com", hashed_password="x", skills=[python]),
+            User(username="top", email="top@test.com", hashed_password="x", role=UserRole.MENTOR, trust_score=95.0, skills=[python]),
+            User(username="second", email="second@test.com", hashed_password="x", role=UserRole.MENTOR, trust_score=85.0, skills=[python]),
+        ])
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_one_constrained_turn_with_a_repair_for_an_unlisted_id(db, monkeypatch):
+    gateway = ScriptedGateway(['{"best_mentor_id": 99}', 'Here you go: {"best_mentor_id": 3}'])
+    monkeypatch.setattr(orchestrator, "llm_gateway", gateway)
+    matchmaker = MatchmakingOrchestrator(db_session=db)
+    matchmaker.llm_cache = None
+
+    result = await matchmaker.initiate_matchmaking_flow(1, "python", "web apps")
+
+    assert result == {"status": "SUCCESS", "mentor_id": 3}
+    assert len(gateway.calls) == 2
+    first_messages, params = gateway.calls[0]
+    assert '"id": 2' in first_messages[-1]["content"] and '"id": 3' in first_messages[-1]["content"]
+    assert params["response_format"]["json_schema"]["schema"]["properties"]["best_mentor_id"]["enum"] == [2, 3]
+    repair_messages, _ = gateway.calls[1]
+    assert repair_messages[-2] == {"role": "assistant", "content": '{"best_mentor_id": 99}'}
+
+
+@pytest.mark.asyncio
+async def test_unrepairable_reply_keeps_the_top_candidate(db, monkeypatch):
+    gateway = ScriptedGateway(["mentor two", "still no JSON"])
+    monkeypatch.setattr(orchestrator, "llm_gateway", gateway)
+    monkeypatch.setattr(settings, "MATCHMAKING_RESPONSE_FORMAT", "none")
+    matchmaker = MatchmakingOrchestrator(db_session=db)
+    matchmaker.llm_cache = None
+
+    result = await matchmaker.match_single_turn("python", "web apps")
+
+    assert result == {"status": "SUCCESS", "mentor_id": 2}
+    assert len(gateway.calls) == 1 + settings.MATCHMAKING_JSON_REPAIR_ATTEMPTS
+    assert "response_format" not in gateway.calls[0][1]
+
+
+@pytest.mark.asyncio
+async def test_overrunning_the_deadline_falls_back_without_opening_the_breaker(db, monkeypatch):
+    gateway = ScriptedGateway(['{"best_mentor_id": 3}'], delay=0.5)
+    monkeypatch.setattr(orchestrator, "llm_gateway", gateway)
+    monkeypatch.setattr(settings, "ORCHESTRATOR_DEADLINE_SECONDS", 0.1)
+    matchmaker = MatchmakingOrchestrator(db_session=db)
+    matchmaker.llm_cache = None
+
+    result = await matchmaker.initiate_matchmaking_flow(1, "python", "web apps")
+
+    # The scoring engine's choice, not the late LLM reply.
+    assert result["status"] == "SUCCESS" and result["mentor_id"] == 2
+    # A run's own deadline is not an endpoint failure.
+    assert not gateway.breaker.is_open()
+
+    # Once the gateway has seen the endpoint fail, the LLM is skipped altogether.
+    gateway.breaker.record_failure()
+    result = await matchmaker.initiate_matchmaking_flow(1, "python", "web apps")
+    assert result["mentor_id"] == 2
+    assert len(gateway.calls) == 1
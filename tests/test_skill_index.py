@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.database import Base
+from app.db.models import Skill
+from app.services import session_manager, skill_index as skill_index_module
+from app.services.session_manager import SessionManager
+from app.services.skill_index import SkillIndex, canonical_skill_name
+
+
+def make_index() -> SkillIndex:
+    index = SkillIndex()
+    for skill_id, name in enumerate(["Python", "PyTorch", "Python Web", "JavaScript", "Rust", "python3"], start=1):
+        index.add(skill_id, name)
+    return index
+
+
+def test_spelling_variants_share_one_canonical_skill():
+    assert canonical_skill_name(" Python3 ") == canonical_skill_name("py") == "python"
+    index = make_index()
+    assert index.resolve("PYTHON") == index.resolve("py") == 1
+    assert index.resolve("Haskell") is None
+
+
+def test_substring_fuzzy_and_autocomplete_lookups():
+    index = make_index()
+    assert index.containing("script") == [4]
+    assert index.containing("th") == [1, 3, 6]
+    assert [match.name for match in index.fuzzy("pyhton")] == ["Python"]
+    # The duplicate "python3" row is folded into "Python"; shorter completions come first.
+    assert [match.name for match in index.autocomplete("py")] == ["Python", "PyTorch", "Python Web"]
+    assert [match.name for match in index.autocomplete("javscript")] == ["JavaScript"]
+
+
+def test_readding_an_id_under_another_name_replaces_its_entry():
+    index = make_index()
+    index.add(5, "Go")
+    assert index.resolve("go") == 5 and index.resolve("rust") is None
+    assert index.containing("rust") == []
+    assert [match.name for match in index.autocomplete("ru")] == []
+    index.remove(1)
+    assert index.resolve("python") == 6
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_skills_stay_out_of_the_index_and_misses_fall_back_to_like(monkeypatch):
+    monkeypatch.setattr(settings, "SKILL_INDEX_ENABLED", True)
+    monkeypatch.setattr(skill_index_module, "skill_index", SkillIndex())
+    monkeypatch.setattr(session_manager, "skill_index", skill_index_module.skill_index)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        db.add(Skill(name="Python"))
+        await db.commit()
+        await skill_index_module.skill_index.build(db)
+
+        db.add(Skill(name="Rust"))
+        await db.flush()
+        assert (await SessionManager.get_skill_by_name(db, "rust")).name == "Rust"
+        await db.rollback()
+        assert skill_index_module.skill_index.resolve("rust") is None
+
+        # Created behind the index's back, as another worker would.
+        db.add_all([Skill(name="Go"), Skill(name="Advanced Python")])
+        await db.commit()
+        found = await db.execute(select(Skill.name).where(skill_index_module.skill_name_filter("go")))
+        assert found.scalars().all() == ["Go"]
+        found = await db.execute(select(Skill.name).where(skill_index_module.skill_name_filter("python")).order_by(Skill.id))
+        assert found.scalars().all() == ["Python", "Advanced Python"]
+        assert (await SessionManager.get_skill_by_name(db, "go")).name == "Go"
+        await db.commit()
+        assert skill_index_module.skill_index.resolve("go") is not None
+    await engine.dispose()
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from app.agents.summarization import HierarchicalSummarizer, estimate_tokens, split_transcript
+
+
+def test_split_transcript_bounds_chunks_and_keeps_text():
+    transcript = "".join(f"mentor: point {n} " * 5 + "\n" for n in range(40)) + "x" * 500
+    chunks = split_transcript(transcript, max_tokens=50)
+    assert "".join(chunks) == transcript
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+
+
+@pytest.mark.asyncio
+async def test_reduce_summarizes_chunks_concurrently_under_cap_and_in_order():
+    in_flight = peak = 0
+
+    async def ask(prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "summary of " + prompt.split(" of ", 1)[0].rsplit(" ", 1)[-1]
+
+    transcript = "".join(f"line {n} " * 10 + "\n" for n in range(100))
+    summarizer = HierarchicalSummarizer(ask=ask, chunk_tokens=200, concurrency=3)
+    notes = await summarizer.reduce(transcript)
+
+    assert peak == 3
+    assert notes.startswith("Part 1: summary of 1\n\nPart 2: summary of 2")
+    assert estimate_tokens(notes) <= 200
+    assert await summarizer.reduce("short") == "short"
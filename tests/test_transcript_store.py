@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.database import Base
+from app.db.models import MentorshipSession, Skill, TranscriptChunk, User
+from app.services.session_manager import SessionManager
+from app.services.transcript_store import TranscriptStore
+
+
+@pytest.mark.asyncio
+async def test_appends_compressed_chunks_and_streams_them_back(monkeypatch):
+    monkeypatch.setattr(settings, "TRANSCRIPT_CHUNK_MAX_BYTES", 80)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with factory() as db:
+        mentee = User(username="talker", email="talker@test.com", hashed_password="x")
+        skill = Skill(name="Rust")
+        db.add_all([mentee, skill])
+        await db.commit()
+        session = await SessionManager.create_session_request(db, mentee.id, skill.id)
+
+        first = [f"mentee: question {n} about lifetimes" for n in range(3)]
+        assert await TranscriptStore.append(db, session.id, first) == 2
+        assert await TranscriptStore.append(db, session.id, ["mentor: use borrows"]) == 1
+
+        parts = [part async for part in TranscriptStore.stream(db, session.id)]
+        assert "".join(parts) == "".join(line + "\n" for line in first + ["mentor: use borrows"])
+        sequences = (await db.execute(select(TranscriptChunk.sequence).order_by(TranscriptChunk.id))).scalars().all()
+        assert sequences == [1, 2, 3]
+
+    async with factory() as db:
+        loaded = await SessionManager.get_session_by_id(db, session.id)
+        unloaded = inspect(loaded).unloaded
+        assert {"transcript", "summary"} <= unloaded
+
+        legacy = MentorshipSession(mentee_id=mentee.id, requested_skill_id=skill.id, transcript="old blob")
+        db.add(legacy)
+        await db.commit()
+        assert await TranscriptStore.read(db, legacy.id) == "old blob"
+    await engine.dispose()
@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.users import UserCreate
+from app.db.database import Base
+from app.db.models import User
+from app.services.user_importer import UserImporter
+
+
+async def rows(*users):
+    for number, user in enumerate(users, start=1):
+        yield number, UserCreate(**user)
+
+
+@pytest.mark.asyncio
+async def test_integrity_error_only_rejects_the_offending_rows(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def see_no_duplicates(db, valid, reports):
+        return valid
+
+    # Simulates a registration that lands between the duplicate check and the insert.
+    monkeypatch.setattr(UserImporter, "_drop_duplicates", staticmethod(see_no_duplicates))
+    async with factory() as db:
+        db.add(User(username="taken", email="taken@test.com", hashed_password="x"))
+        await db.commit()
+        reports = [
+            report
+            async for report in UserImporter.import_users(db, rows(
+                {"username": "fresh", "email": "fresh@test.com", "password": "pw", "skills": ["Go"]},
+                {"username": "taken", "email": "other@test.com", "password": "pw"},
+                {"username": "fresh2", "email": "fresh2@test.com", "password": "pw"},
+            ))
+        ]
+        usernames = (await db.execute(select(User.username))).scalars().all()
+    await engine.dispose()
+
+    assert [report["status"] for report in reports] == ["created", "error", "created"]
+    assert sorted(usernames) == ["fresh", "fresh2", "taken"]